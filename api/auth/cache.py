@@ -0,0 +1,210 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.database.models import User
+from config.logging import get_logger
+
+logger = get_logger("ravenchain.api.auth")
+
+
+class TTLCache:
+    """
+    Size-bounded mapping whose entries expire after a time-to-live.
+
+    Only used from the event loop, so it needs no lock. When full, the oldest entry is
+    dropped.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10000):
+        """
+        :param ttl: Default seconds an entry stays valid
+        :param maxsize: Maximum number of entries
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key) -> Any:
+        """Get a live entry, or None if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        """Store an entry for ``ttl`` seconds, or the default TTL"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key):
+        """Drop an entry if present"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the statistics"""
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        """Get cache statistics for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Read-only snapshot of a user row, safe to share between requests"""
+
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    is_admin: bool
+    created_at: datetime
+    last_login: Optional[datetime]
+    wallet_address: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        """Copy the fields of a loaded User row"""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=user.is_active,
+            is_admin=user.is_admin,
+            created_at=user.created_at,
+            last_login=user.last_login,
+            wallet_address=user.wallet_address,
+        )
+
+
+class LastSeenWriter:
+    """
+    Write-behind buffer for ``User.last_login``.
+
+    Requests only record the time in memory; repeated requests by the same user coalesce
+    into one pending value, and ``flush`` writes every pending value with one batched
+    UPDATE.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def touch(self, user_id: int, when: Optional[datetime] = None):
+        """Record that a user was seen, keeping only the latest time per user"""
+        self._pending[user_id] = when or datetime.now(timezone.utc)
+
+    def discard(self, user_id: int):
+        """Forget the pending time of a user, e.g. one that was deleted"""
+        self._pending.pop(user_id, None)
+
+    def clear(self):
+        """Drop every pending time without writing it"""
+        self._pending.clear()
+
+    async def flush(self, db: AsyncSession) -> int:
+        """
+        Write the pending times in one batch.
+
+        :param db: Session to write with
+        :return: Number of users updated
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            users = User.__table__
+            await db.execute(
+                update(users)
+                .where(users.c.id == bindparam("user_id"))
+                .values(last_login=bindparam("seen")),
+                [{"user_id": user_id, "seen": when} for user_id, when in pending.items()],
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # Keep the times for the next flush unless newer ones arrived meanwhile
+            for user_id, when in pending.items():
+                self._pending.setdefault(user_id, when)
+            raise
+        return len(pending)
+
+
+class UserInvalidations:
+    """
+    Drop a changed user's cached snapshot in every worker, not only the one that changed it.
+
+    Invalidations are announced through ``notifier``, the chain service's shared channel
+    (Postgres NOTIFY or the reader sockets), and every worker passes the announcements it
+    receives to ``handle``. Without a notifier, as in a standalone worker, only this
+    worker's cache is cleared. A worker that misses an announcement still drops the
+    snapshot once the cache TTL expires, so the TTL bounds how long a deactivated user
+    keeps access.
+    """
+
+    def __init__(self, cache: TTLCache):
+        """
+        :param cache: Cache of user snapshots keyed by username
+        """
+        self.cache = cache
+        self.notifier = None
+
+    async def invalidate(self, username: str):
+        """Drop a user's snapshot here and announce it to the other workers"""
+        self.cache.pop(username)
+        if self.notifier is None:
+            return
+        message = json.dumps({"invalidate_user": username})
+        try:
+            await asyncio.to_thread(self.notifier.send, [message])
+        except Exception as e:
+            # The change is already committed; other workers fall back to the TTL
+            logger.error(f"Error announcing user invalidation: {str(e)}")
+
+    def handle(self, message: dict) -> bool:
+        """
+        Apply an announcement received from the shared channel.
+
+        :param message: Decoded announcement
+        :return: Whether the message was a user invalidation
+        """
+        if "invalidate_user" not in message:
+            return False
+        self.cache.pop(message["invalidate_user"])
+        return True
+
+    def close(self):
+        """Stop announcing invalidations"""
+        if self.notifier is not None:
+            self.notifier.close()
+            self.notifier = None
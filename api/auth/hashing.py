@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class HasherOverloaded(Exception):
+    """Raised when too many password hashes are already waiting for a worker"""
+
+    def __init__(self, in_flight: int):
+        self.in_flight = in_flight
+        super().__init__(f"Password hashing is overloaded ({in_flight} operations in flight)")
+
+
+class PasswordHasher:
+    """
+    Run password hashing off the event loop on a small, bounded thread pool.
+
+    bcrypt spends its time in native code that releases the GIL, so a hash running on a
+    worker thread no longer stalls every other request of the worker process. At most
+    ``workers`` hashes run at once and at most ``max_queue`` more wait for a thread;
+    beyond that ``HasherOverloaded`` is raised so the caller can shed load instead of
+    letting a login burst build an unbounded backlog.
+    """
+
+    def __init__(self, context, workers: int = 2, max_queue: int = 32):
+        """
+        :param context: passlib CryptContext doing the actual hashing
+        :param workers: Number of hashing threads
+        :param max_queue: Number of operations allowed to wait for a thread
+        """
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0
+        self.hash_seconds_max = 0.0
+        self.wait_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the pool"""
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash on the pool"""
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherOverloaded(self.in_flight)
+            self.in_flight += 1
+            self.peak_queued = max(self.peak_queued, self.in_flight - self.workers)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+            executor = self._executor
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._timed, time.perf_counter(), fn, *args)
+
+    def _timed(self, submitted, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            # Counted down on the worker, so a cancelled request still holds its slot
+            # until the hash it queued has actually finished
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.wait_seconds += started - submitted
+                self.hash_seconds += elapsed
+                self.hash_seconds_max = max(self.hash_seconds_max, elapsed)
+
+    def shutdown(self):
+        """Stop the worker threads; the pool is recreated on the next hash"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        """Get hashing latency and queue depth statistics for monitoring"""
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "queue_limit": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.workers),
+                "peak_queued": self.peak_queued,
+                "completed": completed,
+                "rejected": self.rejected,
+                "hash_seconds_avg": self.hash_seconds / completed if completed else 0.0,
+                "hash_seconds_max": self.hash_seconds_max,
+                "wait_seconds_avg": self.wait_seconds / completed if completed else 0.0,
+            }
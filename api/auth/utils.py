@@ -1,17 +1,26 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union, Dict, Any
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, WebSocket, WebSocketException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.auth.cache import CachedUser, LastSeenWriter, TTLCache, UserInvalidations
+from api.auth.hashing import PasswordHasher
 from api.database.models import User
-from api.dependencies import SessionLocal
+from api.dependencies import get_async_db
 from config.settings import settings
 
 # Password context for hashing and verifying passwords
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs on a bounded pool so it never blocks the event loop
+password_hasher = PasswordHasher(
+    pwd_context, settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE
+)
+
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_PREFIX}/auth/login")
 
@@ -22,34 +31,47 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
 
-def get_db():
-    """Get a database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Requests share the async session dependency
+get_db = get_async_db
+
+# Decoded token subjects and user snapshots, so authenticated reads skip JWT decoding and
+# the user query. User changes are announced to every worker that follows the chain
+# service; the TTL bounds staleness for any announcement that is lost.
+token_cache = TTLCache(settings.AUTH_CACHE_TTL, settings.AUTH_CACHE_SIZE)
+user_cache = TTLCache(settings.AUTH_CACHE_TTL, settings.AUTH_CACHE_SIZE)
+user_invalidations = UserInvalidations(user_cache)
+
+# Coalesced last_login updates, flushed in the background
+last_seen = LastSeenWriter()
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash.
 
+    :raises: HasherOverloaded if too many hashes are already queued
+    """
+    return await password_hasher.verify(plain_password, hashed_password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
 
+async def get_password_hash(password: str) -> str:
+    """
+    Hash a password.
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    :raises: HasherOverloaded if too many hashes are already queued
+    """
+    return await password_hasher.hash(password)
 
 
-def get_user(db: Session, username: str) -> Optional[User]:
+async def get_user(db: AsyncSession, username: str) -> Optional[User]:
     """Get a user by username"""
-    return db.query(User).filter(User.username == username).first()
+    return await db.scalar(select(User).where(User.username == username))
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Union[User, bool]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Union[User, bool]:
     """Authenticate a user by username and password"""
-    user = get_user(db, username)
-    if not user or not verify_password(password, user.hashed_password):
+    user = await get_user(db, username)
+    if not user or not await verify_password(password, user.hashed_password):
         return False
     return user
 
@@ -78,46 +100,102 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     return create_token(data, expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from the token"""
+async def invalidate_user(username: str):
+    """Drop the cached snapshot of a user in every worker after it was changed or deleted"""
+    await user_invalidations.invalidate(username)
+
+
+async def user_from_token(token: str, db: AsyncSession) -> CachedUser:
+    """
+    Resolve a bearer token to its user.
+
+    Decoded tokens and user snapshots are cached, and the last-seen time is only recorded
+    in memory, so a cached token costs no database access.
+
+    :raises: HTTPException 401 if the token or its user is invalid
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    username = token_cache.get(token)
+    if username is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            username: str = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        # Never trust a cached token past its own expiry
+        token_cache.set(token, username, ttl=payload["exp"] - time.time())
 
-    user = get_user(db, username=username)
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        db_user = await get_user(db, username=username)
+        if db_user is None:
+            raise credentials_exception
+        user = CachedUser.from_user(db_user)
+        user_cache.set(username, user)
+
+    last_seen.touch(user.id)
+    return user
 
-    # Update last login time
-    user.last_login = datetime.now(timezone.utc)
-    db.commit()
 
+async def get_current_user(
+    request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+) -> CachedUser:
+    """Get the current authenticated user from the token"""
+    user = await user_from_token(token, db)
+    # Lets the rate limiter key the request by user
+    request.state.user = user
     return user
 
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(
+    current_user: CachedUser = Depends(get_current_user),
+) -> CachedUser:
     """Get the current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
     return current_user
 
 
-async def get_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_admin_user(
+    current_user: CachedUser = Depends(get_current_active_user),
+) -> CachedUser:
     """Check if the current user is an admin"""
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required"
         )
     return current_user
+
+
+async def get_websocket_user(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+) -> CachedUser:
+    """
+    Authenticate a WebSocket from its Authorization header or ``token`` query parameter.
+
+    Browsers cannot set headers on WebSocket handshakes, hence the query parameter.
+    """
+    authorization = websocket.headers.get("authorization", "")
+    if token is None and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    try:
+        if token is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        user = await user_from_token(token, db)
+    except HTTPException:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Not authenticated")
+    finally:
+        # The socket can stay open for hours; do not hold a pooled connection meanwhile
+        await db.close()
+    if not user.is_active:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Inactive user")
+    return user
@@ -0,0 +1,503 @@
+"""
+Single-writer chain service for multi-worker deployments.
+
+One chain service process owns the blockchain: it holds the pending transactions, mines
+and appends blocks, and announces every tip change. API workers run with
+``RAVENCHAIN_CHAIN_ROLE=reader``; they keep a read-only Blockchain that fetches only the
+new blocks when a tip change is announced, and forward writes to the service over a Unix
+socket. Tip changes and admitted transactions travel over Postgres LISTEN/NOTIFY, or as
+datagrams to the workers' sockets in a shared directory where Postgres is not available.
+
+Run the service with ``python -m api.chain_service``.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import threading
+import uuid
+from collections import deque
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+from config.logging import get_logger, setup_logging
+from config.settings import settings
+from ravenchain import tracing
+from ravenchain.blockchain import Blockchain, ChainListener
+from ravenchain.transaction import Transaction
+
+# A child of the API logger, so followers in API workers log through its handlers;
+# serve() gives it handlers of its own in the chain service process
+logger = get_logger("ravenchain.api.chain_service")
+
+# Postgres channel carrying tip changes
+TIP_CHANNEL = "ravenchain_tip"
+# Largest request or response line accepted on the service socket
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+# Admitted transactions buffered for announcement before the oldest are dropped
+MAX_PENDING_ANNOUNCEMENTS = 1000
+
+
+class ChainServiceError(Exception):
+    """Raised when the chain service rejects a forwarded change"""
+
+
+class ChainServiceUnavailable(ChainServiceError):
+    """Raised when the chain service cannot be reached"""
+
+
+def transaction_from_dict(data):
+    """Rebuild a transaction sent over the service socket, keeping its timestamp"""
+    return Transaction.restore(
+        data["sender"],
+        data["recipient"],
+        data["amount"],
+        datetime.fromisoformat(data["timestamp"]),
+        bytes.fromhex(data["signature"]) if data["signature"] else None,
+    )
+
+
+def tip_message(height, block_hash):
+    """Encode a tip change announcement"""
+    return json.dumps({"height": height, "hash": block_hash})
+
+
+def transaction_message(tx):
+    """Encode the announcement of a transaction admitted to the pending pool"""
+    return json.dumps({"transaction": tx.to_dict()})
+
+
+class SocketTipNotifier:
+    """Send announcements as datagrams to every reader socket in a directory"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def send(self, messages):
+        """
+        :param messages: Encoded announcements, in order
+        """
+        for path in self.directory.glob("*.sock"):
+            try:
+                for message in messages:
+                    self._socket.sendto(message.encode(), str(path))
+            except ConnectionRefusedError:
+                # Left behind by a worker that exited without cleaning up
+                with suppress(FileNotFoundError):
+                    path.unlink()
+            except (BlockingIOError, FileNotFoundError):
+                # A busy reader still refreshes on its next poll
+                pass
+
+    def close(self):
+        self._socket.close()
+
+
+class PostgresTipNotifier:
+    """Send announcements with NOTIFY on the chain database"""
+
+    def __init__(self, engine):
+        """
+        :param engine: SQLAlchemy engine of the chain database
+        """
+        self.engine = engine
+
+    def send(self, messages):
+        """
+        :param messages: Encoded announcements, delivered in order in one transaction
+        """
+        from sqlalchemy import text
+
+        with self.engine.begin() as connection:
+            for message in messages:
+                connection.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": TIP_CHANNEL, "payload": message},
+                )
+
+    def close(self):
+        pass
+
+
+class TipPublisher(ChainListener):
+    """
+    Announce the writer's tip changes and admitted transactions through a notifier.
+
+    Listeners run under the chain lock, so announcements are handed to a background
+    thread. Tip changes that arrive while one is being sent collapse into the newest tip,
+    since readers always fetch everything above their own tip anyway. Transactions are
+    announced in order, dropping the oldest if the notifier falls far behind.
+    """
+
+    def __init__(self, notifier):
+        self.notifier = notifier
+        self._condition = threading.Condition()
+        self._latest = None
+        self._transactions = deque(maxlen=MAX_PENDING_ANNOUNCEMENTS)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="tip-publisher", daemon=True)
+        self._thread.start()
+
+    def block_connected(self, block):
+        self._announce(tip_message(block.index, block.hash))
+
+    def chain_rolled_back(self, height, removed):
+        self._announce(tip_message(height, None))
+
+    def transaction_added(self, tx):
+        with self._condition:
+            self._transactions.append(transaction_message(tx))
+            self._condition.notify()
+
+    def _announce(self, message):
+        with self._condition:
+            self._latest = message
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._latest is None and not self._transactions and not self._closed:
+                    self._condition.wait()
+                if self._latest is None and not self._transactions:
+                    return
+                messages = list(self._transactions)
+                if self._latest is not None:
+                    messages.append(self._latest)
+                self._transactions.clear()
+                self._latest = None
+            try:
+                self.notifier.send(messages)
+            except Exception as e:
+                logger.error(f"Error sending chain announcements: {str(e)}")
+
+    def close(self):
+        """Send any pending announcements, then stop the thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.notifier.close()
+
+
+class ChainFollower:
+    """
+    Keep a read-only blockchain in step with the writer.
+
+    Every tip announcement wakes the follower, which reads only the blocks above the
+    local tip. It also refreshes every ``interval`` seconds, so a missed announcement
+    only delays a worker instead of leaving it behind. Announced transactions are passed
+    straight to the blockchain's listeners.
+    """
+
+    def __init__(self, blockchain, interval=5.0):
+        self.blockchain = blockchain
+        self.interval = interval
+        self._wake = asyncio.Event()
+
+    def notify(self, message):
+        """Handle a decoded announcement; called on the event loop"""
+        if "transaction" in message:
+            self.blockchain.notify_transaction(transaction_from_dict(message["transaction"]))
+        else:
+            self._wake.set()
+
+    async def run(self):
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            self._wake.clear()
+            try:
+                appended = await asyncio.to_thread(self.blockchain.refresh)
+                if appended:
+                    logger.debug("Followed tip change", blocks=appended)
+            except Exception as e:
+                logger.error(f"Error following the chain: {str(e)}")
+
+
+class SocketTipSubscription:
+    """Receive tip announcements on a datagram socket in the shared directory"""
+
+    def __init__(self, directory, callback):
+        """
+        :param directory: Directory the notifier sends to
+        :param callback: Called with the decoded announcement on the event loop
+        """
+        self.directory = Path(directory)
+        self.callback = callback
+        self.path = self.directory / f"reader-{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+        self._socket = None
+
+    async def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._socket.bind(str(self.path))
+        asyncio.get_running_loop().add_reader(self._socket.fileno(), self._receive)
+
+    def _receive(self):
+        while True:
+            try:
+                message = self._socket.recv(4096)
+            except BlockingIOError:
+                return
+            self.callback(json.loads(message))
+
+    async def close(self):
+        if self._socket is not None:
+            asyncio.get_running_loop().remove_reader(self._socket.fileno())
+            self._socket.close()
+            with suppress(FileNotFoundError):
+                self.path.unlink()
+
+
+class PostgresTipSubscription:
+    """Receive tip announcements with LISTEN on a dedicated connection"""
+
+    def __init__(self, database_url, callback):
+        """
+        :param database_url: URL of the chain database
+        :param callback: Called with the decoded announcement on the event loop
+        """
+        from sqlalchemy.engine import make_url
+
+        url = make_url(database_url).set(drivername="postgresql")
+        self.dsn = url.render_as_string(hide_password=False)
+        self.callback = callback
+        self._connection = None
+
+    async def start(self):
+        import asyncpg
+
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(TIP_CHANNEL, self._receive)
+
+    def _receive(self, connection, pid, channel, payload):
+        self.callback(json.loads(payload))
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+
+
+def create_tip_subscription(callback):
+    """Subscribe to tip announcements over the transport chosen in the settings"""
+    if settings.TIP_NOTIFY == "socket":
+        return SocketTipSubscription(settings.TIP_SOCKET_DIR, callback)
+    return PostgresTipSubscription(settings.ASYNC_DATABASE_URL, callback)
+
+
+def create_tip_notifier():
+    """Create the notifier matching create_tip_subscription"""
+    if settings.TIP_NOTIFY == "socket":
+        return SocketTipNotifier(settings.TIP_SOCKET_DIR)
+    from sqlalchemy import create_engine
+
+    return PostgresTipNotifier(create_engine(settings.DATABASE_URL))
+
+
+class LocalChainWriter:
+    """Apply chain changes to a blockchain owned by this process"""
+
+    def __init__(self, blockchain):
+        self.blockchain = blockchain
+
+    async def add_transaction(self, tx):
+        """
+        Add a transaction to the pending pool.
+
+        :return: Index of the block that will include it
+        """
+        return self.blockchain.add_pending_transaction(tx)
+
+    async def add_transactions(self, transactions):
+        """
+        Add transactions to the pending pool together.
+
+        :return: Index of the block that will include them
+        """
+        return self.blockchain.add_pending_transactions(transactions)
+
+    async def mine(self, miner_address):
+        """
+        Mine the pending transactions without blocking the event loop.
+
+        :return: Height of the mined block
+        """
+        block = await asyncio.to_thread(self.blockchain.mine_pending_transactions, miner_address)
+        return block.index
+
+    async def pending(self):
+        """Get the transactions waiting to be mined"""
+        return list(self.blockchain.pending_transactions)
+
+
+class ChainServiceClient:
+    """Forward chain changes from a read-only worker to the chain service"""
+
+    def __init__(self, path, blockchain):
+        """
+        :param path: Unix socket the chain service listens on
+        :param blockchain: The worker's read-only blockchain, refreshed after mining
+        """
+        self.path = path
+        self.blockchain = blockchain
+
+    async def _call(self, method, **params):
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path, limit=MAX_MESSAGE_BYTES)
+        except OSError as e:
+            raise ChainServiceUnavailable(f"Chain service unavailable: {e}") from e
+        try:
+            writer.write(json.dumps({"method": method, "params": params}).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+        finally:
+            writer.close()
+            with suppress(OSError):
+                await writer.wait_closed()
+        if not line:
+            raise ChainServiceUnavailable("Chain service closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise ChainServiceError(response["error"])
+        return response["result"]
+
+    async def add_transaction(self, tx):
+        return await self._call("add_transaction", transaction=tx.to_dict())
+
+    async def add_transactions(self, transactions):
+        return await self._call(
+            "add_transactions", transactions=[tx.to_dict() for tx in transactions]
+        )
+
+    async def mine(self, miner_address):
+        height = await self._call("mine", miner_address=miner_address)
+        # Read your own writes instead of waiting for the announcement
+        await asyncio.to_thread(self.blockchain.refresh)
+        return height
+
+    async def pending(self):
+        return [transaction_from_dict(tx) for tx in await self._call("pending")]
+
+
+class ChainService:
+    """Serve forwarded chain changes over a Unix socket, one JSON request per line"""
+
+    def __init__(self, blockchain, path):
+        """
+        :param blockchain: The writable blockchain this process owns
+        :param path: Unix socket to listen on
+        """
+        self.writer = LocalChainWriter(blockchain)
+        self.path = Path(path)
+        self._server = None
+
+    async def start(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with suppress(FileNotFoundError):
+            self.path.unlink()
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=str(self.path), limit=MAX_MESSAGE_BYTES
+        )
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            with suppress(FileNotFoundError):
+                self.path.unlink()
+
+    async def _dispatch(self, method, params):
+        if method == "add_transaction":
+            return await self.writer.add_transaction(transaction_from_dict(params["transaction"]))
+        if method == "add_transactions":
+            return await self.writer.add_transactions(
+                [transaction_from_dict(tx) for tx in params["transactions"]]
+            )
+        if method == "mine":
+            return await self.writer.mine(params["miner_address"])
+        if method == "pending":
+            return [tx.to_dict() for tx in await self.writer.pending()]
+        raise ValueError(f"Unknown method {method}")
+
+    async def _handle(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    with tracing.span(f"chain_service.{request['method']}"):
+                        result = await self._dispatch(request["method"], request["params"])
+                    response = {"result": result}
+                except Exception as e:
+                    logger.warning(f"Rejected chain service request: {str(e)}")
+                    response = {"error": str(e)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve():
+    """Run the chain service until cancelled"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from api.database.models import Base
+
+    setup_logging(logger.name)
+    tracing.setup(
+        settings.TRACING, settings.TRACE_FILE, logger, service_name="ravenchain-chain-service"
+    )
+    engine = create_engine(settings.DATABASE_URL)
+    # The service may start before any API worker; create_all only adds missing tables
+    Base.metadata.create_all(engine)
+    blockchain = Blockchain(
+        sessionmaker(autocommit=False, autoflush=False, bind=engine),
+        resident_blocks=settings.RESIDENT_BLOCKS,
+        cache_bytes=settings.BLOCK_CACHE_BYTES,
+        prune_keep_blocks=settings.PRUNE_KEEP_BLOCKS,
+        prune_keep_bytes=settings.PRUNE_KEEP_BYTES,
+    )
+    analytics = None
+    if settings.ANALYTICS_ENABLED:
+        from ravenchain.analytics import TransactionColumns
+
+        # The single writer of the columns that reader workers map
+        analytics = TransactionColumns(settings.ANALYTICS_DIR)
+        blockchain.add_listener(analytics)
+    publisher = TipPublisher(create_tip_notifier())
+    blockchain.add_listener(publisher)
+    service = ChainService(blockchain, settings.CHAIN_SERVICE_SOCKET)
+    await service.start()
+    logger.info("Chain service started", socket=str(service.path), height=len(blockchain.chain))
+    try:
+        while True:
+            await asyncio.sleep(settings.PRUNE_INTERVAL)
+            if blockchain.pruning:
+                try:
+                    pruned = await asyncio.to_thread(blockchain.prune)
+                    if pruned:
+                        logger.info("Pruned block bodies", blocks=pruned)
+                except Exception as e:
+                    logger.error(f"Error pruning blocks: {str(e)}")
+    finally:
+        await service.close()
+        publisher.close()
+        if analytics is not None:
+            analytics.close()
+        blockchain.storage.close()
+        engine.dispose()
+
+
+def main():
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
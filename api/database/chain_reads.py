@@ -0,0 +1,71 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage.base import BlockPrunedError
+from ravenchain.storage.sql import (
+    LOAD_BATCH_SIZE,
+    SQLBlockStore,
+    build_blocks,
+    select_block_rows,
+    select_transaction_rows,
+)
+
+
+async def load_blocks(db: AsyncSession, start: int, end: int):
+    """Load the blocks in [start, end) from the database without blocking the event loop"""
+    block_rows = (await db.execute(select_block_rows(start, end, end - start))).all()
+    if not block_rows:
+        return []
+    tx_rows = await db.execute(select_transaction_rows([row.id for row in block_rows]))
+    return build_blocks(block_rows, tx_rows)
+
+
+async def iter_blocks(blockchain: Blockchain, db: AsyncSession, start: int = 0, end: int = None):
+    """
+    Iterate over blocks in [start, end), serving resident and cached blocks from memory.
+
+    Runs of blocks that are not in memory are fetched with one async query per batch and
+    added to the chain cache. Other storage backends are read through the chain loader.
+
+    :raises: BlockPrunedError if the range starts below the pruned height
+    """
+    chain = blockchain.chain
+    end = len(chain) if end is None else min(end, len(chain))
+    if start < blockchain.pruned_height and start < end:
+        raise BlockPrunedError(start, blockchain.pruned_height)
+    if not isinstance(blockchain.storage, SQLBlockStore):
+        for height in range(start, end):
+            yield chain[height]
+        return
+    height = start
+    while height < end:
+        block = chain.lookup(height)
+        if block is not None:
+            yield block
+            height += 1
+            continue
+        batch_end = min(end, height + LOAD_BATCH_SIZE)
+        blocks = await load_blocks(db, height, batch_end)
+        if not blocks:
+            raise LookupError(f"Block {height} not found in database")
+        for block in blocks:
+            chain.store(block)
+            yield block
+        height = blocks[-1].index + 1
+
+
+async def get_block(blockchain: Blockchain, db: AsyncSession, height: int):
+    """Get the block at a height, loading it asynchronously if it is not in memory"""
+    if height < 0:
+        height += len(blockchain.chain)
+    if height < blockchain.pruned_height:
+        raise BlockPrunedError(height, blockchain.pruned_height)
+    if not isinstance(blockchain.storage, SQLBlockStore):
+        return blockchain.chain[height]
+    block = blockchain.chain.lookup(height)
+    if block is None:
+        blocks = await load_blocks(db, height, height + 1)
+        if not blocks:
+            raise LookupError(f"Block {height} not found in database")
+        block = blocks[0]
+        blockchain.chain.store(block)
+    return block
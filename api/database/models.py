@@ -14,7 +14,7 @@ class TransactionDB(Base):
     amount = Column(Float)
     timestamp = Column(DateTime, default=datetime.now)
     signature = Column(LargeBinary)
-    block_id = Column(Integer, ForeignKey("blocks.id"))
+    block_id = Column(Integer, ForeignKey("blocks.id"), index=True)
 
 
 class BlockDB(Base):
@@ -24,8 +24,21 @@ class BlockDB(Base):
     timestamp = Column(DateTime, default=datetime.now)
     previous_hash = Column(String)
     nonce = Column(Integer)
-    hash = Column(String)
-    transactions = orm.relationship("TransactionDB", backref="block", lazy="joined")
+    hash = Column(String, unique=True, index=True)
+    transactions = orm.relationship("TransactionDB", backref="block", lazy="selectin")
+
+
+class BalanceDB(Base):
+    __tablename__ = "balances"
+    address = Column(String, primary_key=True)
+    amount = Column(Float, nullable=False)
+
+
+class ChainStateDB(Base):
+    __tablename__ = "chain_state"
+    id = Column(Integer, primary_key=True)
+    height = Column(Integer, nullable=False)  # Last block included in the balances table
+    pruned_height = Column(Integer, nullable=False, default=0)  # Bodies below are deleted
 
 
 class User(Base):
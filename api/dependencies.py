@@ -1,25 +1,93 @@
+from fastapi import Depends, HTTPException, Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from config.settings import settings
 from config.logging import setup_logging
-from ravenchain import Blockchain
+from api.chain_service import ChainServiceClient, LocalChainWriter
+from api.live_feed import LiveFeed
+from api.metrics import STORAGE_SECONDS, TimedSQLBlockStore
+from api.rate_limit import SharedMemoryStorage  # noqa: F401 - registers shm:// storage
+from api.response_cache import BlockResponseCache
+from api.verification import SignatureVerifier
+from ravenchain import Blockchain, tracing
 import os
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-# Create a single limiter instance to be shared across the application
-limiter = Limiter(key_func=get_remote_address, default_limits=["10/minute"])
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Key requests by the authenticated user, or by client address for anonymous requests.
+
+    Users behind one address get separate limits, and a user cannot dodge a limit by
+    switching addresses.
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return f"user:{user.id}"
+    return get_remote_address(request)
+
+
+# Create a single limiter instance to be shared across the application. The storage is
+# shared by all workers on the host by default; a redis:// URI shares it across hosts.
+limiter = Limiter(
+    key_func=rate_limit_key,
+    default_limits=["10/minute"],
+    storage_uri=settings.RATE_LIMIT_STORAGE,
+)
 
 
 # Setup logging
 logger = setup_logging(
     "ravenchain.api", json_output=os.getenv("LOG_JSON", "0") == "1", console_output=True
 )
+tracing.setup(settings.TRACING, settings.TRACE_FILE, logger, service_name="ravenchain-api")
+
+
+def create_async_db_engine(
+    url,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    query_timeout=settings.DB_QUERY_TIMEOUT,
+):
+    """
+    Create an async engine with a bounded connection pool and per-query timeouts.
+
+    :param url: Async database URL, e.g. postgresql+asyncpg://... or sqlite+aiosqlite://...
+    :param pool_size: Number of connections kept open in the pool
+    :param max_overflow: Extra connections allowed above pool_size under load
+    :param query_timeout: Seconds a single statement may run before it is cancelled
+    """
+    url = make_url(url)
+    options = {"pool_pre_ping": True}
+    connect_args = {}
+    if url.get_backend_name() == "postgresql":
+        connect_args["command_timeout"] = query_timeout
+        options.update(pool_size=pool_size, max_overflow=max_overflow)
+    elif url.get_backend_name() == "sqlite":
+        connect_args["timeout"] = query_timeout
+        if url.database and url.database != ":memory:":
+            options.update(pool_size=pool_size, max_overflow=max_overflow)
+    return create_async_engine(url, connect_args=connect_args, **options)
+
 
 # Database setup
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async database setup used by the request handlers
+async_engine = create_async_db_engine(settings.ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_async_db():
+    """Get an async database session for the duration of a request"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
 # Initialize blockchain
 blockchain = None
 
@@ -29,7 +97,16 @@ def initialize_blockchain():
     global blockchain
     if blockchain is None:
         logger.info("Initializing blockchain")
-        blockchain = Blockchain(SessionLocal)
+        with STORAGE_SECONDS.labels("load_chain").time():
+            blockchain = Blockchain(
+                SessionLocal,
+                resident_blocks=settings.RESIDENT_BLOCKS,
+                cache_bytes=settings.BLOCK_CACHE_BYTES,
+                storage=TimedSQLBlockStore(SessionLocal),
+                prune_keep_blocks=settings.PRUNE_KEEP_BLOCKS,
+                prune_keep_bytes=settings.PRUNE_KEEP_BYTES,
+                read_only=settings.CHAIN_ROLE == "reader",
+            )
     return blockchain
 
 
@@ -38,3 +115,74 @@ def get_blockchain():
     if blockchain is None:
         return initialize_blockchain()
     return blockchain
+
+
+def get_chain_writer(blockchain: Blockchain = Depends(get_blockchain)):
+    """Get where chain changes go: this process, or the chain service for reader workers"""
+    if blockchain.read_only:
+        return ChainServiceClient(settings.CHAIN_SERVICE_SOCKET, blockchain)
+    return LocalChainWriter(blockchain)
+
+
+# Encoded block payloads shared by the block endpoints
+response_cache = BlockResponseCache(settings.RESPONSE_CACHE_BYTES)
+
+
+def get_response_cache():
+    """Get the block response cache"""
+    return response_cache
+
+
+# Pushes chain and mempool events to WebSocket subscribers
+live_feed = LiveFeed(settings.LIVE_FEED_MAX_SUBSCRIBERS)
+
+
+def get_live_feed():
+    """Get the live block and mempool feed"""
+    return live_feed
+
+
+# Verifies the signatures of submitted transaction batches
+signature_verifier = SignatureVerifier(settings.SIGNATURE_VERIFY_WORKERS)
+
+
+def get_signature_verifier():
+    """Get the transaction signature verifier"""
+    return signature_verifier
+
+
+# Columnar transaction projection, only built when analytics is enabled
+analytics = None
+
+
+def initialize_analytics(chain):
+    """
+    Open the transaction columns and keep them in step with the blockchain.
+
+    Only the process that writes the chain writes the columns; reader workers map the
+    columns the chain service writes and pick up its changes when they query them.
+    """
+    global analytics
+    if analytics is None and settings.ANALYTICS_ENABLED:
+        from ravenchain.analytics import TransactionColumns
+
+        logger.info("Initializing chain analytics", path=settings.ANALYTICS_DIR)
+        if chain.read_only:
+            analytics = TransactionColumns(settings.ANALYTICS_DIR, read_only=True)
+        else:
+            analytics = TransactionColumns(settings.ANALYTICS_DIR)
+            chain.add_listener(analytics)
+    return analytics
+
+
+def close_analytics():
+    """Write out queued analytics updates and stop the writer thread"""
+    if analytics is not None:
+        analytics.close()
+
+
+def get_analytics():
+    """Get the transaction columns, or fail when analytics is not enabled"""
+    if analytics is None:
+        raise HTTPException(status_code=503, detail="Chain analytics is not enabled")
+    return analytics
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import threading
+from ravenchain.blockchain import ChainListener
+
+BLOCKS = "blocks"
+MEMPOOL = "mempool"
+
+# What happens to a subscriber whose queue is full
+DROP_OLDEST = "drop"
+DISCONNECT = "disconnect"
+
+
+def transaction_event(tx):
+    """Compact description of a transaction, without its signature"""
+    return {
+        "sender": tx.sender,
+        "recipient": tx.recipient,
+        "amount": tx.amount,
+        "timestamp": tx.timestamp.isoformat(),
+    }
+
+
+def involves(tx, addresses):
+    """Whether a transaction sends from or pays to one of the addresses"""
+    return tx.sender in addresses or tx.recipient in addresses
+
+
+class Subscriber:
+    """
+    One connected client of the live feed.
+
+    Events are queued on the client's event loop. When the queue is full the oldest
+    event is dropped, or under the disconnect policy the subscriber is closed, so a slow
+    client never makes the feed buffer without limit.
+    """
+
+    def __init__(self, topic, addresses=(), max_queue=100, overflow=DROP_OLDEST):
+        """
+        :param topic: BLOCKS or MEMPOOL
+        :param addresses: Only send events involving these addresses; empty for all events
+        :param max_queue: Number of undelivered events kept for the client
+        :param overflow: DROP_OLDEST or DISCONNECT
+        """
+        self.topic = topic
+        self.addresses = frozenset(addresses)
+        self.overflow = overflow
+        self.queue = asyncio.Queue(max_queue)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, message):
+        """Queue an encoded event; must run on the subscriber's loop"""
+        if self.closed:
+            return
+        if self.queue.full():
+            if self.overflow == DISCONNECT:
+                self.close()
+                return
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    def close(self):
+        """Stop the subscriber; ``next_event`` then returns None"""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def next_event(self):
+        """Wait for the next encoded event, or None once the subscriber was closed"""
+        return await self.queue.get()
+
+
+class LiveFeed(ChainListener):
+    """
+    Fan out connected blocks, rollbacks and admitted transactions to subscribers.
+
+    Chain listeners run on whichever thread changed the chain, so events are encoded
+    there once per distinct payload and handed to each subscriber's event loop. With no
+    subscribers a chain change costs one dictionary lookup.
+    """
+
+    def __init__(self, max_subscribers=1000):
+        """
+        :param max_subscribers: Number of clients served at once across both topics
+        """
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = {BLOCKS: set(), MEMPOOL: set()}
+        self.delivered = 0
+
+    def subscribe(self, subscriber):
+        """
+        Register a subscriber.
+
+        :return: False if the feed is already serving max_subscribers clients
+        """
+        with self._lock:
+            if sum(map(len, self._subscribers.values())) >= self.max_subscribers:
+                return False
+            self._subscribers[subscriber.topic].add(subscriber)
+            return True
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers[subscriber.topic].discard(subscriber)
+
+    def _targets(self, topic):
+        with self._lock:
+            return list(self._subscribers[topic])
+
+    def _deliver(self, subscriber, message):
+        self.delivered += 1
+        subscriber.loop.call_soon_threadsafe(subscriber.offer, message)
+
+    def block_connected(self, block):
+        subscribers = self._targets(BLOCKS)
+        if not subscribers:
+            return
+        event = {
+            "type": "block",
+            "height": block.index,
+            "hash": block.hash,
+            "previous_hash": block.previous_hash,
+            "timestamp": block.timestamp.isoformat(),
+            "transactions": len(block.data),
+        }
+        unfiltered = None
+        for subscriber in subscribers:
+            if not subscriber.addresses:
+                unfiltered = unfiltered or json.dumps(event)
+                self._deliver(subscriber, unfiltered)
+                continue
+            matches = [
+                transaction_event(tx) for tx in block.data if involves(tx, subscriber.addresses)
+            ]
+            if matches:
+                self._deliver(subscriber, json.dumps({**event, "matches": matches}))
+
+    def chain_rolled_back(self, height, removed):
+        subscribers = self._targets(BLOCKS)
+        if not subscribers:
+            return
+        message = json.dumps(
+            {"type": "rollback", "height": height, "removed": [block.hash for block in removed]}
+        )
+        # Filtered clients also need to know their confirmations may be undone
+        for subscriber in subscribers:
+            self._deliver(subscriber, message)
+
+    def transaction_added(self, tx):
+        subscribers = self._targets(MEMPOOL)
+        if not subscribers:
+            return
+        message = json.dumps({"type": "transaction", **transaction_event(tx)})
+        for subscriber in subscribers:
+            if not subscriber.addresses or involves(tx, subscriber.addresses):
+                self._deliver(subscriber, message)
+
+    def stats(self):
+        """Get subscriber counts for monitoring"""
+        with self._lock:
+            return {
+                "blocks_subscribers": len(self._subscribers[BLOCKS]),
+                "mempool_subscribers": len(self._subscribers[MEMPOOL]),
+                "delivered": self.delivered,
+                "dropped": sum(
+                    subscriber.dropped
+                    for subscribers in self._subscribers.values()
+                    for subscriber in subscribers
+                ),
+            }
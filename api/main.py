@@ -1,26 +1,150 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import inspect, text
-from api.routes import block_routes, mining_routes, transaction_routes, wallet_routes, auth_routes
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import text
+from api.routes import (
+    analytics_routes,
+    auth_routes,
+    block_routes,
+    live_routes,
+    mining_routes,
+    transaction_routes,
+    wallet_routes,
+)
 from api.database.models import Base
-from api.dependencies import engine, logger, initialize_blockchain, limiter
+from api.dependencies import (
+    AsyncSessionLocal,
+    async_engine,
+    close_analytics,
+    engine,
+    get_blockchain,
+    get_chain_writer,
+    logger,
+    initialize_analytics,
+    initialize_blockchain,
+    limiter,
+    live_feed,
+    response_cache,
+    signature_verifier,
+)
 from config.settings import settings
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi import _rate_limit_exceeded_handler
-from api.auth.utils import get_current_active_user
+from api.auth.hashing import HasherOverloaded
+from api.request_tracing import TracingMiddleware
+from api.chain_service import (
+    ChainFollower,
+    ChainServiceUnavailable,
+    create_tip_notifier,
+    create_tip_subscription,
+)
+from api.auth.utils import (
+    get_current_active_user,
+    last_seen,
+    password_hasher,
+    token_cache,
+    user_cache,
+    user_invalidations,
+)
+from api.metrics import (
+    ChainMetrics,
+    MetricsMiddleware,
+    mark_worker_stopped,
+    record_cache_stats,
+    record_mempool,
+    render_metrics,
+)
+
+
+async def prune_periodically(blockchain, interval):
+    """Delete old block bodies in the background on pruned nodes"""
+    while True:
+        try:
+            pruned = await asyncio.to_thread(blockchain.prune)
+            if pruned:
+                logger.info(
+                    "Pruned block bodies", blocks=pruned, pruned_height=blockchain.pruned_height
+                )
+        except Exception as e:
+            logger.error(f"Error pruning blocks: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+async def flush_last_seen():
+    """Write the buffered last_login times of authenticated users"""
+    try:
+        async with AsyncSessionLocal() as session:
+            await last_seen.flush(session)
+    except Exception as e:
+        logger.error(f"Error writing last login times: {str(e)}")
+
+
+async def flush_last_seen_periodically(interval):
+    """Batch last_login updates instead of writing on every authenticated request"""
+    while True:
+        await asyncio.sleep(interval)
+        await flush_last_seen()
+
+
+def metric_caches(blockchain):
+    """Caches of this worker whose hit rates are exported"""
+    return {
+        "blocks": blockchain.chain,
+        "responses": response_cache,
+        "tokens": token_cache,
+        "users": user_cache,
+    }
+
+
+async def record_metrics_periodically(blockchain, interval):
+    """Keep every worker's cache statistics current, not only the one serving /metrics"""
+    while True:
+        await asyncio.sleep(interval)
+        record_cache_stats(metric_caches(blockchain))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up application")
+    pruner = None
+    last_seen_writer = None
+    follower = None
+    metrics_recorder = None
+    tip_subscription = None
     try:
-        if not inspect(engine).has_table("blocks"):
-            logger.info("Creating database tables")
-            Base.metadata.create_all(engine)
+        # create_all only adds missing tables, e.g. the pruning state on older databases
+        Base.metadata.create_all(engine)
         # Initialize blockchain
-        initialize_blockchain()
+        blockchain = initialize_blockchain()
+        initialize_analytics(blockchain)
+        blockchain.add_listener(response_cache)
+        blockchain.add_listener(live_feed)
+        blockchain.add_listener(ChainMetrics())
+        if blockchain.read_only:
+            # The chain service writes; this worker follows its tip announcements
+            chain_follower = ChainFollower(blockchain, settings.CHAIN_REFRESH_INTERVAL)
+
+            def announced(message):
+                if not user_invalidations.handle(message):
+                    chain_follower.notify(message)
+
+            tip_subscription = create_tip_subscription(announced)
+            await tip_subscription.start()
+            # Other workers cache users too; changes made here are announced to them
+            user_invalidations.notifier = create_tip_notifier()
+            follower = asyncio.create_task(chain_follower.run())
+        elif blockchain.pruning:
+            pruner = asyncio.create_task(prune_periodically(blockchain, settings.PRUNE_INTERVAL))
+        last_seen_writer = asyncio.create_task(
+            flush_last_seen_periodically(settings.LAST_SEEN_FLUSH_INTERVAL)
+        )
+        metrics_recorder = asyncio.create_task(
+            record_metrics_periodically(blockchain, settings.METRICS_SAMPLE_INTERVAL)
+        )
         logger.info("Application startup complete")
         yield
     except Exception as e:
@@ -29,8 +153,22 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown: Properly close all resources
         logger.info("Shutting down application")
+        for task in (pruner, last_seen_writer, follower, metrics_recorder):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        await flush_last_seen()
+        password_hasher.shutdown()
+        signature_verifier.shutdown()
+        close_analytics()
+        user_invalidations.close()
+        mark_worker_stopped()
+        if tip_subscription is not None:
+            await tip_subscription.close()
         try:
             engine.dispose()
+            await async_engine.dispose()
             logger.info("Database connections closed")
         except Exception as e:
             logger.error(f"Error disposing engine: {str(e)}")
@@ -46,6 +184,25 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+@app.exception_handler(ChainServiceUnavailable)
+async def chain_service_unavailable_handler(request: Request, exc: ChainServiceUnavailable):
+    """Reader workers cannot change the chain while the chain service is down"""
+    logger.error(f"Chain service unavailable: {str(exc)}")
+    return JSONResponse(status_code=503, content={"detail": "Chain service unavailable"})
+
+
+@app.exception_handler(HasherOverloaded)
+async def hasher_overloaded_handler(request: Request, exc: HasherOverloaded):
+    """Shed password hashing load instead of queueing it without bound"""
+    logger.warning("Rejected request, password hashing overloaded", in_flight=exc.in_flight)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Add middlewares
 app.add_middleware(
     CORSMiddleware,
@@ -55,15 +212,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(TracingMiddleware)
+# Added last so request latency includes the other middlewares
+app.add_middleware(MetricsMiddleware)
+
+
+# Probes are frequent, so this logger is rate limited by default (LOG_RATE_LIMITS)
+health_logger = logging.getLogger("ravenchain.api.health")
 
 
 @app.get("/api/health", tags=["health"])
 @limiter.limit("5/minute")
 async def health_check(request: Request):
-    logger.info("Health check endpoint called")
+    health_logger.info("Health check endpoint called")
     return {"status": "healthy"}
 
 
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+@limiter.exempt
+async def metrics(
+    request: Request,
+    blockchain=Depends(get_blockchain),
+    chain_writer=Depends(get_chain_writer),
+):
+    """Prometheus metrics of all workers on this host"""
+    record_cache_stats(metric_caches(blockchain))
+    try:
+        record_mempool(await chain_writer.pending())
+    except ChainServiceUnavailable:
+        logger.warning("Chain service unavailable, mempool metrics not updated")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
 app.include_router(auth_routes.authRouter, prefix=settings.API_PREFIX, tags=["auth"])
 app.include_router(
     block_routes.blockRouter,
@@ -71,6 +252,8 @@ app.include_router(
     tags=["blocks"],
     dependencies=[Depends(get_current_active_user)],
 )
+# WebSocket routes authenticate through get_websocket_user instead
+app.include_router(live_routes.liveRouter, prefix=settings.API_PREFIX, tags=["live"])
 app.include_router(
     mining_routes.miningRouter,
     prefix=settings.API_PREFIX,
@@ -83,6 +266,12 @@ app.include_router(
     tags=["transactions"],
     dependencies=[Depends(get_current_active_user)],
 )
+app.include_router(
+    analytics_routes.analyticsRouter,
+    prefix=settings.API_PREFIX,
+    tags=["analytics"],
+    dependencies=[Depends(get_current_active_user)],
+)
 app.include_router(
     wallet_routes.walletRouter,
     prefix=settings.API_PREFIX,
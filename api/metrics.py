@@ -0,0 +1,264 @@
+"""
+Prometheus metrics for the API workers.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` names a directory, every worker process writes its
+values to memory-mapped files there and ``/metrics`` reports all workers of the host
+together: counters and histograms are summed, and each gauge uses the aggregation noted
+where it is defined. The directory must be empty when the server starts. Without it the
+metrics cover the serving process only.
+
+Hot paths only touch counters and histograms. Caches already count their hits and misses,
+so those counts are copied into gauges periodically and at scrape time rather than being
+counted a second time.
+"""
+
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from ravenchain import codec
+from ravenchain.blockchain import ChainListener
+from ravenchain.storage.base import GROUP_COMMIT_SIZE
+from ravenchain.storage.sql import SQLBlockStore
+
+MULTIPROCESS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROCESS_DIR:
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+
+# Reader workers all follow the same chain, so the highest live value is the tip
+CHAIN_HEIGHT = Gauge(
+    "ravenchain_chain_height", "Height of the chain tip", multiprocess_mode="livemax"
+)
+BLOCK_INTERVAL = Gauge(
+    "ravenchain_block_interval_seconds",
+    "Time between the two most recent blocks",
+    multiprocess_mode="mostrecent",
+)
+HASHRATE = Gauge(
+    "ravenchain_hashrate",
+    "Hashes per second implied by the difficulty and the most recent block interval",
+    multiprocess_mode="mostrecent",
+)
+MEMPOOL_TRANSACTIONS = Gauge(
+    "ravenchain_mempool_transactions",
+    "Transactions waiting to be mined",
+    multiprocess_mode="mostrecent",
+)
+MEMPOOL_BYTES = Gauge(
+    "ravenchain_mempool_bytes",
+    "Encoded size of the transactions waiting to be mined",
+    multiprocess_mode="mostrecent",
+)
+SIGNATURE_VERIFICATIONS = Counter(
+    "ravenchain_signature_verifications",
+    "Submitted transaction signatures verified",
+    ["result"],
+)
+STORAGE_SECONDS = Histogram(
+    "ravenchain_storage_seconds",
+    "Latency of block storage operations",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "ravenchain_http_request_duration_seconds",
+    "Latency of HTTP requests by route template",
+    ["method", "route"],
+)
+HTTP_REQUESTS = Counter(
+    "ravenchain_http_requests",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+# Each live worker reports the totals of its own caches since it started
+CACHE_HITS = Gauge(
+    "ravenchain_cache_hits",
+    "Cache lookups answered from the cache",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+CACHE_MISSES = Gauge(
+    "ravenchain_cache_misses",
+    "Cache lookups that missed",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+
+class ChainMetrics(ChainListener):
+    """Track the tip height, the latest block interval and the hashrate it implies"""
+
+    def __init__(self):
+        self.difficulty = 0
+        self._tip_timestamp = None
+
+    def attached(self, blockchain):
+        self.difficulty = blockchain.difficulty
+        height = len(blockchain.chain)
+        if height:
+            CHAIN_HEIGHT.set(height - 1)
+            self._tip_timestamp = blockchain.chain.header(height - 1).timestamp
+
+    def block_connected(self, block):
+        CHAIN_HEIGHT.set(block.index)
+        if self._tip_timestamp is not None:
+            interval = (block.timestamp - self._tip_timestamp).total_seconds()
+            if interval > 0:
+                BLOCK_INTERVAL.set(interval)
+                # Each attempt matches the hex-zero prefix with probability 16^-difficulty
+                HASHRATE.set(16**self.difficulty / interval)
+        self._tip_timestamp = block.timestamp
+
+    def chain_rolled_back(self, height, removed):
+        CHAIN_HEIGHT.set(height)
+        # The new tip's timestamp is unknown here, so skip the next interval
+        self._tip_timestamp = None
+
+
+class TimedSQLBlockStore(SQLBlockStore):
+    """
+    SQL block store that records how long saves and loads take.
+
+    It is a subclass rather than a wrapper so that code checking for an SQLBlockStore,
+    such as the async block reads of the API, still recognises it.
+    """
+
+    def append_blocks(self, blocks, group_commit_size=GROUP_COMMIT_SIZE):
+        with STORAGE_SECONDS.labels("append_blocks").time():
+            return super().append_blocks(blocks, group_commit_size)
+
+    def load_headers(self, start=0, end=None):
+        with STORAGE_SECONDS.labels("load_headers").time():
+            return super().load_headers(start, end)
+
+    def load_block(self, height):
+        with STORAGE_SECONDS.labels("load_block").time():
+            # Read through the untimed iterator so the load is not also counted there
+            return next(iter(super().iter_blocks(height, height + 1)), None)
+
+    def load_block_by_hash(self, block_hash):
+        with STORAGE_SECONDS.labels("load_block_by_hash").time():
+            return super().load_block_by_hash(block_hash)
+
+    def iter_blocks(self, start=0, end=None):
+        """Yield the stored blocks, timing only the time spent reading them"""
+        blocks = iter(super().iter_blocks(start, end))
+        elapsed = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    block = next(blocks)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - started
+                yield block
+        finally:
+            STORAGE_SECONDS.labels("iter_blocks").observe(elapsed)
+
+
+def route_template(scope):
+    """
+    Get the path of a routed request with its path parameters replaced by their names.
+
+    Routes of included routers only know their path below the router prefix, so the
+    template is rebuilt from the request path instead.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    if not names:
+        return scope["path"]
+    return "/".join(
+        f"{{{names[segment]}}}" if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting HTTP requests and their latency per route template.
+
+    Routes are labelled by their template, e.g. ``/api/v1/blocks/{block_hash}``, so the
+    number of series stays bounded; requests matching no route share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            path = route_template(scope)
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, path).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, path, str(status)).inc()
+
+
+def record_signature_verifications(valid, invalid):
+    """Count a verified batch of transaction signatures"""
+    if valid:
+        SIGNATURE_VERIFICATIONS.labels("valid").inc(valid)
+    if invalid:
+        SIGNATURE_VERIFICATIONS.labels("invalid").inc(invalid)
+
+
+def record_cache_stats(caches):
+    """
+    Copy the hit and miss counts of this worker's caches into the cache gauges.
+
+    :param caches: Dictionary mapping cache names to objects whose ``stats()`` include
+        "hits" and "misses"
+    """
+    for name, cache in caches.items():
+        stats = cache.stats()
+        CACHE_HITS.labels(name).set(stats["hits"])
+        CACHE_MISSES.labels(name).set(stats["misses"])
+
+
+def record_mempool(transactions):
+    """Set the mempool gauges from the transactions waiting to be mined"""
+    MEMPOOL_TRANSACTIONS.set(len(transactions))
+    MEMPOOL_BYTES.set(sum(len(codec.encode_transaction(tx)) for tx in transactions))
+
+
+def render_metrics():
+    """
+    Encode the metrics of every worker in the Prometheus text format.
+
+    :return: (body, content type) tuple
+    """
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_stopped():
+    """Drop the live gauges of this worker from the aggregate"""
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,199 @@
+"""
+Rate-limit counters shared by every worker process on a host.
+
+``SharedMemoryStorage`` is a ``limits`` storage backend registered for ``shm://`` URIs. It
+keeps fixed-window counters in a hash table inside a memory-mapped file, so all uvicorn
+workers that map the same file enforce one limit together, and the counts survive a worker
+restart. The table is split into stripes that are locked independently with byte-range
+locks; a key lives in one stripe, so an increment takes one lock and touches a bounded
+number of slots.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from limits.storage import Storage
+
+SCHEME = "shm"
+MAGIC = b"RVRL"
+VERSION = 1
+# magic, version, stripes, slots per stripe
+HEADER = struct.Struct("<4sHII")
+HEADER_SIZE = 64
+# key digest, count, expiry as a Unix time
+SLOT = struct.Struct("<16sqd")
+EMPTY_KEY = bytes(16)
+
+DEFAULT_STRIPES = 64
+DEFAULT_SLOTS_PER_STRIPE = 256
+
+
+class SharedMemoryStorage(Storage):
+    """
+    Fixed-window rate-limit counters in a file-backed shared hash table.
+
+    Each stripe is an open-addressing table probed linearly from the key's home slot.
+    Expired slots are reused, and when a stripe is full the counter closest to expiry is
+    evicted, so a table sized well below the number of active keys undercounts rather
+    than fails. Counters use wall-clock expiry times because they are shared between
+    processes.
+    """
+
+    STORAGE_SCHEME = [SCHEME]
+
+    def __init__(
+        self,
+        uri: str = None,
+        wrap_exceptions: bool = False,
+        stripes: int = DEFAULT_STRIPES,
+        slots_per_stripe: int = DEFAULT_SLOTS_PER_STRIPE,
+        **options,
+    ):
+        """
+        :param uri: ``shm://<path>`` of the table file, created if missing
+        :param stripes: Number of independently locked stripes of a new table
+        :param slots_per_stripe: Number of counters per stripe of a new table
+        """
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = Path(uri.split("://", 1)[1])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < HEADER_SIZE:
+                stripes, slots_per_stripe = int(stripes), int(slots_per_stripe)
+                os.ftruncate(self._fd, HEADER_SIZE + stripes * slots_per_stripe * SLOT.size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, VERSION, stripes, slots_per_stripe), 0)
+            magic, version, stripes, slots_per_stripe = HEADER.unpack(
+                os.pread(self._fd, HEADER.size, 0)
+            )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path} is not a rate-limit table")
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        # The existing table's geometry wins, so every worker agrees on it
+        self.stripes = stripes
+        self.slots_per_stripe = slots_per_stripe
+        self._map = mmap.mmap(self._fd, HEADER_SIZE + stripes * slots_per_stripe * SLOT.size)
+        # fcntl locks only exclude other processes, so threads also take a local lock
+        self._thread_locks = [threading.Lock() for _ in range(stripes)]
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    @contextmanager
+    def _locked(self, stripe):
+        with self._thread_locks[stripe]:
+            # Byte-range lock on one header byte per stripe
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+    def _locate(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return digest, int.from_bytes(digest[:4], "little") % self.stripes
+
+    def _find(self, digest, stripe, now):
+        """
+        Find the slot of a key in its stripe.
+
+        :return: (offset, count, expiry) of the key's slot, with a zero count when the key
+            is missing or expired, and the offset of the slot to claim for it then
+        """
+        base = HEADER_SIZE + stripe * self.slots_per_stripe * SLOT.size
+        home = int.from_bytes(digest[4:8], "little")
+        reusable = oldest = None
+        oldest_expiry = float("inf")
+        for i in range(self.slots_per_stripe):
+            offset = base + (home + i) % self.slots_per_stripe * SLOT.size
+            slot_key, count, expiry = SLOT.unpack_from(self._map, offset)
+            if slot_key == digest:
+                return (offset, count, expiry) if expiry > now else (offset, 0, 0.0)
+            if slot_key == EMPTY_KEY:
+                return (offset if reusable is None else reusable), 0, 0.0
+            if expiry <= now:
+                if reusable is None:
+                    reusable = offset
+            elif expiry < oldest_expiry:
+                oldest, oldest_expiry = offset, expiry
+        return (oldest if reusable is None else reusable), 0, 0.0
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """
+        Atomically increment the counter of a rate limit key.
+
+        :param key: the key to increment
+        :param expiry: seconds until a new counter expires
+        :param amount: the number to increment by
+        :return: the new count
+        """
+        digest, stripe = self._locate(key)
+        now = time.time()
+        with self._locked(stripe):
+            offset, count, expires = self._find(digest, stripe, now)
+            if not count:
+                expires = now + expiry
+            count += amount
+            SLOT.pack_into(self._map, offset, digest, count, expires)
+        return count
+
+    def get(self, key: str) -> int:
+        """
+        :param key: the key to get the counter value for
+        """
+        digest, stripe = self._locate(key)
+        with self._locked(stripe):
+            return self._find(digest, stripe, time.time())[1]
+
+    def get_expiry(self, key: str) -> float:
+        """
+        :param key: the key to get the expiry for
+        """
+        digest, stripe = self._locate(key)
+        now = time.time()
+        with self._locked(stripe):
+            _, count, expires = self._find(digest, stripe, now)
+        return expires if count else now
+
+    def check(self) -> bool:
+        return not self._map.closed
+
+    def reset(self) -> int:
+        """Clear every counter in the table, for all workers"""
+        now = time.time()
+        cleared = 0
+        for stripe in range(self.stripes):
+            base = HEADER_SIZE + stripe * self.slots_per_stripe * SLOT.size
+            size = self.slots_per_stripe * SLOT.size
+            with self._locked(stripe):
+                for offset in range(base, base + size, SLOT.size):
+                    slot_key, _, expiry = SLOT.unpack_from(self._map, offset)
+                    cleared += slot_key != EMPTY_KEY and expiry > now
+                self._map[base : base + size] = bytes(size)
+        return cleared
+
+    def clear(self, key: str) -> None:
+        """
+        :param key: the key to clear rate limits for
+        """
+        digest, stripe = self._locate(key)
+        with self._locked(stripe):
+            offset, count, _ = self._find(digest, stripe, time.time())
+            if count:
+                # Keep the key in its slot so the probe chains through it stay intact
+                SLOT.pack_into(self._map, offset, digest, 0, 0.0)
+
+    def close(self):
+        """Unmap the table and close its file"""
+        if not self._map.closed:
+            self._map.close()
+            os.close(self._fd)
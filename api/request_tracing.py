@@ -0,0 +1,35 @@
+from api.metrics import route_template
+from ravenchain import tracing
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening the root span of each request's trace.
+
+    Spans opened while the request is handled, including those of mining and verification
+    running on worker threads, become its children. With tracing disabled requests pass
+    straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing.enabled():
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with tracing.span(scope["method"], path=scope["path"]) as current:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # The route is only known once the request was routed
+                current.name = f"{scope['method']} {route_template(scope)}"
+                current.set_attribute("status", status)
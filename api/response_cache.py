@@ -0,0 +1,166 @@
+import threading
+from collections import OrderedDict
+from api import serialization
+from ravenchain import codec
+from ravenchain.blockchain import ChainListener
+
+JSON = "application/json"
+OCTET_STREAM = "application/octet-stream"
+# Representation of header-only listings, which are JSON without transaction payloads
+HEADERS_ONLY = "headers"
+
+# Short ETag suffix per representation, so the bodies of a block never share a tag
+REPRESENTATIONS = {JSON: "json", OCTET_STREAM: "bin", HEADERS_ONLY: "headers"}
+
+# Sent with responses addressed by block hash, whose content can never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Sent with responses whose content moves with the tip; clients revalidate with the ETag
+REVALIDATE = "no-cache"
+
+ENCODERS = {JSON: serialization.encode_block, OCTET_STREAM: codec.encode_block}
+
+
+def join_payloads(payloads, media_type):
+    """
+    Combine encoded blocks into the body of a block list.
+
+    :param payloads: Encoded blocks in height order
+    :param media_type: JSON or OCTET_STREAM
+    :return: A JSON array, or the framing written by ``codec.encode_blocks``
+    """
+    if media_type == JSON:
+        return b"[" + b",".join(payloads) + b"]"
+    return codec.frame_blocks(payloads)
+
+
+def block_etag(block_hash, media_type):
+    """Strong ETag of one block in one representation"""
+    return f'"{block_hash}.{REPRESENTATIONS[media_type]}"'
+
+
+def page_etag(last_hash, count, media_type):
+    """
+    Strong ETag of a run of consecutive blocks.
+
+    Every block commits to its predecessor's hash, so the last hash and the number of
+    blocks identify the whole run.
+    """
+    return f'"{last_hash}.{count}.{REPRESENTATIONS[media_type]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Check an If-None-Match header against an ETag.
+
+    :param if_none_match: Header value, or None when the header is missing
+    :param etag: Current ETag of the resource
+    :return: True if the client's copy is current and a 304 can be sent
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+class BlockResponseCache(ChainListener):
+    """
+    LRU cache of encoded block payloads keyed by block hash and media type.
+
+    A block's hash commits to its entire content, so an entry never goes stale. Entries
+    are only dropped when the cache exceeds its byte budget or when a reorg removes the
+    block from the chain.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        """
+        :param max_bytes: Total payload bytes kept before the least recently used are evicted
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, block_hash, media_type):
+        """
+        Look up the encoded payload of a block.
+
+        :param block_hash: Hash of the block
+        :param media_type: JSON or OCTET_STREAM
+        :return: Encoded bytes, or None on a miss
+        """
+        key = (block_hash, media_type)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, block, media_type):
+        """
+        Encode a block and cache the payload.
+
+        :param block: Block to encode
+        :param media_type: JSON or OCTET_STREAM
+        :return: Encoded bytes
+        """
+        payload = ENCODERS[media_type](block)
+        if len(payload) > self.max_bytes:
+            return payload
+        key = (block.hash, media_type)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return payload
+
+    def payload(self, block, media_type):
+        """Get the cached payload of a block, encoding and caching it on a miss"""
+        return self.get(block.hash, media_type) or self.put(block, media_type)
+
+    def record_not_modified(self):
+        """Count a conditional request answered with 304"""
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, block_hashes):
+        """Drop every representation of some blocks"""
+        block_hashes = set(block_hashes)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in block_hashes]:
+                self._bytes -= len(self._entries.pop(key))
+
+    def chain_rolled_back(self, height, removed):
+        self.invalidate(block.hash for block in removed)
+
+    def clear(self):
+        """Drop every entry and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.not_modified = 0
+
+    def stats(self):
+        """Get cache statistics for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "bytes_limit": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from api.dependencies import get_analytics, limiter
+from ravenchain import analytics
+
+analyticsRouter = APIRouter()
+
+
+@analyticsRouter.get("/analytics/volume")
+@limiter.limit("30/minute")
+async def get_volume_per_block(
+    request: Request,
+    start: Optional[int] = Query(None, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    include_rewards: bool = False,
+    columns=Depends(get_analytics),
+):
+    """Get the transferred volume of every block in a height range"""
+    return [
+        {"height": height, "volume": volume}
+        for height, volume in analytics.volume_per_block(columns, start, end, include_rewards)
+    ]
+
+
+@analyticsRouter.get("/analytics/top-senders")
+@limiter.limit("30/minute")
+async def get_top_senders(
+    request: Request,
+    hours: int = Query(24, ge=1, le=24 * 365),
+    limit: int = Query(10, ge=1, le=1000),
+    columns=Depends(get_analytics),
+):
+    """Get the addresses that sent the most in the last hours"""
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return analytics.top_senders(columns, since, limit)
+
+
+@analyticsRouter.get("/analytics/transactions-per-hour")
+@limiter.limit("30/minute")
+async def get_transactions_per_hour(
+    request: Request,
+    hours: int = Query(24, ge=1, le=24 * 365),
+    columns=Depends(get_analytics),
+):
+    """Count confirmed transactions in each of the last hours"""
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return [
+        {"hour": hour.isoformat(), "transactions": count}
+        for hour, count in analytics.transactions_per_hour(columns, since)
+    ]
@@ -2,19 +2,25 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from api.auth.utils import (
     get_db,
     get_password_hash,
-    verify_password,
     authenticate_user,
     create_access_token,
     create_refresh_token,
     get_current_active_user,
     get_admin_user,
+    invalidate_user,
+    last_seen,
+    password_hasher,
+    token_cache,
+    user_cache,
     SECRET_KEY,
     ALGORITHM,
 )
+from api.auth.cache import CachedUser
 from api.auth.schemas import UserCreate, UserResponse, UserUpdate, Token, RefreshToken, UserDB
 from api.database.models import User
 from api.dependencies import logger, limiter
@@ -25,24 +31,26 @@ authRouter = APIRouter()
 
 @authRouter.post("/auth/register", response_model=UserResponse)
 @limiter.limit("5/minute")
-async def register_user(request: Request, user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(
+    request: Request, user_data: UserCreate, db: AsyncSession = Depends(get_db)
+):
     """Register a new user"""
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await db.scalar(select(User).where(User.username == user_data.username))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Username already registered"
         )
 
     # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    existing_email = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -51,18 +59,18 @@ async def register_user(request: Request, user_data: UserCreate, db: Session = D
     )
 
     # Make the first user an admin
-    if db.query(User).count() == 0:
+    if await db.scalar(select(func.count()).select_from(User)) == 0:
         db_user.is_admin = True
         logger.info(f"Creating first user {user_data.username} as admin")
 
     try:
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         logger.info(f"User {user_data.username} registered successfully")
         return db_user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error registering user: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error registering user"
@@ -74,10 +82,10 @@ async def register_user(request: Request, user_data: UserCreate, db: Session = D
 async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Login and get access token"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         logger.warning(f"Failed login attempt for username: {form_data.username}")
         raise HTTPException(
@@ -96,7 +104,7 @@ async def login(
 
     # Update last login
     user.last_login = datetime.now()
-    db.commit()
+    await db.commit()
 
     logger.info(f"User {form_data.username} logged in successfully")
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
@@ -105,7 +113,7 @@ async def login(
 @authRouter.post("/auth/refresh", response_model=Token)
 @limiter.limit("10/minute")
 async def refresh_token(
-    request: Request, refresh_token_data: RefreshToken, db: Session = Depends(get_db)
+    request: Request, refresh_token_data: RefreshToken, db: AsyncSession = Depends(get_db)
 ):
     """Refresh access token using refresh token"""
     credentials_exception = HTTPException(
@@ -123,7 +131,7 @@ async def refresh_token(
         logger.warning("Invalid refresh token used")
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None or not user.is_active:
         logger.warning(f"Token refresh attempted for non-existent or inactive user: {username}")
         raise credentials_exception
@@ -137,7 +145,7 @@ async def refresh_token(
 
 
 @authRouter.get("/auth/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_active_user)):
+async def get_me(current_user: CachedUser = Depends(get_current_active_user)):
     """Get current user info"""
     return current_user
 
@@ -145,37 +153,41 @@ async def get_me(current_user: User = Depends(get_current_active_user)):
 @authRouter.put("/auth/me", response_model=UserResponse)
 async def update_me(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_active_user),
 ):
     """Update current user info"""
+    # The dependency returns a cached snapshot, so load the row to modify
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
     # Update user fields if provided
     if user_update.email:
         # Check if email already exists
-        existing_email = (
-            db.query(User)
-            .filter(User.email == user_update.email, User.id != current_user.id)
-            .first()
+        existing_email = await db.scalar(
+            select(User).where(User.email == user_update.email, User.id != current_user.id)
         )
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
             )
-        current_user.email = user_update.email
+        user.email = user_update.email
 
     if user_update.password:
-        current_user.hashed_password = get_password_hash(user_update.password)
+        user.hashed_password = await get_password_hash(user_update.password)
 
     if user_update.wallet_address is not None:
-        current_user.wallet_address = user_update.wallet_address
+        user.wallet_address = user_update.wallet_address
 
     try:
-        db.commit()
-        db.refresh(current_user)
-        logger.info(f"User {current_user.username} updated profile")
-        return current_user
+        await db.commit()
+        await db.refresh(user)
+        await invalidate_user(user.username)
+        logger.info(f"User {user.username} updated profile")
+        return user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating user: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error updating user"
@@ -189,20 +201,22 @@ async def get_all_users(
     request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    admin_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+    admin_user: CachedUser = Depends(get_admin_user),
 ):
     """Get all users (admin only)"""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    users = await db.scalars(select(User).offset(skip).limit(limit))
+    return users.all()
 
 
 @authRouter.get("/admin/users/{user_id}", response_model=UserResponse)
 async def get_user(
-    user_id: int, db: Session = Depends(get_db), admin_user: User = Depends(get_admin_user)
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin_user: CachedUser = Depends(get_admin_user),
 ):
     """Get user by ID (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
@@ -212,19 +226,19 @@ async def get_user(
 async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
-    admin_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+    admin_user: CachedUser = Depends(get_admin_user),
 ):
     """Update user by ID (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     # Update user fields if provided
     if user_update.email:
         # Check if email already exists
-        existing_email = (
-            db.query(User).filter(User.email == user_update.email, User.id != user_id).first()
+        existing_email = await db.scalar(
+            select(User).where(User.email == user_update.email, User.id != user_id)
         )
         if existing_email:
             raise HTTPException(
@@ -233,7 +247,7 @@ async def update_user(
         user.email = user_update.email
 
     if user_update.password:
-        user.hashed_password = get_password_hash(user_update.password)
+        user.hashed_password = await get_password_hash(user_update.password)
 
     if user_update.is_active is not None:
         user.is_active = user_update.is_active
@@ -242,12 +256,14 @@ async def update_user(
         user.wallet_address = user_update.wallet_address
 
     try:
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        # Deactivation must take effect on the user's next request, not after the cache TTL
+        await invalidate_user(user.username)
         logger.info(f"Admin {admin_user.username} updated user {user.username}")
         return user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating user: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error updating user"
@@ -256,10 +272,12 @@ async def update_user(
 
 @authRouter.delete("/admin/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
-    user_id: int, db: Session = Depends(get_db), admin_user: User = Depends(get_admin_user)
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin_user: CachedUser = Depends(get_admin_user),
 ):
     """Delete user by ID (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -270,12 +288,25 @@ async def delete_user(
         )
 
     try:
-        db.delete(user)
-        db.commit()
+        await db.delete(user)
+        await db.commit()
+        await invalidate_user(user.username)
+        last_seen.discard(user.id)
         logger.info(f"Admin {admin_user.username} deleted user {user.username}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting user: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error deleting user"
         )
+
+
+@authRouter.get("/admin/auth/stats")
+async def get_auth_stats(admin_user: CachedUser = Depends(get_admin_user)):
+    """Get password hashing and authentication cache statistics (admin only)"""
+    return {
+        "password_hashing": password_hasher.stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "last_seen_pending": len(last_seen),
+    }
@@ -1,50 +1,306 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from api.dependencies import logger, get_blockchain, limiter
+from typing import NamedTuple, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.database import chain_reads
+from api.dependencies import logger, get_async_db, get_blockchain, get_response_cache, limiter
+from api.serialization import encode_block, encode_header
+from api.response_cache import (
+    HEADERS_ONLY,
+    IMMUTABLE,
+    JSON,
+    OCTET_STREAM,
+    REVALIDATE,
+    BlockResponseCache,
+    block_etag,
+    etag_matches,
+    join_payloads,
+    page_etag,
+)
+from config.settings import settings
 from ravenchain.blockchain import Blockchain
-
+from ravenchain.storage.base import BlockPrunedError
 
 blockRouter = APIRouter()
 
+NDJSON = "application/x-ndjson"
+
+
+def wants_binary(request: Request):
+    """Whether the client asked for the binary block encoding instead of JSON"""
+    return OCTET_STREAM in request.headers.get("accept", "")
+
+
+def response_media_type(request: Request):
+    """Pick the block representation for a request from its Accept header"""
+    return OCTET_STREAM if wants_binary(request) else JSON
+
+
+def pruned_detail(error: BlockPrunedError):
+    """Build the 410 response body for a block whose transactions were pruned"""
+    return {
+        "status": "pruned",
+        "message": str(error),
+        "height": error.height,
+        "pruned_height": error.pruned_height,
+    }
+
+
+def not_modified(request: Request, cache: BlockResponseCache, headers: dict):
+    """Build a 304 response if the client already holds the current representation"""
+    if not etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return None
+    cache.record_not_modified()
+    return Response(status_code=304, headers=headers)
+
+
+async def ndjson_blocks(blockchain: Blockchain, db: AsyncSession, start: int, end: int):
+    """Encode blocks one JSON document per line as they are read"""
+    async for block in chain_reads.iter_blocks(blockchain, db, start, end):
+        yield encode_block(block) + b"\n"
+
+
+async def page_payloads(
+    blockchain: Blockchain,
+    db: AsyncSession,
+    cache: BlockResponseCache,
+    start: int,
+    end: int,
+    media_type: str,
+):
+    """Get the encoded blocks in [start, end), reading only blocks missing from the cache"""
+    headers = blockchain.chain.header_range(start, end)
+    payloads = [cache.get(header.hash, media_type) for header in headers]
+    missing = [i for i, payload in enumerate(payloads) if payload is None]
+    if missing:
+        first, last = start + missing[0], start + missing[-1] + 1
+        async for block in chain_reads.iter_blocks(blockchain, db, first, last):
+            if payloads[block.index - start] is None:
+                payloads[block.index - start] = cache.put(block, media_type)
+    return payloads
+
+
+class BlockWindow(NamedTuple):
+    start: int
+    end: int
+    headers: dict
+
+
+def block_window(
+    request: Request,
+    blockchain: Blockchain,
+    from_height: Optional[int],
+    start: Optional[int],
+    end: Optional[int],
+    limit: Optional[int],
+    default_start: int,
+):
+    """
+    Resolve the heights of one page of a block listing.
+
+    The page starts at ``from_height`` or ``start`` and stops before ``end`` (exclusive) or
+    the tip. It holds at most ``limit`` blocks, or the whole ``[start, end)`` window up to
+    the maximum page size, or the default page size. When the requested range continues
+    past the page, a ``Link`` header with ``rel="next"`` points at the rest.
+
+    :return: BlockWindow with the page's [start, end) and its response headers
+    """
+    cursor = "from_height" if from_height is not None or start is None else "start"
+    first = from_height if from_height is not None else start
+    first = default_start if first is None else first
+    height = len(blockchain.chain)
+    stop = height if end is None else min(end, height)
+    if limit is None:
+        window = settings.BLOCKS_PAGE_SIZE if end is None else end - first
+        limit = max(1, min(window, settings.BLOCKS_MAX_PAGE_SIZE))
+    headers = {"Cache-Control": REVALIDATE}
+    if first + limit < stop:
+        next_page = request.url.include_query_params(**{cursor: first + limit})
+        headers["Link"] = f'<{next_page}>; rel="next"'
+    return BlockWindow(first, min(first + limit, stop), headers)
+
+
+def check_not_pruned(blockchain: Blockchain, height: int):
+    """Reject requests for block bodies that pruning deleted with a 410"""
+    if height < blockchain.pruned_height:
+        error = BlockPrunedError(height, blockchain.pruned_height)
+        raise HTTPException(status_code=410, detail=pruned_detail(error))
+
 
 @blockRouter.get("/blocks")
 @limiter.limit("30/minute")
-async def get_all_blocks(request: Request, blockchain: Blockchain = Depends(get_blockchain)):
-    """Get all blocks in the blockchain"""
+async def get_all_blocks(
+    request: Request,
+    from_height: Optional[int] = Query(None, ge=0),
+    start: Optional[int] = Query(None, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=settings.BLOCKS_MAX_PAGE_SIZE),
+    blockchain: Blockchain = Depends(get_blockchain),
+    db: AsyncSession = Depends(get_async_db),
+    cache: BlockResponseCache = Depends(get_response_cache),
+):
+    """
+    Get a page of blocks starting at a height.
+
+    Pages start at ``from_height`` or ``start`` (the oldest unpruned block by default),
+    stop before ``end`` and hold at most ``limit`` blocks. When more blocks follow, a
+    ``Link`` header with ``rel="next"`` points at the next page. With
+    ``Accept: application/x-ndjson`` the blocks are streamed one per line instead, through
+    ``end`` or the tip unless a limit is given.
+    """
+    window = block_window(
+        request, blockchain, from_height, start, end, limit, blockchain.pruned_height
+    )
+    check_not_pruned(blockchain, window.start)
+    if NDJSON in request.headers.get("accept", ""):
+        stop = end
+        if limit:
+            stop = window.start + limit if end is None else min(end, window.start + limit)
+        return StreamingResponse(
+            ndjson_blocks(blockchain, db, window.start, stop), media_type=NDJSON
+        )
+
+    media_type = response_media_type(request)
+    headers = window.headers
+    if window.start >= window.end:
+        return Response(join_payloads([], media_type), media_type=media_type, headers=headers)
+
+    last_hash = blockchain.chain.header(window.end - 1).hash
+    headers["ETag"] = page_etag(last_hash, window.end - window.start, media_type)
+    response = not_modified(request, cache, headers)
+    if response is not None:
+        return response
     try:
-        return [block.to_dict() for block in blockchain.chain]
+        payloads = await page_payloads(blockchain, db, cache, window.start, window.end, media_type)
     except Exception as e:
         logger.error(f"Error getting blocks: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    return Response(join_payloads(payloads, media_type), media_type=media_type, headers=headers)
+
+
+@blockRouter.get("/blocks/headers")
+@limiter.limit("30/minute")
+async def get_block_headers(
+    request: Request,
+    from_height: Optional[int] = Query(None, ge=0),
+    start: Optional[int] = Query(None, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=settings.BLOCKS_MAX_PAGE_SIZE),
+    blockchain: Blockchain = Depends(get_blockchain),
+    cache: BlockResponseCache = Depends(get_response_cache),
+):
+    """
+    Get a page of block headers without transaction payloads.
+
+    Takes the same window parameters as ``/blocks`` but starts at the genesis block by
+    default. Headers are always in memory, so pruned heights are included and no block
+    body is read.
+    """
+    window = block_window(request, blockchain, from_height, start, end, limit, 0)
+    headers = window.headers
+    block_headers = blockchain.chain.header_range(window.start, window.end)
+    if block_headers:
+        last_hash = block_headers[-1].hash
+        headers["ETag"] = page_etag(last_hash, len(block_headers), HEADERS_ONLY)
+        response = not_modified(request, cache, headers)
+        if response is not None:
+            return response
+    body = join_payloads([encode_header(header) for header in block_headers], JSON)
+    return Response(body, media_type=JSON, headers=headers)
 
 
 @blockRouter.get("/blocks/latest")
 @limiter.limit("20/minute")
-async def get_latest_block(request: Request, blockchain: Blockchain = Depends(get_blockchain)):
+async def get_latest_block(
+    request: Request,
+    blockchain: Blockchain = Depends(get_blockchain),
+    cache: BlockResponseCache = Depends(get_response_cache),
+):
     """Get the most recent block in the chain"""
     try:
         latest = blockchain.get_latest_block()
-        if not latest:
-            raise HTTPException(status_code=404, detail="Block not found")
-        return latest.to_dict()
     except ValueError as e:
         logger.error(f"Error getting latest block: {str(e)}")
         raise HTTPException(status_code=404, detail="Block not found")
     except Exception as e:
         logger.error(f"Error getting latest block: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    media_type = response_media_type(request)
+    # The tip moves, so clients must revalidate, but an unchanged tip costs only a 304
+    headers = {"ETag": block_etag(latest.hash, media_type), "Cache-Control": REVALIDATE}
+    response = not_modified(request, cache, headers)
+    if response is not None:
+        return response
+    return Response(cache.payload(latest, media_type), media_type=media_type, headers=headers)
+
+
+async def block_response(
+    request: Request,
+    blockchain: Blockchain,
+    db: AsyncSession,
+    cache: BlockResponseCache,
+    height: int,
+    cache_control: str,
+):
+    """Serve the block at a height from the response cache, loading it on a miss"""
+    check_not_pruned(blockchain, height)
+    block_hash = blockchain.chain.header(height).hash
+    media_type = response_media_type(request)
+    headers = {"ETag": block_etag(block_hash, media_type), "Cache-Control": cache_control}
+    response = not_modified(request, cache, headers)
+    if response is not None:
+        return response
+    payload = cache.get(block_hash, media_type)
+    if payload is None:
+        try:
+            block = await chain_reads.get_block(blockchain, db, height)
+        except BlockPrunedError as e:
+            raise HTTPException(status_code=410, detail=pruned_detail(e))
+        except Exception as e:
+            logger.error(f"Error getting block {block_hash}: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+        payload = cache.put(block, media_type)
+    return Response(payload, media_type=media_type, headers=headers)
+
+
+@blockRouter.get("/blocks/height/{height}")
+@limiter.limit("30/minute")
+async def get_block_by_height(
+    request: Request,
+    height: int = Path(ge=0),
+    blockchain: Blockchain = Depends(get_blockchain),
+    db: AsyncSession = Depends(get_async_db),
+    cache: BlockResponseCache = Depends(get_response_cache),
+):
+    """Get the block at a height"""
+    if height >= len(blockchain.chain):
+        raise HTTPException(status_code=404, detail="Block not found")
+    # A reorg can replace the block at a height, so clients revalidate with the ETag
+    return await block_response(request, blockchain, db, cache, height, REVALIDATE)
 
 
 @blockRouter.get("/blocks/{block_hash}")
 @limiter.limit("10/minute")
 async def get_block(
-    request: Request, block_hash: str, blockchain: Blockchain = Depends(get_blockchain)
+    request: Request,
+    block_hash: str,
+    blockchain: Blockchain = Depends(get_blockchain),
+    db: AsyncSession = Depends(get_async_db),
+    cache: BlockResponseCache = Depends(get_response_cache),
 ):
     """Get a specific block by its hash"""
-    try:
-        for block in blockchain.chain:
-            if block.hash == block_hash:
-                return block.to_dict()
+    height = blockchain.chain.height_of(block_hash)
+    if height is None:
         raise HTTPException(status_code=404, detail="Block not found")
-    except Exception as e:
-        logger.error(f"Error getting block {block_hash}: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return await block_response(request, blockchain, db, cache, height, IMMUTABLE)
+
+
+@blockRouter.get("/chain/cache")
+@limiter.limit("30/minute")
+async def get_cache_stats(
+    request: Request,
+    blockchain: Blockchain = Depends(get_blockchain),
+    cache: BlockResponseCache = Depends(get_response_cache),
+):
+    """Get hit-rate statistics for the block cache and the block response cache"""
+    return {**blockchain.chain.stats(), "responses": cache.stats()}
@@ -0,0 +1,72 @@
+import asyncio
+from contextlib import suppress
+from typing import List
+from fastapi import APIRouter, Depends, Query, WebSocket, status
+from starlette.websockets import WebSocketDisconnect
+from api.auth.cache import CachedUser
+from api.auth.utils import get_websocket_user
+from api.dependencies import get_live_feed
+from api.live_feed import BLOCKS, MEMPOOL, LiveFeed, Subscriber
+from config.settings import settings
+
+liveRouter = APIRouter()
+
+
+async def watch_disconnect(websocket: WebSocket, subscriber: Subscriber):
+    """Close the subscriber as soon as the client goes away"""
+    with suppress(WebSocketDisconnect):
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    subscriber.close()
+
+
+async def stream_events(websocket: WebSocket, feed: LiveFeed, topic: str, addresses: List[str]):
+    """Send a topic's events to a WebSocket until either side ends the stream"""
+    await websocket.accept()
+    subscriber = Subscriber(
+        topic, addresses, settings.LIVE_FEED_QUEUE_SIZE, settings.LIVE_FEED_OVERFLOW
+    )
+    if not feed.subscribe(subscriber):
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many subscribers")
+        return
+    watcher = asyncio.create_task(watch_disconnect(websocket, subscriber))
+    try:
+        while (message := await subscriber.next_event()) is not None:
+            await websocket.send_text(message)
+        if not watcher.done():
+            # Closed by the feed because the client fell too far behind
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Client too slow")
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        feed.unsubscribe(subscriber)
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+
+
+@liveRouter.websocket("/ws/blocks")
+async def blocks_feed(
+    websocket: WebSocket,
+    address: List[str] = Query([]),
+    user: CachedUser = Depends(get_websocket_user),
+    feed: LiveFeed = Depends(get_live_feed),
+):
+    """
+    Push an event for every connected block and every rollback.
+
+    With ``address`` parameters only blocks with transactions involving those addresses
+    are sent, together with the matching transactions.
+    """
+    await stream_events(websocket, feed, BLOCKS, address)
+
+
+@liveRouter.websocket("/ws/mempool")
+async def mempool_feed(
+    websocket: WebSocket,
+    address: List[str] = Query([]),
+    user: CachedUser = Depends(get_websocket_user),
+    feed: LiveFeed = Depends(get_live_feed),
+):
+    """Push an event for every transaction admitted to the pending pool"""
+    await stream_events(websocket, feed, MEMPOOL, address)
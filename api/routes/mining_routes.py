@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from api.dependencies import logger, get_blockchain, limiter
-from ravenchain.blockchain import Blockchain
+from api.dependencies import logger, get_chain_writer, limiter
 from pydantic import BaseModel
 
 
@@ -16,11 +15,11 @@ miningRouter = APIRouter()
 async def mine_block(
     request: Request,
     mining_request: MiningRequest,
-    blockchain: Blockchain = Depends(get_blockchain),
+    chain_writer=Depends(get_chain_writer),
 ):
     try:
-        blockchain.mine_pending_transactions(mining_request.miner_address)
-        return {"message": "Block mined successfully"}
+        height = await chain_writer.mine(mining_request.miner_address)
+        return {"message": "Block mined successfully", "height": height}
     except Exception as e:
         logger.error(f"Error mining block: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
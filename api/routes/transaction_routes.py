@@ -1,7 +1,11 @@
+from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request
-from pydantic import BaseModel
-from api.dependencies import blockchain, limiter
-from ravenchain.blockchain import Blockchain
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from api.chain_service import ChainServiceError
+from api.dependencies import get_chain_writer, get_signature_verifier, limiter
+from api.serialization import ChainJSONResponse
+from config.settings import settings
 from ravenchain.transaction import Transaction
 
 transactionRouter = APIRouter()
@@ -14,19 +18,29 @@ class CreateTransactionRequest(BaseModel):
     sender_private_key: str
 
 
-def get_blockchain():
-    if not blockchain:
-        raise HTTPException(status_code=503, detail="Blockchain not initialized")
-    return blockchain
+class SignedTransactionRequest(BaseModel):
+    sender_address: str
+    recipient_address: str
+    amount: float
+    # Hex encoded; the signature covers f"{sender_address}{recipient_address}{amount}"
+    # with the amount formatted as a float, e.g. "5.0"
+    signature: str
+    public_key: str
+
+
+class TransactionBatchRequest(BaseModel):
+    transactions: List[SignedTransactionRequest] = Field(
+        min_length=1, max_length=settings.TRANSACTION_BATCH_MAX
+    )
+    # Admit every transaction or none of them, instead of each valid one on its own
+    atomic: bool = False
 
 
 @transactionRouter.get("/transactions")
 @limiter.limit("30/minute")
-async def get_all_transactions(request: Request, blockchain: Blockchain = Depends(get_blockchain)):
-    try:
-        return blockchain.get_pending_transactions()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_all_transactions(request: Request, chain_writer=Depends(get_chain_writer)):
+    """Get the transactions waiting to be mined"""
+    return ChainJSONResponse(await chain_writer.pending())
 
 
 @transactionRouter.post("/transactions")
@@ -34,14 +48,82 @@ async def get_all_transactions(request: Request, blockchain: Blockchain = Depend
 async def create_transaction(
     request: Request,
     tx_request: CreateTransactionRequest,
-    blockchain: Blockchain = Depends(get_blockchain),
+    chain_writer=Depends(get_chain_writer),
 ):
     try:
         transaction = Transaction(
             tx_request.sender_address, tx_request.recipient_address, tx_request.amount
         )
         transaction.sign_transaction(tx_request.sender_private_key)
-        blockchain.add_pending_transaction(transaction)
+        await chain_writer.add_transaction(transaction)
         return {"message": "Transaction added successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@transactionRouter.post("/transactions/batch")
+@limiter.limit("10/minute")
+async def create_transactions(
+    request: Request,
+    batch: TransactionBatchRequest,
+    chain_writer=Depends(get_chain_writer),
+    verifier=Depends(get_signature_verifier),
+):
+    """
+    Submit signed transactions in one request.
+
+    Signatures are verified in parallel and the valid transactions are added to the pool
+    with one call to the chain writer. Each item gets a result with its index and status:
+    "admitted", "rejected" with the reason, or "skipped" when an atomic batch was refused
+    because of another item. A refused atomic batch is answered with 422.
+    """
+    results = [None] * len(batch.transactions)
+    candidates = []
+    for index, item in enumerate(batch.transactions):
+        try:
+            tx = Transaction(
+                item.sender_address,
+                item.recipient_address,
+                item.amount,
+                bytes.fromhex(item.signature),
+            )
+        except ValueError as e:
+            results[index] = {"index": index, "status": "rejected", "reason": str(e)}
+            continue
+        candidates.append((index, tx, item.public_key))
+
+    reasons = await verifier.verify([(tx, public_key) for _, tx, public_key in candidates])
+    valid = []
+    for (index, tx, _), reason in zip(candidates, reasons):
+        if reason:
+            results[index] = {"index": index, "status": "rejected", "reason": reason}
+        else:
+            valid.append((index, tx))
+
+    rejected = len(results) - len(valid)
+    if batch.atomic and rejected:
+        for index, _ in valid:
+            results[index] = {
+                "index": index,
+                "status": "skipped",
+                "reason": "batch rejected because another transaction is invalid",
+            }
+        return JSONResponse(
+            status_code=422,
+            content={"admitted": 0, "rejected": rejected, "block_index": None, "results": results},
+        )
+
+    block_index = None
+    if valid:
+        try:
+            block_index = await chain_writer.add_transactions([tx for _, tx in valid])
+        except ChainServiceError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    for index, _ in valid:
+        results[index] = {"index": index, "status": "admitted", "reason": None}
+    return {
+        "admitted": len(valid),
+        "rejected": rejected,
+        "block_index": block_index,
+        "results": results,
+    }
@@ -0,0 +1,161 @@
+"""
+Single-pass JSON encoding of blocks and transactions for API responses.
+
+The output is byte-for-byte what ``JSONResponse`` renders for ``block.to_dict()`` and
+``tx.to_dict()``, without building the intermediate dictionaries or running FastAPI's
+``jsonable_encoder``. When the optional ``orjson`` package is installed it encodes every
+block whose values it formats identically to the standard library (floats in
+[1e-4, 1e16) and whole-minute UTC offsets); other blocks use a template encoder built on
+the standard library's C string escaping.
+"""
+
+import math
+from json.encoder import encode_basestring
+from fastapi.responses import JSONResponse
+from ravenchain.block import Block
+from ravenchain.transaction import Transaction
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+TRANSACTION_TEMPLATE = '{"sender":%s,"recipient":%s,"amount":%s,"timestamp":"%s","signature":%s}'
+BLOCK_TEMPLATE = '{"index":%d,"timestamp":"%s","data":[%s],"previous_hash":%s,"nonce":%d,"hash":%s}'
+HEADER_TEMPLATE = '{"index":%d,"timestamp":"%s","previous_hash":%s,"nonce":%d,"hash":%s}'
+
+# Range of float magnitudes that orjson and the json module both print in plain notation
+ORJSON_FLOAT_RANGE = (1e-4, 1e16)
+ORJSON_INT_RANGE = (-(2**63), 2**64)
+
+
+def _string(value):
+    return "null" if value is None else encode_basestring(value)
+
+
+def _number(value):
+    if value is True or value is False:
+        return "true" if value else "false"
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+        return float.__repr__(value)
+    return int.__repr__(value)
+
+
+def _transaction_json(tx):
+    return TRANSACTION_TEMPLATE % (
+        _string(tx.sender),
+        _string(tx.recipient),
+        _number(tx.amount),
+        tx.timestamp.isoformat(),
+        f'"{tx.signature.hex()}"' if tx.signature else "null",
+    )
+
+
+def _block_json(block):
+    return BLOCK_TEMPLATE % (
+        block.index,
+        block.timestamp.isoformat(),
+        ",".join([_transaction_json(tx) for tx in block.data]),
+        _string(block.previous_hash),
+        block.nonce,
+        _string(block.hash),
+    )
+
+
+def _orjson_safe_timestamp(timestamp):
+    offset = timestamp.utcoffset()
+    return offset is None or not (offset.seconds % 60 or offset.microseconds)
+
+
+def _orjson_safe_amount(amount):
+    if type(amount) is float:
+        return amount == 0 or ORJSON_FLOAT_RANGE[0] <= abs(amount) < ORJSON_FLOAT_RANGE[1]
+    return type(amount) is int and ORJSON_INT_RANGE[0] <= amount < ORJSON_INT_RANGE[1]
+
+
+def _orjson_safe(block):
+    return _orjson_safe_timestamp(block.timestamp) and all(
+        _orjson_safe_amount(tx.amount) and _orjson_safe_timestamp(tx.timestamp) for tx in block.data
+    )
+
+
+def _transaction_fields(tx):
+    return {
+        "sender": tx.sender,
+        "recipient": tx.recipient,
+        "amount": tx.amount,
+        "timestamp": tx.timestamp,
+        "signature": tx.signature.hex() if tx.signature else None,
+    }
+
+
+def _block_fields(block):
+    return {
+        "index": block.index,
+        "timestamp": block.timestamp,
+        "data": [_transaction_fields(tx) for tx in block.data],
+        "previous_hash": block.previous_hash,
+        "nonce": block.nonce,
+        "hash": block.hash,
+    }
+
+
+def encode_transaction(tx):
+    """
+    Encode a transaction as the JSON bytes of ``tx.to_dict()``.
+
+    :param tx: Transaction to encode
+    :return: UTF-8 JSON bytes
+    """
+    return _transaction_json(tx).encode()
+
+
+def encode_block(block):
+    """
+    Encode a block as the JSON bytes of ``block.to_dict()``.
+
+    :param block: Block to encode
+    :return: UTF-8 JSON bytes
+    """
+    if orjson is not None and _orjson_safe(block):
+        return orjson.dumps(_block_fields(block))
+    return _block_json(block).encode()
+
+
+def encode_header(header):
+    """
+    Encode a block header as the JSON bytes of ``block.to_dict()`` without ``data``.
+
+    :param header: BlockHeader or Block to encode
+    :return: UTF-8 JSON bytes
+    """
+    fields = (
+        header.index,
+        header.timestamp.isoformat(),
+        _string(header.previous_hash),
+        header.nonce,
+        _string(header.hash),
+    )
+    return (HEADER_TEMPLATE % fields).encode()
+
+
+class ChainJSONResponse(JSONResponse):
+    """
+    JSON response that encodes Block and Transaction objects, or lists of them, directly.
+
+    Any other content is rendered exactly like ``JSONResponse``.
+    """
+
+    def render(self, content):
+        if isinstance(content, Block):
+            return encode_block(content)
+        if isinstance(content, Transaction):
+            return encode_transaction(content)
+        if isinstance(content, (list, tuple)) and content:
+            if all(isinstance(item, Block) for item in content):
+                return b"[" + b",".join([encode_block(block) for block in content]) + b"]"
+            if all(isinstance(item, Transaction) for item in content):
+                return b"[" + b",".join([encode_transaction(tx) for tx in content]) + b"]"
+        return super().render(content)
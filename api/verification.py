@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from api.metrics import record_signature_verifications
+from ravenchain import tracing
+from ravenchain.verify import VERIFY_TRANSACTION_CHUNK_SIZE, verify_transactions
+
+# Forking a worker that already runs threads (the event loop's executors, the log
+# listener) can copy a lock held by another thread into the child, so pool processes
+# start from a clean server process instead
+POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class SignatureVerifier:
+    """
+    Verify submitted transaction signatures off the event loop.
+
+    ECDSA verification is pure Python and holds the GIL, so a batch is split into chunks
+    that run in parallel on a process pool shared by all requests of the worker. Batches
+    no larger than one chunk, and all batches when ``workers`` is 1, are verified on a
+    thread instead, which avoids the pickling round trip for the common small request.
+    """
+
+    def __init__(self, workers: int = 0, chunk_size: int = VERIFY_TRANSACTION_CHUNK_SIZE):
+        """
+        :param workers: Number of verification processes, 0 for the CPU count
+        :param chunk_size: Number of transactions verified by one pool task
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._lock = threading.Lock()
+        self.verified = 0
+        self.failed = 0
+        self.batches = 0
+        self.verify_seconds = 0.0
+
+    async def verify(self, items):
+        """
+        Verify (transaction, public key hex string) pairs.
+
+        :return: List with None for each valid transaction, otherwise the reason it is not
+        """
+        if not items:
+            return []
+        started = time.perf_counter()
+        with tracing.span("verify_signatures", transactions=len(items)):
+            results = await self._verify(items)
+        failed = sum(reason is not None for reason in results)
+        with self._lock:
+            self.batches += 1
+            self.verified += len(items)
+            self.failed += failed
+            self.verify_seconds += time.perf_counter() - started
+        record_signature_verifications(len(items) - failed, failed)
+        return results
+
+    async def _verify(self, items):
+        if self.workers == 1 or len(items) <= self.chunk_size:
+            return await asyncio.to_thread(verify_transactions, items)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor, verify_transactions, items[start : start + self.chunk_size]
+                )
+                for start in range(0, len(items), self.chunk_size)
+            )
+        )
+        return [reason for chunk in chunks for reason in chunk]
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Chunks are traced as a whole by the caller's span
+                self._executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context(POOL_START_METHOD),
+                    initializer=tracing.disable,
+                )
+            return self._executor
+
+    def shutdown(self):
+        """Stop the worker processes; the pool is recreated on the next large batch"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        """Get verification counts and throughput for monitoring"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "batches": self.batches,
+                "verified": self.verified,
+                "failed": self.failed,
+                "transactions_per_second": (
+                    self.verified / self.verify_seconds if self.verify_seconds else 0.0
+                ),
+            }
@@ -1,10 +1,16 @@
 import os
 import sys
 import json
+import atexit
+import queue
+import random
+import threading
+import time
 import logging
 import logging.handlers
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 # Get the base directory for logs
 LOGS_DIR = Path(os.getenv("RAVENCHAIN_LOGS_DIR", "logs"))
@@ -15,6 +21,9 @@ MAIN_LOG = LOGS_DIR / "ravenchain.log"
 ERROR_LOG = LOGS_DIR / "error.log"
 DEBUG_LOG = LOGS_DIR / "debug.log"
 
+# Seconds stop() waits for room in a full queue, and then for the listener to finish
+STOP_TIMEOUT = 5.0
+
 
 class JSONFormatter(logging.Formatter):
     """
@@ -45,6 +54,9 @@ class JSONFormatter(logging.Formatter):
 
         if record.exc_info:
             message["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already rendered by LogQueueHandler before the record was queued
+            message["exc_info"] = record.exc_text
 
         return json.dumps(message)
 
@@ -71,20 +83,286 @@ class StructuredLogger(logging.Logger):
         super()._log(level, msg, args, exc_info, extra, stack_info)
 
 
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a structured logger without configuring any handlers
+
+    Use this for module-level loggers of modules imported before ``setup_logging`` runs;
+    their records propagate to the handlers ``setup_logging`` installs on a parent.
+
+    Args:
+        name: Logger name, e.g. 'ravenchain.api.chain_service'
+    """
+    logging.setLoggerClass(StructuredLogger)
+    return logging.getLogger(name)
+
+
+def parse_logger_values(spec: str) -> Dict[str, float]:
+    """
+    Parse per-logger settings such as ``"ravenchain.api.health=0.01,ravenchain.api=1"``
+
+    Args:
+        spec: Comma-separated logger=value pairs; empty for none
+
+    Returns:
+        Dictionary mapping logger names to values
+    """
+    values = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, separator, value = item.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Expected logger=value, got {item!r}")
+        values[name.strip()] = float(value)
+    return values
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Thin out high-frequency records before they are queued.
+
+    Rules apply to a logger and its children, the most specific logger winning. A sample
+    rate keeps that fraction of records at random; a rate limit lets records of the logger
+    through at most that many times per minute. Records logged with ``%`` arguments get an
+    allowance per message template; preformatted messages, such as f-strings, share the
+    logger's allowance. Warnings and errors always pass.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        max_buckets: int = 1024,
+    ) -> None:
+        """
+        Args:
+            sample_rates: Fraction of records kept per logger name
+            rate_limits: Records let through per minute per logger name
+            max_buckets: Rate limit allowances kept, the least recently used are evicted
+        """
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self.max_buckets = max_buckets
+        self.suppressed = 0
+        self._rules: Dict[str, tuple] = {}
+        # Logger name, or (logger name, message template) -> [tokens, last refill]
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, rules: Dict[str, float], name: str, default: float) -> float:
+        while True:
+            if name in rules:
+                return rules[name]
+            if "." not in name:
+                return default
+            name = name.rsplit(".", 1)[0]
+
+    def _rule(self, name: str) -> tuple:
+        rule = self._rules.get(name)
+        if rule is None:
+            rule = (
+                self._lookup(self.sample_rates, name, 1.0),
+                self._lookup(self.rate_limits, name, 0.0),
+            )
+            self._rules[name] = rule
+        return rule
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        sample_rate, per_minute = self._rule(record.name)
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            self.suppressed += 1
+            return False
+        if per_minute > 0:
+            now = time.monotonic()
+            key = (record.name, record.msg) if record.args else record.name
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = [per_minute, now]
+                    if len(self._buckets) > self.max_buckets:
+                        self._buckets.popitem(last=False)
+                else:
+                    self._buckets.move_to_end(key)
+                bucket[0] = min(per_minute, bucket[0] + (now - bucket[1]) * per_minute / 60)
+                bucket[1] = now
+                if bucket[0] < 1:
+                    self.suppressed += 1
+                    return False
+                bucket[0] -= 1
+        return True
+
+
+# Renders tracebacks on the calling thread, while the frames they refer to still exist
+_traceback_formatter = logging.Formatter()
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records for the background listener without ever blocking the caller.
+
+    Unlike the stock QueueHandler, records are not formatted here: only the message and
+    any traceback are rendered, and formatting happens on the listener thread. When the
+    bounded queue is full the record is dropped and counted, and the count is reported
+    once there is room again.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self._unreported:
+                self.queue.put_nowait(self._drop_report())
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def _drop_report(self) -> logging.LogRecord:
+        return logging.makeLogRecord(
+            {
+                "name": "ravenchain.logging",
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Dropped {self._unreported} log records, the log queue was full",
+            }
+        )
+
+
+class BatchedWrites:
+    """
+    Mixin for stream handlers that flush once per batch instead of once per record.
+
+    The listener calls ``flush_batch`` after writing a batch and whenever its queue runs
+    dry, so records are never held back while the process is idle.
+    """
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+
+class BatchedStreamHandler(BatchedWrites, logging.StreamHandler):
+    pass
+
+
+class BatchedRotatingFileHandler(BatchedWrites, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class LogQueueListener(logging.handlers.QueueListener):
+    """Write queued records on a background thread, flushing batched handlers per batch"""
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, batch_size: int = 1):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self._pending = 0
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            # The queue ran dry, so write out what is buffered before waiting
+            self.flush_batch()
+            return self.queue.get(block)
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush_batch()
+
+    def flush_batch(self) -> None:
+        if not self._pending:
+            return
+        self._pending = 0
+        for handler in self.handlers:
+            if isinstance(handler, BatchedWrites):
+                handler.flush_batch()
+
+    def stop(self) -> None:
+        """
+        Write every queued record and stop the thread.
+
+        The stock ``stop`` puts its sentinel with ``put_nowait``, which raises on a full
+        queue and leaves the thread running. This waits for the listener to make room, and
+        gives up after ``STOP_TIMEOUT`` rather than hang the exit on a stuck handler.
+        """
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(self._sentinel, timeout=STOP_TIMEOUT)
+        except queue.Full:
+            return
+        self._thread.join(STOP_TIMEOUT)
+        if self._thread.is_alive():
+            return
+        self._thread = None
+        self.flush_batch()
+
+
+# Running listener of each service logger, stopped at exit so queued records are written
+_listeners: Dict[str, LogQueueListener] = {}
+_listeners_lock = threading.Lock()
+
+
+def stop_logging() -> None:
+    """Write every queued record and stop the listener threads"""
+    with _listeners_lock:
+        listeners = list(_listeners.values())
+        _listeners.clear()
+    for listener in listeners:
+        listener.stop()
+
+
+atexit.register(stop_logging)
+
+
 def setup_logging(
     service_name: str = "ravenchain",
     log_level: str = None,
     json_output: bool = False,
     console_output: bool = True,
+    sample_rates: Optional[Dict[str, float]] = None,
+    rate_limits: Optional[Dict[str, float]] = None,
+    queue_size: Optional[int] = None,
+    batch_size: Optional[int] = None,
 ) -> logging.Logger:
     """
     Set up logging configuration
 
+    Records are put on a bounded queue by the calling thread and formatted and written by
+    a background listener, so logging never waits for a console or disk. When the queue is
+    full, records are dropped and the drop is reported rather than stalling the caller.
+
     Args:
         service_name: Name of the service (default: 'ravenchain')
         log_level: Override default log level from environment
         json_output: Whether to output logs in JSON format
         console_output: Whether to output logs to console
+        sample_rates: Fraction of records kept per logger, e.g.
+            {"ravenchain.api.health": 0.01}; defaults to LOG_SAMPLE_RATES
+        rate_limits: Records per minute allowed for each message of a logger; defaults
+            to LOG_RATE_LIMITS
+        queue_size: Records buffered for the listener; defaults to LOG_QUEUE_SIZE
+        batch_size: Records written between flushes, 1 to flush every record; defaults
+            to LOG_BATCH_SIZE
     """
     # Register our custom logger class
     logging.setLoggerClass(StructuredLogger)
@@ -92,11 +370,21 @@ def setup_logging(
     # Determine log level from environment or parameter
     log_level = log_level or os.getenv("LOG_LEVEL", "INFO")
     numeric_level = getattr(logging, log_level.upper(), logging.INFO)
+    if sample_rates is None:
+        sample_rates = parse_logger_values(os.getenv("LOG_SAMPLE_RATES", ""))
+    if rate_limits is None:
+        rate_limits = parse_logger_values(os.getenv("LOG_RATE_LIMITS", "ravenchain.api.health=1"))
+    queue_size = queue_size or int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    batch_size = batch_size or int(os.getenv("LOG_BATCH_SIZE", 1))
 
     # Create logger
     logger = logging.getLogger(service_name)
     logger.setLevel(numeric_level)
     logger.handlers = []  # Reset handlers if they exist
+    with _listeners_lock:
+        previous = _listeners.pop(service_name, None)
+    if previous is not None:
+        previous.stop()
 
     # Formatter
     if json_output:
@@ -106,35 +394,45 @@ def setup_logging(
             "%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(funcName)s:%(lineno)d - %(message)s"
         )
 
+    batched = batch_size > 1
+    stream_handler = BatchedStreamHandler if batched else logging.StreamHandler
+    file_handler = BatchedRotatingFileHandler if batched else logging.handlers.RotatingFileHandler
+    handlers = []
+
     # Console handler
     if console_output:
-        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler = stream_handler(sys.stdout)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
     # Main rotating file handler
-    main_handler = logging.handlers.RotatingFileHandler(
-        MAIN_LOG, maxBytes=10 * 1024 * 1024, backupCount=5  # 10MB
-    )
+    main_handler = file_handler(MAIN_LOG, maxBytes=10 * 1024 * 1024, backupCount=5)  # 10MB
     main_handler.setFormatter(formatter)
-    logger.addHandler(main_handler)
+    handlers.append(main_handler)
 
     # Error file handler
-    error_handler = logging.handlers.RotatingFileHandler(
-        ERROR_LOG, maxBytes=10 * 1024 * 1024, backupCount=5  # 10MB
-    )
+    error_handler = file_handler(ERROR_LOG, maxBytes=10 * 1024 * 1024, backupCount=5)  # 10MB
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
+    handlers.append(error_handler)
 
     # Debug file handler (only active if debug level is set)
     if numeric_level <= logging.DEBUG:
-        debug_handler = logging.handlers.RotatingFileHandler(
-            DEBUG_LOG, maxBytes=10 * 1024 * 1024, backupCount=5  # 10MB
-        )
+        debug_handler = file_handler(DEBUG_LOG, maxBytes=10 * 1024 * 1024, backupCount=5)  # 10MB
         debug_handler.setLevel(logging.DEBUG)
         debug_handler.setFormatter(formatter)
-        logger.addHandler(debug_handler)
+        handlers.append(debug_handler)
+
+    # The request thread only filters and enqueues; the listener formats and writes
+    log_queue = queue.Queue(queue_size)
+    queue_handler = LogQueueHandler(log_queue)
+    if sample_rates or rate_limits:
+        queue_handler.addFilter(SamplingFilter(sample_rates, rate_limits))
+    logger.addHandler(queue_handler)
+    listener = LogQueueListener(log_queue, *handlers, batch_size=batch_size)
+    listener.start()
+    with _listeners_lock:
+        _listeners[service_name] = listener
 
     return logger
 
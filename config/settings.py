@@ -29,11 +29,91 @@ class Settings:
     DB_USER = os.getenv("RAVENCHAIN_DB_USER", "postgres")
     DB_PASS = os.getenv("RAVENCHAIN_DB_PASS", "admin")
     DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    ASYNC_DATABASE_URL = os.getenv(
+        "RAVENCHAIN_ASYNC_DB_URL",
+        f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    )
+    DB_POOL_SIZE: int = int(os.getenv("RAVENCHAIN_DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("RAVENCHAIN_DB_MAX_OVERFLOW", 10))
+    DB_QUERY_TIMEOUT: float = float(os.getenv("RAVENCHAIN_DB_QUERY_TIMEOUT", 5.0))
+
+    # Block storage settings: "memory", "flatfile" or "sql"
+    STORAGE_BACKEND: str = os.getenv("RAVENCHAIN_STORAGE", "memory")
+    DATA_DIR: str = os.getenv("RAVENCHAIN_DATA_DIR", "data")
+
+    # Pruned mode: keep full blocks for the last N heights and/or the last X GB, 0 = archival
+    PRUNE_KEEP_BLOCKS: int = int(os.getenv("RAVENCHAIN_PRUNE_KEEP_BLOCKS", 0))
+    PRUNE_KEEP_BYTES: int = int(float(os.getenv("RAVENCHAIN_PRUNE_KEEP_GB", 0)) * 1024**3)
+    PRUNE_INTERVAL: float = float(os.getenv("RAVENCHAIN_PRUNE_INTERVAL", 60.0))
+
+    # Multi-worker deployments: "standalone" workers own their chain, "reader" workers follow
+    # the chain service (python -m api.chain_service) and forward writes to its socket
+    CHAIN_ROLE: str = os.getenv("RAVENCHAIN_CHAIN_ROLE", "standalone")
+    CHAIN_SERVICE_SOCKET: str = os.getenv(
+        "RAVENCHAIN_CHAIN_SERVICE_SOCKET", f"{DATA_DIR}/chain-service.sock"
+    )
+    # Tip change announcements: "postgres" (LISTEN/NOTIFY) or "socket" (datagrams to
+    # the readers' sockets in TIP_SOCKET_DIR), plus a polling fallback in seconds
+    TIP_NOTIFY: str = os.getenv("RAVENCHAIN_TIP_NOTIFY", "postgres")
+    TIP_SOCKET_DIR: str = os.getenv("RAVENCHAIN_TIP_SOCKET_DIR", f"{DATA_DIR}/tips")
+    CHAIN_REFRESH_INTERVAL: float = float(os.getenv("RAVENCHAIN_CHAIN_REFRESH_INTERVAL", 5.0))
+
+    # Live block and mempool feeds: events queued per client, what happens when a client's
+    # queue is full ("drop" the oldest event or "disconnect" the client), and client limit
+    LIVE_FEED_QUEUE_SIZE: int = int(os.getenv("RAVENCHAIN_LIVE_FEED_QUEUE_SIZE", 100))
+    LIVE_FEED_OVERFLOW: str = os.getenv("RAVENCHAIN_LIVE_FEED_OVERFLOW", "drop")
+    LIVE_FEED_MAX_SUBSCRIBERS: int = int(os.getenv("RAVENCHAIN_LIVE_FEED_MAX_SUBSCRIBERS", 1000))
+
+    # Batch transaction submission: transactions accepted per request, and processes that
+    # verify large batches in parallel (0 for the CPU count)
+    TRANSACTION_BATCH_MAX: int = int(os.getenv("RAVENCHAIN_TRANSACTION_BATCH_MAX", 1000))
+    SIGNATURE_VERIFY_WORKERS: int = int(os.getenv("RAVENCHAIN_SIGNATURE_VERIFY_WORKERS", 0))
+
+    # Seconds between copies of each worker's cache statistics into the /metrics gauges
+    METRICS_SAMPLE_INTERVAL: float = float(os.getenv("RAVENCHAIN_METRICS_SAMPLE_INTERVAL", 15.0))
+
+    # Tracing spans around mining, verification and persistence: "log" emits each request's
+    # span tree as a log record, "otlp" appends OTLP/JSON lines to TRACE_FILE, "off" disables
+    TRACING: str = os.getenv("RAVENCHAIN_TRACING", "off")
+    TRACE_FILE: str = os.getenv(
+        "RAVENCHAIN_TRACE_FILE", f"{os.getenv('RAVENCHAIN_LOGS_DIR', 'logs')}/traces.jsonl"
+    )
+
+    # Columnar transaction analytics, requires numpy
+    ANALYTICS_ENABLED: bool = os.getenv("RAVENCHAIN_ANALYTICS", "0") == "1"
+    ANALYTICS_DIR: str = os.getenv("RAVENCHAIN_ANALYTICS_DIR", f"{DATA_DIR}/analytics")
+
+    # Block cache settings
+    RESIDENT_BLOCKS: int = int(os.getenv("RAVENCHAIN_RESIDENT_BLOCKS", 1000))
+    BLOCK_CACHE_BYTES: int = int(os.getenv("RAVENCHAIN_BLOCK_CACHE_BYTES", 64 * 1024 * 1024))
+    # Byte budget for encoded block responses served by the API
+    RESPONSE_CACHE_BYTES: int = int(os.getenv("RAVENCHAIN_RESPONSE_CACHE_BYTES", 32 * 1024 * 1024))
+
+    # Block listing: page size when no limit is given, and the largest limit accepted
+    BLOCKS_PAGE_SIZE: int = int(os.getenv("RAVENCHAIN_BLOCKS_PAGE_SIZE", 100))
+    BLOCKS_MAX_PAGE_SIZE: int = int(os.getenv("RAVENCHAIN_BLOCKS_MAX_PAGE_SIZE", 1000))
 
     # JWT Settings
     SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", secrets.token_urlsafe(32))
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
+    # Auth hot path: seconds decoded tokens and user records are reused, cache size, and how
+    # often coalesced last_login updates are written
+    AUTH_CACHE_TTL: float = float(os.getenv("RAVENCHAIN_AUTH_CACHE_TTL", 30.0))
+    AUTH_CACHE_SIZE: int = int(os.getenv("RAVENCHAIN_AUTH_CACHE_SIZE", 10000))
+    LAST_SEEN_FLUSH_INTERVAL: float = float(os.getenv("RAVENCHAIN_LAST_SEEN_FLUSH_INTERVAL", 10.0))
+
+    # Password hashing: bcrypt threads per worker process, and how many operations may wait
+    # for one before requests are rejected with 503
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("RAVENCHAIN_PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_QUEUE: int = int(os.getenv("RAVENCHAIN_PASSWORD_HASH_QUEUE", 32))
+
+    # Rate-limit counters: shm://<path> shares them between the workers on this host,
+    # redis://host:port between hosts, memory:// keeps them per worker
+    RATE_LIMIT_STORAGE: str = os.getenv(
+        "RAVENCHAIN_RATE_LIMIT_STORAGE", f"shm://{DATA_DIR}/ratelimits.bin"
+    )
+
 
 settings = Settings()
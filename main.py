@@ -4,8 +4,10 @@ import pickle
 from pathlib import Path
 from datetime import datetime
 from ravenchain.blockchain import Blockchain
+from ravenchain.storage import create_block_store
 from ravenchain.wallet import Wallet
 from config.logging import setup_logging
+from config.settings import settings
 
 logger = setup_logging(
     "ravenchain.cli", json_output=os.getenv("LOG_JSON", "0") == "1", console_output=True
@@ -18,7 +20,17 @@ class RavenChainCLI:
         self.difficulty = int(os.getenv("MINING_DIFFICULTY", "2"))
         self.debug = os.getenv("DEBUG", "0") == "1"
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.blockchain = Blockchain(difficulty=self.difficulty)
+        self.storage_backend = settings.STORAGE_BACKEND
+        self.blockchain = Blockchain(
+            difficulty=self.difficulty,
+            storage=create_block_store(
+                self.storage_backend,
+                data_dir=str(self.data_dir),
+                database_url=settings.DATABASE_URL,
+            ),
+            prune_keep_blocks=settings.PRUNE_KEEP_BLOCKS,
+            prune_keep_bytes=settings.PRUNE_KEEP_BYTES,
+        )
         self.wallets = {}
         self.current_wallet = None
         self.wallet_file = self.data_dir / "wallets.dat"
@@ -30,6 +42,7 @@ class RavenChainCLI:
             "Initializing RavenChain CLI",
             data_dir=str(self.data_dir),
             difficulty=self.difficulty,
+            storage=self.storage_backend,
             debug=self.debug,
         )
         self.load_wallets()
@@ -76,7 +89,7 @@ class RavenChainCLI:
             print("Wallet with this name already exists!")
             return
 
-        wallet = Wallet()
+        wallet = Wallet().create_wallet()
         self.wallets[name] = wallet
         self.save_wallets()
         print(f"\nWallet '{name}' created successfully!")
@@ -142,13 +155,17 @@ class RavenChainCLI:
 
         print("Mining new block...")
         self.blockchain.mine_pending_transactions(self.wallets[self.current_wallet].address)
+        if self.blockchain.pruning:
+            self.blockchain.prune()
         print("Block mined successfully!")
         print("Mining reward added to your wallet.")
 
     def view_blockchain(self):
         """View all blocks in the blockchain"""
         print("\n=== Blockchain Data ===")
-        for block in self.blockchain.chain:
+        if self.blockchain.pruned_height:
+            print(f"Blocks below #{self.blockchain.pruned_height} are pruned (headers only)")
+        for block in self.blockchain.chain[self.blockchain.pruned_height :]:
             print(f"\nBlock #{block.index}")
             print(f"Timestamp: {block.timestamp}")
             print(f"Previous Hash: {block.previous_hash}")
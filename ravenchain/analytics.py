@@ -0,0 +1,435 @@
+"""
+Columnar transaction projection and vectorized chain analytics.
+
+Requires the optional ``numpy`` dependency (``pip install ravenchain[analytics]``).
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    np = None
+
+from .blockchain import ChainListener
+
+logger = logging.getLogger(__name__)
+
+# Amounts are stored as fixed-point integers with this many units per coin
+AMOUNT_SCALE = 10**8
+
+# Sender and recipient id of the missing side of a transaction, e.g. mining rewards
+NO_ADDRESS = -1
+
+COLUMNS = {
+    "height": "int64",
+    "timestamp": "int64",  # Microseconds since the Unix epoch, UTC
+    "sender": "int32",
+    "recipient": "int32",
+    "amount": "int64",
+}
+META_FILE = "meta.json"
+ADDRESSES_FILE = "addresses.txt"
+INITIAL_CAPACITY = 1024
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROS_PER_HOUR = 3600 * 1000000
+
+
+def to_micros(timestamp):
+    """Convert a datetime to microseconds since the epoch, treating naive values as UTC"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(micros):
+    """Convert microseconds since the epoch to an aware UTC datetime"""
+    return EPOCH + timedelta(microseconds=int(micros))
+
+
+class TransactionColumns(ChainListener):
+    """
+    Append-only NumPy columns with one row per confirmed transaction.
+
+    Rows hold the block height, the transaction timestamp, integer ids for the sender and
+    recipient addresses and the amount in fixed-point units. With a ``path`` the columns are
+    ``.npy`` files opened with memory mapping and grown by doubling, addresses are appended
+    to a text file, and ``meta.json`` records how many rows and addresses are valid, so a
+    crash never exposes a partially written block. Registered as a listener, the columns
+    follow the chain as blocks connect and roll back.
+
+    Only one process may write a column directory. Persisted columns apply connected blocks
+    on a background thread, so the chain lock is never held while they grow or write, and
+    every batch of queued blocks is written out with one flush. Other processes open the
+    directory with ``read_only`` and remap it whenever the writer has published new rows.
+    """
+
+    def __init__(self, path=None, read_only=False):
+        """
+        :param path: Directory holding the column files, or None to keep them in memory
+        :param read_only: Follow columns another process writes instead of writing them
+        """
+        if np is None:
+            raise ImportError("numpy is required for chain analytics: pip install numpy")
+        if read_only and path is None:
+            raise ValueError("Read-only columns need the path of the writer's directory")
+        self.path = Path(path) if path is not None else None
+        self.read_only = read_only
+        self._lock = threading.RLock()
+        self._columns = {}
+        self._size = 0
+        self._capacity = 0
+        self._addresses = []
+        self._address_ids = {}
+        self._new_addresses = []
+        self.height = -1
+        self._updates = None
+        if read_only:
+            self._meta_version = None
+            self._addresses_offset = 0
+            self._columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+            self._reload()
+        elif self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._open()
+            self._updates = queue.Queue()
+            self._writer = threading.Thread(
+                target=self._apply_updates, name="analytics-writer", daemon=True
+            )
+            self._writer.start()
+        else:
+            self._allocate(INITIAL_CAPACITY)
+
+    def __len__(self):
+        return self._size
+
+    def columns(self):
+        """
+        Get read-only views of the valid rows of every column.
+
+        The views stay valid while more blocks are appended.
+
+        :return: Dictionary mapping column names to NumPy arrays
+        """
+        with self._lock:
+            if self.read_only:
+                self._reload()
+            views = {}
+            for name, column in self._columns.items():
+                view = column[: self._size].view()
+                view.flags.writeable = False
+                views[name] = view
+            return views
+
+    def address(self, address_id):
+        """Get the address string for an address id"""
+        return self._addresses[address_id]
+
+    def attached(self, blockchain):
+        self.sync(blockchain)
+
+    def block_connected(self, block):
+        if self._updates is not None:
+            self._updates.put((self._append, block))
+        else:
+            self.append_block(block)
+
+    def chain_rolled_back(self, height, removed):
+        if self._updates is not None:
+            self._updates.put((self._truncate, height))
+        else:
+            self.truncate(height)
+
+    def append_block(self, block):
+        """
+        Append the transactions of the next block.
+
+        :param block: Block at height ``self.height + 1``
+        """
+        with self._lock:
+            self._append(block)
+            self._flush()
+
+    def truncate(self, height):
+        """
+        Drop every row above a height, used when the chain rolls back.
+
+        :param height: Height of the new tip
+        """
+        with self._lock:
+            self._truncate(height)
+            self._flush()
+
+    def sync(self, blockchain):
+        """
+        Catch up with blocks the columns have not seen, e.g. after enabling analytics.
+
+        Heights whose transactions were pruned are skipped.
+
+        :param blockchain: Blockchain to read from
+        :return: Number of blocks appended
+        """
+        with self._lock:
+            if self.height >= len(blockchain.chain):
+                self._truncate(len(blockchain.chain) - 1)
+            if self.height + 1 < blockchain.pruned_height:
+                self.height = blockchain.pruned_height - 1
+            start = self.height + 1
+            for height in range(start, len(blockchain.chain)):
+                self._append(blockchain.chain[height])
+            self._flush()
+            return len(blockchain.chain) - start
+
+    def flush(self):
+        """Wait until every connected block has been applied and written"""
+        if self._updates is not None:
+            self._updates.join()
+
+    def close(self):
+        """Write out queued blocks and stop the background writer"""
+        if self._updates is not None:
+            self._updates.put(None)
+            self._writer.join()
+            self._updates = None
+
+    def _apply_updates(self):
+        while True:
+            batch = [self._updates.get()]
+            with suppress(queue.Empty):
+                while True:
+                    batch.append(self._updates.get_nowait())
+            try:
+                with self._lock:
+                    for update in batch:
+                        if update is not None:
+                            apply, value = update
+                            apply(value)
+                    self._flush()
+            except Exception as e:
+                logger.error(f"Error updating analytics columns: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._updates.task_done()
+            if None in batch:
+                return
+
+    def _append(self, block):
+        if self.read_only:
+            raise RuntimeError("Read-only analytics columns cannot be changed")
+        if block.index != self.height + 1:
+            raise ValueError(f"Block {block.index} does not follow height {self.height}")
+        rows = []
+        for tx in block.data:
+            rows.append(
+                (
+                    to_micros(tx.timestamp),
+                    self._address_id(tx.sender),
+                    self._address_id(tx.recipient),
+                    round(tx.amount * AMOUNT_SCALE),
+                )
+            )
+        self._reserve(self._size + len(rows))
+        start, end = self._size, self._size + len(rows)
+        if rows:
+            timestamps, senders, recipients, amounts = zip(*rows)
+            self._columns["height"][start:end] = block.index
+            self._columns["timestamp"][start:end] = timestamps
+            self._columns["sender"][start:end] = senders
+            self._columns["recipient"][start:end] = recipients
+            self._columns["amount"][start:end] = amounts
+        self._size = end
+        self.height = block.index
+
+    def _truncate(self, height):
+        if self.read_only:
+            raise RuntimeError("Read-only analytics columns cannot be changed")
+        self._size = int(
+            np.searchsorted(self._columns["height"][: self._size], height, side="right")
+        )
+        self.height = min(self.height, height)
+
+    def _address_id(self, address):
+        if address is None:
+            return NO_ADDRESS
+        address_id = self._address_ids.get(address)
+        if address_id is None:
+            address_id = len(self._addresses)
+            self._addresses.append(address)
+            self._address_ids[address] = address_id
+            self._new_addresses.append(address)
+        return address_id
+
+    def _allocate(self, capacity):
+        for name, dtype in COLUMNS.items():
+            if self.path is None:
+                column = np.zeros(capacity, dtype=dtype)
+            else:
+                column = np.lib.format.open_memmap(
+                    self.path / f"{name}.npy.tmp", mode="w+", dtype=dtype, shape=(capacity,)
+                )
+            old = self._columns.get(name)
+            if old is not None:
+                column[: self._size] = old[: self._size]
+            if self.path is not None:
+                column.flush()
+                os.replace(self.path / f"{name}.npy.tmp", self.path / f"{name}.npy")
+            self._columns[name] = column
+        self._capacity = capacity
+
+    def _reserve(self, size):
+        if size > self._capacity:
+            capacity = max(self._capacity, INITIAL_CAPACITY)
+            while capacity < size:
+                capacity *= 2
+            self._allocate(capacity)
+
+    def _open(self):
+        meta_path = self.path / META_FILE
+        if not meta_path.exists():
+            self._allocate(INITIAL_CAPACITY)
+            (self.path / ADDRESSES_FILE).write_bytes(b"")
+            return
+        meta = json.loads(meta_path.read_text())
+        for name in COLUMNS:
+            self._columns[name] = np.load(self.path / f"{name}.npy", mmap_mode="r+")
+        # A crash while growing can leave columns with different capacities
+        self._capacity = min(len(column) for column in self._columns.values())
+        self._size = meta["rows"]
+        self.height = meta["height"]
+        with open(self.path / ADDRESSES_FILE, "rb+") as f:
+            lines = [f.readline() for _ in range(meta["addresses"])]
+            # Drop addresses written after the last metadata update
+            f.truncate(f.tell())
+        self._addresses = [line.decode().rstrip("\n") for line in lines]
+        self._address_ids = {address: i for i, address in enumerate(self._addresses)}
+
+    def _reload(self):
+        meta_path = self.path / META_FILE
+        try:
+            stat = meta_path.stat()
+        except FileNotFoundError:
+            return
+        # The writer replaces meta.json on every flush, so a new inode means new rows
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if version == self._meta_version:
+            return
+        meta = json.loads(meta_path.read_text())
+        # Rows below meta["rows"] were flushed before the metadata, in old or regrown files
+        self._columns = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in COLUMNS
+        }
+        self._capacity = min(len(column) for column in self._columns.values())
+        with open(self.path / ADDRESSES_FILE, "rb") as f:
+            f.seek(self._addresses_offset)
+            for _ in range(meta["addresses"] - len(self._addresses)):
+                self._addresses.append(f.readline().decode().rstrip("\n"))
+            self._addresses_offset = f.tell()
+        del self._addresses[meta["addresses"] :]
+        self._size = meta["rows"]
+        self.height = meta["height"]
+        self._meta_version = version
+
+    def _flush(self):
+        new_addresses, self._new_addresses = self._new_addresses, []
+        if self.path is None:
+            return
+        # Rows and addresses are written before the metadata that makes them visible
+        for column in self._columns.values():
+            column.flush()
+        if new_addresses:
+            with open(self.path / ADDRESSES_FILE, "a", encoding="utf-8") as f:
+                f.writelines(f"{address}\n" for address in new_addresses)
+        meta = {"rows": self._size, "height": self.height, "addresses": len(self._addresses)}
+        tmp_path = self.path / f"{META_FILE}.tmp"
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.path / META_FILE)
+
+
+def volume_per_block(columns, start=None, end=None, include_rewards=False):
+    """
+    Sum the transferred amount of every block in a height range.
+
+    :param columns: TransactionColumns to aggregate
+    :param start: First height, or None for the first projected height
+    :param end: Height to stop before, or None for the tip
+    :param include_rewards: Whether mining rewards count as volume
+    :return: List of (height, volume) tuples, one per height with transactions
+    """
+    data = columns.columns()
+    heights, amounts = data["height"], data["amount"]
+    lo = 0 if start is None else np.searchsorted(heights, start, side="left")
+    hi = len(heights) if end is None else np.searchsorted(heights, end, side="left")
+    heights, amounts = heights[lo:hi], amounts[lo:hi]
+    if not include_rewards:
+        transfers = data["sender"][lo:hi] != NO_ADDRESS
+        heights, amounts = heights[transfers], amounts[transfers]
+    if not len(heights):
+        return []
+    # Heights are sorted, so every block is one contiguous run of rows
+    starts = np.flatnonzero(np.r_[True, heights[1:] != heights[:-1]])
+    volumes = np.add.reduceat(amounts, starts)
+    return [
+        (int(height), int(volume) / AMOUNT_SCALE)
+        for height, volume in zip(heights[starts], volumes)
+    ]
+
+
+def top_senders(columns, since, limit=10):
+    """
+    Rank addresses by the total amount they sent since a point in time.
+
+    :param columns: TransactionColumns to aggregate
+    :param since: Aware or UTC datetime where the window starts
+    :param limit: Maximum number of addresses returned
+    :return: List of dicts with address, amount and transactions, largest amount first
+    """
+    data = columns.columns()
+    window = (data["timestamp"] >= to_micros(since)) & (data["sender"] != NO_ADDRESS)
+    senders, amounts = data["sender"][window], data["amount"][window]
+    if not len(senders):
+        return []
+    order = np.argsort(senders, kind="stable")
+    senders, amounts = senders[order], amounts[order]
+    starts = np.flatnonzero(np.r_[True, senders[1:] != senders[:-1]])
+    totals = np.add.reduceat(amounts, starts)
+    counts = np.diff(np.r_[starts, len(senders)])
+    top = np.argsort(-totals, kind="stable")[:limit]
+    return [
+        {
+            "address": columns.address(int(senders[starts[i]])),
+            "amount": int(totals[i]) / AMOUNT_SCALE,
+            "transactions": int(counts[i]),
+        }
+        for i in top
+    ]
+
+
+def transactions_per_hour(columns, since, until=None):
+    """
+    Count transactions in every hour of a time window.
+
+    :param columns: TransactionColumns to aggregate
+    :param since: Aware or UTC datetime where the window starts
+    :param until: End of the window, or None for now
+    :return: List of (hour start, count) tuples, including empty hours
+    """
+    until = until or datetime.now(timezone.utc)
+    first_hour = to_micros(since) // MICROS_PER_HOUR
+    last_hour = to_micros(until) // MICROS_PER_HOUR
+    if last_hour < first_hour:
+        return []
+    hours = columns.columns()["timestamp"] // MICROS_PER_HOUR
+    hours = hours[(hours >= first_hour) & (hours <= last_hour)] - first_hour
+    counts = np.bincount(hours, minlength=last_hour - first_hour + 1)
+    return [
+        (from_micros((first_hour + i) * MICROS_PER_HOUR), int(count))
+        for i, count in enumerate(counts)
+    ]
@@ -1,6 +1,7 @@
 import hashlib
 from datetime import datetime, timezone
 
+from ravenchain.tracing import span
 from ravenchain.transaction import Transaction
 
 
@@ -21,6 +22,18 @@ class Block:
         self.nonce = 0
         self.hash = self.calculate_hash()
 
+    @classmethod
+    def restore(cls, index, timestamp, data, previous_hash, nonce, block_hash):
+        """Rebuild a stored block from trusted fields without recomputing its hash"""
+        block = cls.__new__(cls)
+        block.index = index
+        block.timestamp = timestamp
+        block.data = data
+        block.previous_hash = previous_hash
+        block.nonce = nonce
+        block.hash = block_hash
+        return block
+
     def calculate_hash(self):
         """Calculate the hash of the block using SHA-256"""
         block_string = f"{self.index}{self.timestamp}{self.data}{self.previous_hash}{self.nonce}"
@@ -29,9 +42,12 @@ class Block:
     def mine_block(self, difficulty):
         """Mine the block by finding a hash with the required number of leading zeros"""
         target = "0" * difficulty
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        with span("mine_block", height=self.index, difficulty=difficulty) as current:
+            first_nonce = self.nonce
+            while self.hash[:difficulty] != target:
+                self.nonce += 1
+                self.hash = self.calculate_hash()
+            current.set_attribute("hashes", self.nonce - first_nonce)
         return self.hash
 
     def to_dict(self):
@@ -1,29 +1,104 @@
+import threading
 from datetime import datetime, timezone
-from api.database.models import BlockDB, TransactionDB
 from ravenchain.wallet import Wallet
 from .block import Block
+from .chain import Chain
+from .state import BalanceState
+from .storage import MemoryBlockStore
+from .storage.base import GROUP_COMMIT_SIZE, LOAD_BATCH_SIZE, PRUNE_BATCH_SIZE, BlockPrunedError
+from .tracing import span
 from .transaction import Transaction
 
 
+class ChainListener:
+    """
+    Receives chain changes, e.g. to maintain derived indexes.
+
+    Listeners are called while the chain lock is held, right after storage accepted the
+    change, so they must not block.
+    """
+
+    def attached(self, blockchain):
+        """Called when the listener is registered, before any other change is sent"""
+
+    def block_connected(self, block):
+        """Called after a block was appended at the tip"""
+
+    def chain_rolled_back(self, height, removed):
+        """
+        Called after every block above a height was removed.
+
+        :param height: Height of the new tip
+        :param removed: Removed Block objects, highest first
+        """
+
+    def transaction_added(self, tx):
+        """Called after a transaction was admitted to the pending pool"""
+
+
 class Blockchain:
-    def __init__(self, sessionmaker, difficulty=4, mining_reward=10.0):
+    def __init__(
+        self,
+        sessionmaker=None,
+        difficulty=4,
+        mining_reward=10.0,
+        resident_blocks=1000,
+        cache_bytes=64 * 1024 * 1024,
+        storage=None,
+        prune_keep_blocks=0,
+        prune_keep_bytes=0,
+        read_only=False,
+    ):
         """
-        Initialize the blockchain with a genesis block or load from database.
+        Initialize the blockchain with a genesis block or load it from storage.
 
-        :param sessionmaker: SQLAlchemy sessionmaker for database operations
+        :param sessionmaker: SQLAlchemy sessionmaker, used when no storage is given
         :param difficulty: Mining difficulty (number of leading zeros required in hash)
         :param mining_reward: Reward given to miners for each block
+        :param resident_blocks: Number of blocks at the tip always kept in memory
+        :param cache_bytes: Byte budget for older blocks loaded on demand from storage
+        :param storage: BlockStore used to persist blocks; defaults to an in-memory store
+        :param prune_keep_blocks: Keep full blocks for this many heights at the tip and only
+            headers below them; 0 keeps every block
+        :param prune_keep_bytes: Keep full blocks for as many heights at the tip as fit in
+            this many bytes, but never fewer than prune_keep_blocks; 0 disables the limit
+        :param read_only: Follow a chain written by another process through ``refresh``
+            instead of writing to storage; no genesis block is created
         """
+        if storage is None and sessionmaker is not None:
+            from .storage.sql import SQLBlockStore
+
+            storage = SQLBlockStore(sessionmaker)
+        elif storage is None:
+            storage = MemoryBlockStore()
+        if (prune_keep_blocks or prune_keep_bytes) and not storage.supports_pruning:
+            raise ValueError(f"{type(storage).__name__} does not support pruning")
         self.sessionmaker = sessionmaker
+        self.storage = storage
         self.difficulty = difficulty
         self.mining_reward = mining_reward
-        self.chain = []
-        with self.sessionmaker() as session:
-            self.chain = self.load_chain_from_db(session)
-            if not self.chain:
-                genesis_block = self.create_genesis_block()
-                self.chain = [genesis_block]
-                self.save_block_to_db(session, genesis_block)
+        self.prune_keep_blocks = (
+            max(prune_keep_blocks, 1) if prune_keep_bytes else prune_keep_blocks
+        )
+        self.prune_keep_bytes = prune_keep_bytes
+        self.read_only = read_only
+        self.pruned_height = 0
+        self._state = None
+        self._saved_state_height = -1
+        self._listeners = []
+        # Serializes chain appends with balance updates and pruning batches
+        self._lock = threading.RLock()
+        self._mining_lock = threading.Lock()
+        # Guards every change to pending_transactions
+        self._pending_lock = threading.Lock()
+        self.chain = Chain(
+            loader=self._load_block, resident_blocks=resident_blocks, cache_bytes=cache_bytes
+        )
+        self._load_chain()
+        if not self.chain and not read_only:
+            genesis_block = self.create_genesis_block()
+            self.storage.append_blocks([genesis_block])
+            self.chain.append(genesis_block)
         self.pending_transactions = []
 
     def create_genesis_block(self):
@@ -42,11 +117,122 @@ class Blockchain:
         :raises: ValueError if no blocks are found
         """
         if not self.chain:
-            with self.sessionmaker() as session:
-                self.chain = self.load_chain_from_db(session)
+            self._load_chain()
         if not self.chain:
             raise ValueError("No blocks found in the chain")
-        return self.chain[-1]
+        return self.chain.tip
+
+    def get_block_by_hash(self, block_hash):
+        """
+        Get a block by its hash without scanning the chain.
+
+        :param block_hash: Hash of the block
+        :return: The Block object, or None if no block has that hash
+        """
+        return self.chain.get_by_hash(block_hash)
+
+    def rollback_to(self, height):
+        """
+        Remove every block above a height from storage and the in-memory chain.
+
+        :param height: Height of the block that becomes the new tip
+        :return: List of removed Block objects, highest first
+        """
+        self._check_writable()
+        with self._lock:
+            if height < self.pruned_height or height >= len(self.chain):
+                raise ValueError(f"Cannot roll back to height {height}")
+            self.storage.truncate(height)
+            removed = self._pop_to(height)
+            # A committed state ahead of the new tip would be replayed on top of the wrong blocks
+            if self._saved_state_height > height:
+                self.storage.save_state(self._balance_state().snapshot(self.pruned_height))
+                self._saved_state_height = height
+            for listener in self._listeners:
+                listener.chain_rolled_back(height, removed)
+            return removed
+
+    def refresh(self):
+        """
+        Catch up with blocks another process appended to storage since the last refresh.
+
+        Only blocks above the local tip are read. If the writer rolled the chain back and
+        mined a different branch, the local chain is rolled back to the last block both
+        agree on before the new blocks are appended. Listeners are notified as if the
+        changes happened locally.
+
+        Storage is read without the chain lock, which is only taken to swap the changes
+        in, so readers of the chain never wait for a storage round trip.
+
+        :return: Number of blocks appended
+        """
+        while True:
+            with self._lock:
+                tip = len(self.chain) - 1
+                tip_hash = self.chain.header(tip).hash if tip >= 0 else None
+                pruned_height = self.pruned_height
+            saved = self.storage.load_state() if self.pruning else None
+            if saved is not None:
+                pruned_height = max(pruned_height, saved.pruned_height)
+            fork = self._find_fork(tip, pruned_height)
+            # The writer never rolls back into pruned heights, whose bodies are gone
+            if fork < tip and fork < pruned_height and pruned_height:
+                raise ValueError(f"Cannot follow a rollback below height {fork + 1}")
+            blocks = list(self.storage.iter_blocks(start=fork + 1))
+            with self._lock:
+                if len(self.chain) - 1 != tip or (
+                    tip >= 0 and self.chain.header(tip).hash != tip_hash
+                ):
+                    # Changed while storage was read; read again from the new tip
+                    continue
+                if pruned_height > self.pruned_height:
+                    self.chain.evict(self.pruned_height, pruned_height)
+                    self.pruned_height = pruned_height
+                if fork < tip:
+                    removed = self._pop_to(fork)
+                    for listener in self._listeners:
+                        listener.chain_rolled_back(fork, removed)
+                for block in blocks:
+                    self._append(block)
+                return len(blocks)
+
+    def _find_fork(self, tip, pruned_height):
+        """
+        Find the highest local height whose header matches the stored one.
+
+        Stored headers are compared from the tip down in windows that double in size, so
+        the common case of an unchanged tip costs one single-header read.
+
+        :return: The height, or pruned_height - 1 if no unpruned height matches
+        """
+        window = 1
+        high = tip + 1
+        while high > pruned_height:
+            low = max(pruned_height, high - window)
+            for header in reversed(self.storage.load_headers(low, high)):
+                if header.hash == self.chain.header(header.index).hash:
+                    return header.index
+            high = low
+            window *= 2
+        return pruned_height - 1
+
+    def add_listener(self, listener):
+        """
+        Register a ChainListener for blocks connected or rolled back from now on.
+
+        The chain cannot change between the listener's ``attached`` call and its
+        registration, so listeners can catch up there without missing a block.
+
+        :param listener: ChainListener instance
+        """
+        with self._lock:
+            listener.attached(self)
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop sending chain changes to a listener"""
+        with self._lock:
+            self._listeners.remove(listener)
 
     def add_transaction(self, sender, recipient, amount, wallet=None):
         """
@@ -61,18 +247,62 @@ class Blockchain:
         tx = Transaction(sender, recipient, amount)
         if wallet and sender == wallet.address:
             tx.signature = wallet.sign_transaction(tx)
-        self.pending_transactions.append(tx)
+        return self.add_pending_transaction(tx)
+
+    def add_pending_transaction(self, tx):
+        """
+        Add an already built transaction to the pending pool.
+
+        :param tx: Transaction to include in the next mined block
+        :return: Index of the block that will include this transaction
+        """
+        self._check_writable()
+        with self._pending_lock:
+            self.pending_transactions.append(tx)
+        self.notify_transaction(tx)
         return self.get_latest_block().index + 1
 
+    def add_pending_transactions(self, transactions):
+        """
+        Add already built transactions to the pending pool together.
+
+        :param transactions: Transactions to include in the next mined block
+        :return: Index of the block that will include them
+        """
+        self._check_writable()
+        # One extend under the pool lock, so a block mined meanwhile includes all or none
+        with self._pending_lock:
+            self.pending_transactions.extend(transactions)
+        for tx in transactions:
+            self.notify_transaction(tx)
+        return self.get_latest_block().index + 1
+
+    def notify_transaction(self, tx):
+        """
+        Send a transaction admitted to the pending pool to the listeners.
+
+        Read-only chains call this for transactions the writer admitted.
+
+        :param tx: The admitted Transaction
+        """
+        with self._lock:
+            for listener in self._listeners:
+                listener.transaction_added(tx)
+
     def mine_pending_transactions(self, miner_address):
         """
-        Mine pending transactions and add them to a new block, then save to database.
+        Mine pending transactions and add them to a new block, then save it to storage.
 
         :param miner_address: Address where the mining reward will be sent
+        :return: The mined Block
         """
-        with self.sessionmaker() as session:
+        self._check_writable()
+        # Two blocks mined at once would both claim the next height
+        with self._mining_lock, span("mine_pending_transactions") as current:
             coinbase_tx = Transaction(None, miner_address, self.mining_reward)
-            block_data = [coinbase_tx] + self.pending_transactions
+            with self._pending_lock:
+                block_data = [coinbase_tx] + self.pending_transactions
+            current.set_attribute("transactions", len(block_data))
             block = Block(
                 len(self.chain),
                 datetime.now(timezone.utc),
@@ -80,25 +310,115 @@ class Blockchain:
                 self.get_latest_block().hash,
             )
             block.mine_block(self.difficulty)
-            self.chain.append(block)
-            self.save_block_to_db(session, block)
-            self.pending_transactions = []
+            with self._lock, span("append_blocks", blocks=1):
+                self.storage.append_blocks([block])
+                self._append(block)
+            # Keep transactions submitted while the block was being mined
+            with self._pending_lock:
+                del self.pending_transactions[: len(block_data) - 1]
+        return block
+
+    def import_blocks(self, blocks, group_commit_size=GROUP_COMMIT_SIZE):
+        """
+        Append already-mined blocks, persisting them with group commits.
+
+        Blocks are only appended to the in-memory chain once the group that contains them
+        has been committed.
+
+        :param blocks: Block objects extending the current tip, in height order
+        :param group_commit_size: Number of blocks persisted per commit
+        :return: Number of blocks imported
+        :raises: ValueError if the blocks do not extend the chain
+        """
+        self._check_writable()
+        blocks = list(blocks)
+        expected_index = len(self.chain)
+        previous_hash = self.chain.tip.hash if self.chain else "0"
+        for block in blocks:
+            if block.index != expected_index or block.previous_hash != previous_hash:
+                raise ValueError(f"Block {block.index} does not extend the chain")
+            expected_index += 1
+            previous_hash = block.hash
+
+        for start in range(0, len(blocks), group_commit_size):
+            group = blocks[start : start + group_commit_size]
+            with self._lock:
+                self.storage.append_blocks(group, group_commit_size)
+                for block in group:
+                    self._append(block)
+        return len(blocks)
 
     def get_balance(self, address):
         """
-        Calculate the balance of a given address.
+        Get the balance of a given address from the derived balance state.
 
         :param address: Wallet address to check
         :return: Current balance
         """
-        balance = 0
-        for block in self.chain:
-            for transaction in block.data:
-                if transaction.sender == address:
-                    balance -= transaction.amount
-                if transaction.recipient == address:
-                    balance += transaction.amount
-        return balance
+        with self._lock:
+            return self._balance_state().get(address)
+
+    @property
+    def pruning(self):
+        """Whether old block bodies are deleted once they leave the kept window"""
+        return bool(self.prune_keep_blocks or self.prune_keep_bytes)
+
+    def prune_target(self):
+        """
+        Get the height below which block bodies fall outside the kept window.
+
+        :return: Height that becomes the pruned height after the next prune
+        """
+        if not self.pruning:
+            return 0
+        height = len(self.chain)
+        keep = self.prune_keep_blocks
+        if self.prune_keep_bytes:
+            kept_bytes = 0
+            end = height
+            while end > self.pruned_height and kept_bytes <= self.prune_keep_bytes:
+                start = max(self.pruned_height, end - PRUNE_BATCH_SIZE)
+                for size in reversed(self.storage.body_sizes(start, end)):
+                    kept_bytes += size
+                    if kept_bytes > self.prune_keep_bytes:
+                        break
+                    end -= 1
+                else:
+                    continue
+                break
+            keep = max(keep, height - end)
+        return max(self.pruned_height, height - keep)
+
+    def prune(self, batch_size=PRUNE_BATCH_SIZE):
+        """
+        Delete the transaction bodies of blocks outside the kept window, keeping headers.
+
+        The balance state is committed first so balances never depend on deleted bodies.
+        Bodies are then deleted in batches, each committed with the new pruned height,
+        so the chain stays readable and appendable while a prune runs in the background.
+
+        :param batch_size: Number of blocks pruned per commit
+        :return: Number of blocks whose bodies were deleted
+        """
+        self._check_writable()
+        target = self.prune_target()
+        if target <= self.pruned_height:
+            return 0
+        with self._lock:
+            state = self._balance_state()
+            self.storage.save_state(state.snapshot(self.pruned_height))
+            self._saved_state_height = state.height
+
+        pruned = 0
+        while self.pruned_height < target:
+            with self._lock:
+                start = self.pruned_height
+                end = min(start + batch_size, target)
+                self.storage.prune_bodies(start, end)
+                self.pruned_height = end
+                self.chain.evict(start, end)
+            pruned += end - start
+        return pruned
 
     def is_chain_valid(self, wallet_registry):
         """
@@ -108,10 +428,15 @@ class Blockchain:
         :return: True if the chain is valid, False otherwise
         """
         for i in range(1, len(self.chain)):
+            if i < self.pruned_height:
+                # Only the header is left, so only the hash link can be checked
+                if self.chain.header(i).previous_hash != self.chain.header(i - 1).hash:
+                    return False
+                continue
             current = self.chain[i]
             if current.hash != current.calculate_hash():
                 return False
-            if current.previous_hash != self.chain[i - 1].hash:
+            if self.chain.height_of(current.previous_hash) != i - 1:
                 return False
             for tx in current.data:
                 if tx.signature and tx.sender:
@@ -122,53 +447,115 @@ class Blockchain:
                         return False
         return True
 
-    def load_chain_from_db(self, session):
+    def load_chain_from_db(self, session, batch_size=LOAD_BATCH_SIZE):
         """
-        Load the blockchain from the database, converting DB models to in-memory models.
+        Load the blockchain from the database, converting DB rows to in-memory models.
 
         :param session: SQLAlchemy session for database queries
-        :return: List of Block objects
-        """
-        chain = []
-        db_blocks = session.query(BlockDB).order_by(BlockDB.index).all()
-        for db_block in db_blocks:
-            transactions = []
-            for db_tx in db_block.transactions:
-                tx = Transaction(
-                    db_tx.sender, db_tx.recipient, db_tx.amount, signature=db_tx.signature
-                )
-                tx.timestamp = db_tx.timestamp
-                transactions.append(tx)
-            block = Block(db_block.index, db_block.timestamp, transactions, db_block.previous_hash)
-            block.nonce = db_block.nonce
-            block.hash = db_block.hash
-            chain.append(block)
-        return chain
+        :param batch_size: Number of blocks read per round-trip
+        :return: List of Block objects from the pruned height to the tip
+        """
+        from .storage.sql import iter_blocks_from_db, load_state_from_db
+
+        with span("load_chain_from_db") as current:
+            state = load_state_from_db(session)
+            start = state.pruned_height if state is not None else 0
+            blocks = list(iter_blocks_from_db(session, start, batch_size=batch_size))
+            current.set_attribute("blocks", len(blocks))
+        return blocks
+
+    def load_headers_from_db(self, session):
+        """
+        Load the header of every block without transaction bodies.
+
+        :param session: SQLAlchemy session for database queries
+        :return: List of BlockHeader objects ordered by height
+        """
+        from .storage.sql import load_headers_from_db
+
+        return load_headers_from_db(session)
 
     def save_block_to_db(self, session, block):
         """
-        Save a block and its transactions to the database.
+        Save a block and its transactions to the database in a single transaction.
 
         :param session: SQLAlchemy session for database operations
         :param block: Block object to save
         """
-        db_block = BlockDB(
-            index=block.index,
-            timestamp=block.timestamp,
-            previous_hash=block.previous_hash,
-            nonce=block.nonce,
-            hash=block.hash,
-        )
-        session.add(db_block)
-        session.flush()
-        for tx in block.data:
-            db_tx = TransactionDB(
-                sender=tx.sender,
-                recipient=tx.recipient,
-                amount=tx.amount,
-                timestamp=tx.timestamp,
-                signature=tx.signature,
-                block_id=db_block.id,
-            )
-            session.add(db_tx)
-        session.commit()
+        with span("save_block_to_db", height=block.index):
+            self.save_blocks_to_db(session, [block])
+
+    def save_blocks_to_db(self, session, blocks, group_commit_size=GROUP_COMMIT_SIZE):
+        """
+        Save many blocks to the database, committing once per group of blocks.
+
+        :param session: SQLAlchemy session for database operations
+        :param blocks: Block objects to save, in height order
+        :param group_commit_size: Number of blocks persisted per commit
+        :return: Number of blocks saved
+        """
+        from .storage.sql import save_blocks_to_db
+
+        with span("save_blocks_to_db"):
+            return save_blocks_to_db(session, blocks, group_commit_size)
+
+    def _load_chain(self):
+        """Load all headers, the resident tail of blocks and any committed balance state"""
+        with span("load_chain"):
+            self._load_resident_chain()
+
+    def _load_resident_chain(self):
+        headers = self.storage.load_headers()
+        if not headers:
+            return
+        saved = self.storage.load_state()
+        if saved is not None:
+            self.pruned_height = saved.pruned_height
+        first_resident = max(0, len(headers) - self.chain.resident_blocks, self.pruned_height)
+        self.chain.reset(headers, self.storage.iter_blocks(start=first_resident))
+        if saved is not None:
+            # Only the blocks appended since the last commit are replayed
+            self._saved_state_height = saved.height
+            self._state = BalanceState(saved.balances, saved.height)
+            for block in self.storage.iter_blocks(start=saved.height + 1):
+                self._state.apply(block)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise RuntimeError("This blockchain is read-only; changes go through the writer")
+
+    def _pop_to(self, height):
+        """Remove blocks above a height from memory and the balance state, highest first"""
+        removed = []
+        while len(self.chain) > height + 1:
+            block = self.chain.pop()
+            if self._state is not None:
+                self._state.revert(block)
+            removed.append(block)
+        return removed
+
+    def _append(self, block):
+        """Append a stored block to the chain and the balance state"""
+        self.chain.append(block)
+        if self._state is not None:
+            self._state.apply(block)
+        for listener in self._listeners:
+            listener.block_connected(block)
+
+    def _balance_state(self):
+        """Get the balance state, replaying the stored chain the first time it is needed"""
+        if self._state is None:
+            state = BalanceState()
+            for block in self.storage.iter_blocks():
+                state.apply(block)
+            self._state = state
+        return self._state
+
+    def _load_block(self, height):
+        """Chain loader used to page in blocks that are no longer resident"""
+        if height < self.pruned_height:
+            raise BlockPrunedError(height, self.pruned_height)
+        block = self.storage.load_block(height)
+        if block is None:
+            raise IndexError(f"Block {height} not found in storage")
+        return block
@@ -0,0 +1,282 @@
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, NamedTuple, Optional
+from datetime import datetime
+
+from .block import Block
+
+# Rough per-object overheads used when estimating how much memory a block occupies
+BLOCK_OVERHEAD_BYTES = 512
+TRANSACTION_OVERHEAD_BYTES = 256
+
+
+class BlockHeader(NamedTuple):
+    index: int
+    timestamp: datetime
+    previous_hash: str
+    nonce: int
+    hash: str
+
+    @classmethod
+    def from_block(cls, block):
+        """Build a header from a full block"""
+        return cls(block.index, block.timestamp, block.previous_hash, block.nonce, block.hash)
+
+
+def estimate_block_size(block):
+    """
+    Estimate the in-memory footprint of a block in bytes.
+
+    The estimate only needs to be stable and roughly proportional to the real size so the
+    cache can enforce a byte budget; it is not an exact measurement.
+
+    :param block: Block to measure
+    :return: Approximate size in bytes
+    """
+    size = BLOCK_OVERHEAD_BYTES + len(block.hash) + len(block.previous_hash)
+    for tx in block.data:
+        size += TRANSACTION_OVERHEAD_BYTES
+        size += len(tx.sender or "") + len(tx.recipient or "")
+        size += len(tx.signature) if tx.signature else 0
+    return size
+
+
+class Chain:
+    """
+    Sequence of blocks that keeps every header plus the most recent blocks resident.
+
+    Blocks older than the resident window are loaded on demand through ``loader`` and kept
+    in an LRU cache bounded by ``cache_bytes``. Without a loader nothing can be paged back
+    in, so every block stays resident.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[int], Block]] = None,
+        resident_blocks: int = 1000,
+        cache_bytes: int = 64 * 1024 * 1024,
+    ):
+        """
+        :param loader: Callable returning the Block stored at a given height
+        :param resident_blocks: Number of blocks at the tip that are always kept in memory
+        :param cache_bytes: Byte budget for older blocks loaded through the loader
+        """
+        if resident_blocks < 1:
+            raise ValueError("resident_blocks must be at least 1")
+        self._loader = loader
+        self.resident_blocks = resident_blocks
+        self.cache_bytes = cache_bytes
+        self._lock = threading.RLock()
+        self._headers = []
+        self._heights_by_hash = {}
+        self._tail = deque()
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._headers)
+
+    def __iter__(self):
+        for height in range(len(self._headers)):
+            yield self[height]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self._headers)))]
+        return self.get(item)
+
+    @property
+    def tip(self):
+        """The most recent block, or None for an empty chain"""
+        if not self._headers:
+            return None
+        return self._tail[-1]
+
+    @property
+    def _tail_start(self):
+        return len(self._headers) - len(self._tail)
+
+    def header(self, height):
+        """Get the header stored at a height without loading the block body"""
+        return self._headers[height]
+
+    def headers(self):
+        """Get a copy of all resident headers"""
+        return list(self._headers)
+
+    def header_range(self, start, end):
+        """Get the headers in [start, end) without copying the rest of the chain"""
+        return self._headers[start:end]
+
+    def height_of(self, block_hash):
+        """
+        Look up the height of a block by its hash.
+
+        :param block_hash: Hash of the block
+        :return: Height of the block, or None if the hash is not in the chain
+        """
+        return self._heights_by_hash.get(block_hash)
+
+    def get_by_hash(self, block_hash):
+        """
+        Get a block by its hash, loading it through the cache if it is not resident.
+
+        :param block_hash: Hash of the block
+        :return: Block with that hash, or None if the hash is not in the chain
+        """
+        height = self._heights_by_hash.get(block_hash)
+        if height is None:
+            return None
+        return self.get(height)
+
+    def get(self, height):
+        """
+        Get the block at a height, loading it through the cache if it is not resident.
+
+        :param height: Block height; negative values index from the tip
+        :return: Block at that height
+        :raises: IndexError if the height is outside the chain
+        """
+        with self._lock:
+            block = self.lookup(height)
+            height %= len(self._headers)
+        if block is None:
+            # Load without the lock so a slow read does not stall appends and other readers
+            block = self._loader(height)
+            self.store(block)
+        return block
+
+    def lookup(self, height):
+        """
+        Get the block at a height only if it is resident or cached, without loading it.
+
+        Callers that fetch blocks themselves, such as async request handlers, use this
+        together with ``store`` instead of the synchronous loader.
+
+        :param height: Block height; negative values index from the tip
+        :return: Block at that height, or None if it would have to be loaded
+        :raises: IndexError if the height is outside the chain
+        """
+        with self._lock:
+            if height < 0:
+                height += len(self._headers)
+            if height < 0 or height >= len(self._headers):
+                raise IndexError("block height out of range")
+            if height >= self._tail_start:
+                return self._tail[height - self._tail_start]
+
+            entry = self._cache.get(height)
+            if entry is not None:
+                self.hits += 1
+                self._cache.move_to_end(height)
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def store(self, block):
+        """Put a block loaded outside the chain into the cache"""
+        with self._lock:
+            # Skip blocks that became resident or were rolled back while they were loaded
+            if block.index >= self._tail_start or self._headers[block.index].hash != block.hash:
+                return
+            self._cache_put(block.index, block)
+
+    def append(self, block):
+        """Append a block at the tip, demoting the oldest resident block to the cache"""
+        with self._lock:
+            if block.index != len(self._headers):
+                raise ValueError(
+                    f"Block index {block.index} does not extend chain of length {len(self)}"
+                )
+            self._headers.append(BlockHeader.from_block(block))
+            self._heights_by_hash[block.hash] = block.index
+            self._tail.append(block)
+            self._trim_tail()
+
+    def pop(self):
+        """
+        Remove and return the block at the tip, used when rolling the chain back.
+
+        :raises: IndexError if the chain is empty
+        """
+        with self._lock:
+            if not self._headers:
+                raise IndexError("pop from empty chain")
+            block = self.get(-1)
+            header = self._headers.pop()
+            self._heights_by_hash.pop(header.hash, None)
+            self._tail.pop()
+            # Keep the tip resident: pull the newest cached block back into the window
+            if not self._tail and self._headers:
+                self._tail.append(self.get(len(self._headers) - 1))
+            return block
+
+    def evict(self, start, end):
+        """
+        Drop cached blocks in [start, end), used after their bodies were pruned.
+
+        Resident blocks are left alone; they leave memory as the tip advances.
+        """
+        with self._lock:
+            for height in [height for height in self._cache if start <= height < end]:
+                _, size = self._cache.pop(height)
+                self._cached_bytes -= size
+
+    def reset(self, headers, tail_blocks):
+        """
+        Replace the chain contents with loaded headers and the blocks at the tip.
+
+        :param headers: BlockHeader for every height, in order
+        :param tail_blocks: The most recent Block objects, ending at the tip
+        """
+        with self._lock:
+            tail_blocks = list(tail_blocks)
+            if len(tail_blocks) > len(headers):
+                raise ValueError("More tail blocks than headers")
+            if headers and not tail_blocks:
+                raise ValueError("At least the tip block must be provided")
+            if self._loader is None and len(tail_blocks) != len(headers):
+                raise ValueError("Every block must be provided when no loader is set")
+            self._headers = list(headers)
+            self._heights_by_hash = {header.hash: header.index for header in self._headers}
+            self._tail = deque(tail_blocks)
+            self._cache.clear()
+            self._cached_bytes = 0
+            self._trim_tail()
+
+    def stats(self):
+        """Get cache statistics for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "height": len(self._headers),
+                "resident_blocks": len(self._tail),
+                "cached_blocks": len(self._cache),
+                "cached_bytes": self._cached_bytes,
+                "cache_bytes_limit": self.cache_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _trim_tail(self):
+        if self._loader is None:
+            return
+        while len(self._tail) > self.resident_blocks:
+            block = self._tail.popleft()
+            self._cache_put(block.index, block)
+
+    def _cache_put(self, height, block):
+        size = estimate_block_size(block)
+        if size > self.cache_bytes:
+            return
+        previous = self._cache.pop(height, None)
+        if previous is not None:
+            self._cached_bytes -= previous[1]
+        self._cache[height] = (block, size)
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_bytes:
+            _, (_, evicted_size) = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted_size
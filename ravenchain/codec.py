@@ -0,0 +1,299 @@
+"""
+Versioned binary encoding for blocks and transactions.
+
+Every encoded block starts with a version byte, followed by fixed-width little-endian
+integers, raw 32-byte hashes and raw signature bytes. The encoding preserves every field
+that feeds into the block hash (timestamp offsets and whether an amount is an int or a
+float), so decoded blocks hash exactly like the originals. The same functions are used by
+the flat-file store, the ``application/octet-stream`` block endpoints and peer-to-peer
+messages.
+
+Decoders accept any buffer and read it through a ``memoryview`` with ``struct.unpack_from``,
+so no intermediate slices are copied while walking a record.
+"""
+
+import struct
+from datetime import datetime, timedelta, timezone
+
+from .block import Block
+from .chain import BlockHeader
+from .transaction import Transaction
+
+CODEC_VERSION = 1
+
+# Version, index, timestamp (microseconds since the epoch), UTC offset in minutes, nonce, flags
+BLOCK_HEADER = struct.Struct("<BIqhQB")
+# Flags, timestamp, UTC offset in minutes, amount, sender, recipient and signature lengths
+FLOAT_TRANSACTION = struct.Struct("<BqhdHHH")
+INT_TRANSACTION = struct.Struct("<BqhqHHH")
+COUNT = struct.Struct("<I")
+LENGTH = struct.Struct("<H")
+
+# Block flags: set when the hash is stored as 32 raw bytes instead of a length-prefixed string
+RAW_HASH = 1
+RAW_PREVIOUS_HASH = 2
+
+# Transaction flags
+HAS_SENDER = 1
+HAS_RECIPIENT = 2
+HAS_SIGNATURE = 4
+INT_AMOUNT = 8
+
+# UTC offset marking a naive timestamp, e.g. one read back from SQLite
+NAIVE = -0x8000
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NAIVE_EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class CodecError(ValueError):
+    """Raised when a buffer is not a valid encoding"""
+
+
+def _encode_timestamp(timestamp):
+    offset = timestamp.utcoffset()
+    if offset is None:
+        return (timestamp - NAIVE_EPOCH) // ONE_MICROSECOND, NAIVE
+    if offset.seconds % 60 or offset.microseconds:
+        raise CodecError(f"UTC offset {offset} is not a whole number of minutes")
+    return (timestamp - EPOCH) // ONE_MICROSECOND, offset.days * 1440 + offset.seconds // 60
+
+
+def _decode_timestamp(micros, offset):
+    if offset == NAIVE:
+        return NAIVE_EPOCH + timedelta(microseconds=micros)
+    timestamp = EPOCH + timedelta(microseconds=micros)
+    if offset:
+        timestamp = timestamp.astimezone(timezone(timedelta(minutes=offset)))
+    return timestamp
+
+
+def _is_raw_hash(value):
+    if len(value) != 64:
+        return False
+    try:
+        return bytes.fromhex(value).hex() == value
+    except ValueError:
+        return False
+
+
+def _encode_hash(parts, value, raw):
+    if raw:
+        parts.append(bytes.fromhex(value))
+    else:
+        _encode_string(parts, value)
+
+
+def _encode_string(parts, value):
+    data = value.encode()
+    parts.append(LENGTH.pack(len(data)))
+    parts.append(data)
+
+
+def _take(view, offset, length):
+    end = offset + length
+    if end > len(view):
+        raise CodecError(f"Field at offset {offset} runs past the end of the buffer")
+    return view[offset:end], end
+
+
+def _decode_string(view, offset):
+    (length,) = LENGTH.unpack_from(view, offset)
+    data, offset = _take(view, offset + LENGTH.size, length)
+    return str(data, "utf-8"), offset
+
+
+def _decode_hash(view, offset, raw):
+    if raw:
+        data, offset = _take(view, offset, 32)
+        return data.hex(), offset
+    return _decode_string(view, offset)
+
+
+def encode_transaction(tx, parts=None):
+    """
+    Encode a transaction.
+
+    :param tx: Transaction to encode
+    :param parts: Optional list the encoded pieces are appended to instead of being joined
+    :return: Encoded bytes, or None when ``parts`` is given
+    """
+    joined = parts is None
+    parts = [] if joined else parts
+    flags = 0
+    sender = recipient = signature = b""
+    if tx.sender is not None:
+        flags |= HAS_SENDER
+        sender = tx.sender.encode()
+    if tx.recipient is not None:
+        flags |= HAS_RECIPIENT
+        recipient = tx.recipient.encode()
+    if tx.signature:
+        flags |= HAS_SIGNATURE
+        signature = tx.signature
+    layout = FLOAT_TRANSACTION
+    if isinstance(tx.amount, int):
+        flags |= INT_AMOUNT
+        layout = INT_TRANSACTION
+    micros, offset = _encode_timestamp(tx.timestamp)
+    parts.append(
+        layout.pack(flags, micros, offset, tx.amount, len(sender), len(recipient), len(signature))
+    )
+    parts.append(sender)
+    parts.append(recipient)
+    parts.append(signature)
+    return b"".join(parts) if joined else None
+
+
+def decode_transaction(buffer, offset=0):
+    """
+    Decode a transaction without recomputing anything.
+
+    :param buffer: Bytes-like object holding the encoding
+    :param offset: Position of the transaction in the buffer
+    :return: Tuple of the Transaction and the offset just past it
+    """
+    view = memoryview(buffer)
+    layout = INT_TRANSACTION if view[offset] & INT_AMOUNT else FLOAT_TRANSACTION
+    flags, micros, tz_offset, amount, sender_length, recipient_length, signature_length = (
+        layout.unpack_from(view, offset)
+    )
+    offset += layout.size
+    end = offset + sender_length + recipient_length + signature_length
+    if end > len(view):
+        raise CodecError(f"Transaction at offset {offset} runs past the end of the buffer")
+    sender = recipient = signature = None
+    if flags & HAS_SENDER:
+        sender = str(view[offset : offset + sender_length], "utf-8")
+    offset += sender_length
+    if flags & HAS_RECIPIENT:
+        recipient = str(view[offset : offset + recipient_length], "utf-8")
+    offset += recipient_length
+    if flags & HAS_SIGNATURE:
+        signature = bytes(view[offset:end])
+    timestamp = _decode_timestamp(micros, tz_offset)
+    return Transaction.restore(sender, recipient, amount, timestamp, signature), end
+
+
+def encode_block(block):
+    """
+    Encode a block and its transactions.
+
+    :param block: Block to encode
+    :return: Encoded bytes
+    """
+    flags = 0
+    if _is_raw_hash(block.hash):
+        flags |= RAW_HASH
+    if _is_raw_hash(block.previous_hash):
+        flags |= RAW_PREVIOUS_HASH
+    micros, offset = _encode_timestamp(block.timestamp)
+    parts = [BLOCK_HEADER.pack(CODEC_VERSION, block.index, micros, offset, block.nonce, flags)]
+    _encode_hash(parts, block.hash, flags & RAW_HASH)
+    _encode_hash(parts, block.previous_hash, flags & RAW_PREVIOUS_HASH)
+    parts.append(COUNT.pack(len(block.data)))
+    for tx in block.data:
+        encode_transaction(tx, parts)
+    return b"".join(parts)
+
+
+def _decode_block_header(view, offset):
+    try:
+        version, index, micros, tz_offset, nonce, flags = BLOCK_HEADER.unpack_from(view, offset)
+        if version != CODEC_VERSION:
+            raise CodecError(f"Unsupported codec version {version}")
+        offset += BLOCK_HEADER.size
+        block_hash, offset = _decode_hash(view, offset, flags & RAW_HASH)
+        previous_hash, offset = _decode_hash(view, offset, flags & RAW_PREVIOUS_HASH)
+    except struct.error as e:
+        raise CodecError(f"Truncated block header: {e}") from e
+    timestamp = _decode_timestamp(micros, tz_offset)
+    return BlockHeader(index, timestamp, previous_hash, nonce, block_hash), offset
+
+
+def decode_header(buffer, offset=0):
+    """
+    Decode only the header of an encoded block, skipping its transactions.
+
+    :param buffer: Bytes-like object holding the encoding
+    :param offset: Position of the block in the buffer
+    :return: BlockHeader
+    """
+    return _decode_block_header(memoryview(buffer), offset)[0]
+
+
+def decode_block(buffer, offset=0):
+    """
+    Decode a block without recomputing its hash.
+
+    :param buffer: Bytes-like object holding the encoding
+    :param offset: Position of the block in the buffer
+    :return: Tuple of the Block and the offset just past it
+    """
+    view = memoryview(buffer)
+    header, offset = _decode_block_header(view, offset)
+    try:
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        transactions = []
+        for _ in range(count):
+            tx, offset = decode_transaction(view, offset)
+            transactions.append(tx)
+    except (struct.error, IndexError) as e:
+        raise CodecError(f"Truncated block {header.index}: {e}") from e
+    block = Block.restore(
+        header.index,
+        header.timestamp,
+        transactions,
+        header.previous_hash,
+        header.nonce,
+        header.hash,
+    )
+    return block, offset
+
+
+def frame_blocks(records):
+    """
+    Combine already encoded blocks into the sequence format of encode_blocks.
+
+    :param records: Sequence of encoded blocks
+    :return: Encoded bytes
+    """
+    parts = [COUNT.pack(len(records))]
+    for data in records:
+        parts.append(COUNT.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def encode_blocks(blocks):
+    """
+    Encode a sequence of blocks as a count followed by length-prefixed blocks.
+
+    :param blocks: Iterable of Block objects
+    :return: Encoded bytes
+    """
+    return frame_blocks([encode_block(block) for block in blocks])
+
+
+def decode_blocks(buffer):
+    """
+    Decode a sequence written by encode_blocks.
+
+    :param buffer: Bytes-like object holding the encoding
+    :return: List of Block objects
+    """
+    view = memoryview(buffer)
+    (count,) = COUNT.unpack_from(view, 0)
+    offset = COUNT.size
+    blocks = []
+    for _ in range(count):
+        (length,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        block, end = decode_block(view, offset)
+        if end != offset + length:
+            raise CodecError(f"Block {block.index} length mismatch")
+        blocks.append(block)
+        offset = end
+    return blocks
@@ -0,0 +1,68 @@
+from typing import Dict, NamedTuple
+
+
+class ChainState(NamedTuple):
+    """Derived chain state persisted by a block store"""
+
+    height: int
+    balances: Dict[str, float]
+    pruned_height: int = 0
+
+
+class BalanceState:
+    """
+    Account balances derived from every transaction up to a height.
+
+    Blocks are applied in chain order, so balances match a full scan of the chain while
+    letting pruned nodes answer balance queries without old transaction bodies.
+    """
+
+    def __init__(self, balances=None, height=-1):
+        """
+        :param balances: Mapping of address to balance to start from
+        :param height: Height of the last block included in the balances
+        """
+        self.balances = dict(balances or {})
+        self.height = height
+
+    def get(self, address):
+        """
+        Get the balance of an address.
+
+        :param address: Wallet address
+        :return: Balance, or 0 for addresses that never transacted
+        """
+        return self.balances.get(address, 0)
+
+    def apply(self, block):
+        """Add the transactions of the next block to the balances"""
+        if block.index != self.height + 1:
+            raise ValueError(f"Block {block.index} does not follow state height {self.height}")
+        balances = self.balances
+        for tx in block.data:
+            if tx.sender is not None:
+                balances[tx.sender] = balances.get(tx.sender, 0) - tx.amount
+            if tx.recipient is not None:
+                balances[tx.recipient] = balances.get(tx.recipient, 0) + tx.amount
+        self.height = block.index
+
+    def revert(self, block):
+        """Remove the transactions of the last applied block, used when rolling back"""
+        if block.index != self.height:
+            raise ValueError(f"Block {block.index} is not the state tip {self.height}")
+        balances = self.balances
+        for tx in reversed(block.data):
+            if tx.recipient is not None:
+                balances[tx.recipient] -= tx.amount
+            if tx.sender is not None:
+                balances[tx.sender] += tx.amount
+        self.height = block.index - 1
+
+    def snapshot(self, pruned_height=0):
+        """
+        Copy the balances into a ChainState for persisting.
+
+        :param pruned_height: Height below which block bodies have been deleted
+        :return: ChainState
+        """
+        return ChainState(self.height, dict(self.balances), pruned_height)
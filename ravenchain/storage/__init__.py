@@ -0,0 +1,39 @@
+"""Block storage backends."""
+
+from .base import BlockPrunedError, BlockStore
+from .flatfile import FlatFileBlockStore
+from .memory import MemoryBlockStore
+
+BACKENDS = ("memory", "flatfile", "sql")
+
+
+def create_block_store(backend="memory", data_dir="data", database_url=None):
+    """
+    Create a block store from configuration values.
+
+    :param backend: One of "memory", "flatfile" or "sql"
+    :param data_dir: Directory holding the flat-file chain
+    :param database_url: SQLAlchemy URL used by the sql backend
+    :return: BlockStore instance
+    """
+    if backend == "memory":
+        return MemoryBlockStore()
+    if backend == "flatfile":
+        return FlatFileBlockStore(f"{data_dir}/chain")
+    if backend == "sql":
+        # Imported here so the other backends work without SQLAlchemy or the API models
+        from .sql import SQLBlockStore
+
+        if not database_url:
+            raise ValueError("The sql storage backend requires a database URL")
+        return SQLBlockStore.from_url(database_url)
+    raise ValueError(f"Unknown storage backend {backend!r}, expected one of {BACKENDS}")
+
+
+__all__ = [
+    "BlockPrunedError",
+    "BlockStore",
+    "FlatFileBlockStore",
+    "MemoryBlockStore",
+    "create_block_store",
+]
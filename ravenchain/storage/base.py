@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+
+from ..chain import estimate_block_size
+
+# Number of blocks fetched per round-trip when bulk loading from storage
+LOAD_BATCH_SIZE = 500
+
+# Number of blocks persisted per commit in batched writes
+GROUP_COMMIT_SIZE = 100
+
+# Number of blocks whose transaction bodies are deleted per pruning batch
+PRUNE_BATCH_SIZE = 1000
+
+
+class BlockPrunedError(LookupError):
+    """Raised when a block body has been deleted by pruning and only its header remains"""
+
+    def __init__(self, height, pruned_height):
+        super().__init__(
+            f"Block {height} has been pruned; full blocks are kept from height {pruned_height}"
+        )
+        self.height = height
+        self.pruned_height = pruned_height
+
+
+class BlockStore(ABC):
+    """
+    Persistence backend used by Blockchain.
+
+    Implementations must make every call to ``append_blocks`` atomic per group: after a
+    crash either all blocks of a group are readable or none of them are.
+
+    Stores that set ``supports_pruning`` also persist the derived balance state and can
+    delete the transaction bodies of old blocks while keeping their headers. Reading a
+    block below ``pruned_height`` then raises BlockPrunedError.
+    """
+
+    supports_pruning = False
+    pruned_height = 0
+
+    def __len__(self):
+        """
+        Count the stored blocks; the tip is at ``len(store) - 1``.
+
+        Backends override this with a lookup that does not read every header.
+        """
+        return len(self.load_headers())
+
+    @abstractmethod
+    def load_headers(self, start=0, end=None):
+        """
+        Load the headers of stored blocks without their transactions.
+
+        :param start: First height to load
+        :param end: Height to stop before, or None to load through the tip
+        :return: List of BlockHeader objects ordered by height
+        """
+
+    @abstractmethod
+    def iter_blocks(self, start=0, end=None):
+        """
+        Iterate over stored blocks in height order.
+
+        :param start: First height to load
+        :param end: Height to stop before, or None to load through the tip
+        :return: Iterator of Block objects
+        """
+
+    def load_block(self, height):
+        """
+        Load a single block by height.
+
+        :param height: Index of the block
+        :return: Block object, or None if no block exists at that height
+        """
+        return next(iter(self.iter_blocks(height, height + 1)), None)
+
+    @abstractmethod
+    def load_block_by_hash(self, block_hash):
+        """
+        Load a single block by hash.
+
+        :param block_hash: Hash of the block
+        :return: Block object, or None if no block has that hash
+        """
+
+    @abstractmethod
+    def append_blocks(self, blocks, group_commit_size=GROUP_COMMIT_SIZE):
+        """
+        Persist blocks that extend the stored chain.
+
+        :param blocks: Block objects in height order
+        :param group_commit_size: Number of blocks made durable per commit
+        :return: Number of blocks stored
+        """
+
+    @abstractmethod
+    def truncate(self, height):
+        """
+        Remove every block above a height.
+
+        :param height: Height of the block that becomes the new tip
+        """
+
+    def body_sizes(self, start, end):
+        """
+        Estimate the stored size of the blocks in [start, end).
+
+        :param start: First height to measure
+        :param end: Height to stop before
+        :return: List of approximate sizes in bytes, one per height
+        """
+        return [estimate_block_size(block) for block in self.iter_blocks(start, end)]
+
+    def load_state(self):
+        """
+        Load the last committed chain state.
+
+        :return: ChainState, or None if no state has been saved
+        """
+        return None
+
+    def save_state(self, state):
+        """
+        Commit the derived chain state.
+
+        :param state: ChainState to persist
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not persist chain state")
+
+    def prune_bodies(self, start, end):
+        """
+        Delete the transaction bodies of the blocks in [start, end), keeping their headers.
+
+        The new pruned height must be committed together with the deletion.
+
+        :param start: First height to prune
+        :param end: Height to stop before; becomes the pruned height
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support pruning")
+
+    def close(self):
+        """Release any resources held by the store"""
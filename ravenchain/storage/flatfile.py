@@ -0,0 +1,221 @@
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from ..codec import decode_block, decode_header, encode_block
+from .base import GROUP_COMMIT_SIZE, BlockStore
+
+INDEX_FILE = "index.dat"
+SEGMENT_TEMPLATE = "blocks-{:05d}.dat"
+
+# Index record: raw block hash, segment number, offset, record length, flags
+INDEX_RECORD = struct.Struct("<32sIQII")
+
+# Set on the last index record of every committed group
+GROUP_END = 1
+
+
+class FlatFileBlockStore(BlockStore):
+    """
+    Block store that appends serialized blocks to segment files.
+
+    Blocks are encoded with the binary codec and written sequentially to
+    ``blocks-NNNNN.dat`` segments, then located through a fixed-width ``index.dat`` holding
+    one record per height. Reads map the segment with ``mmap`` and slice out a single
+    record. Index records are only written after the data
+    they point to, and the last record of each committed group is flagged, so on open
+    anything after the last complete group is discarded.
+    """
+
+    def __init__(self, path, segment_bytes=128 * 1024 * 1024, fsync=True):
+        """
+        :param path: Directory holding the segment and index files
+        :param segment_bytes: Size after which a new segment file is started
+        :param fsync: Whether to fsync data and index files after every group
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._maps = {}
+        self._index = []
+        self._heights_by_hash = {}
+        self._index_fd = os.open(self.path / INDEX_FILE, os.O_RDWR | os.O_CREAT)
+        self._recover()
+
+    def __len__(self):
+        return len(self._index)
+
+    def load_headers(self, start=0, end=None):
+        with self._lock:
+            end = len(self._index) if end is None else min(end, len(self._index))
+            return [self._read_header(height) for height in range(max(start, 0), end)]
+
+    def iter_blocks(self, start=0, end=None):
+        end = len(self._index) if end is None else min(end, len(self._index))
+        for height in range(max(start, 0), end):
+            yield decode_block(self._read(height))[0]
+
+    def load_block(self, height):
+        if height < 0 or height >= len(self._index):
+            return None
+        return decode_block(self._read(height))[0]
+
+    def load_block_by_hash(self, block_hash):
+        height = self._heights_by_hash.get(block_hash)
+        if height is None:
+            return None
+        return self.load_block(height)
+
+    def append_blocks(self, blocks, group_commit_size=GROUP_COMMIT_SIZE):
+        if group_commit_size < 1:
+            raise ValueError("group_commit_size must be at least 1")
+        blocks = list(blocks)
+        with self._lock:
+            if blocks and blocks[0].index != len(self._index):
+                raise ValueError(f"Block {blocks[0].index} does not extend the stored chain")
+            for start in range(0, len(blocks), group_commit_size):
+                self._append_group(blocks[start : start + group_commit_size])
+        return len(blocks)
+
+    def truncate(self, height):
+        with self._lock:
+            if height < 0 or height >= len(self._index):
+                raise ValueError(f"Cannot truncate to height {height}")
+            self._truncate_index(height + 1)
+            segment, offset, length = self._index[-1]
+            self._truncate_segments(segment, offset + length)
+            self._rewrite_flags(height, GROUP_END)
+
+    def close(self):
+        with self._lock:
+            for segment_map in self._maps.values():
+                segment_map.close()
+            self._maps.clear()
+            if self._index_fd is not None:
+                os.close(self._index_fd)
+                self._index_fd = None
+
+    def _segment_path(self, segment):
+        return self.path / SEGMENT_TEMPLATE.format(segment)
+
+    def _recover(self):
+        """Load the index and drop anything written after the last complete group"""
+        data = os.pread(self._index_fd, os.fstat(self._index_fd).st_size, 0)
+        records = [
+            INDEX_RECORD.unpack_from(data, offset)
+            for offset in range(0, len(data) - INDEX_RECORD.size + 1, INDEX_RECORD.size)
+        ]
+        committed = 0
+        for count, (_, segment, offset, length, flags) in enumerate(records, start=1):
+            segment_path = self._segment_path(segment)
+            if not segment_path.exists() or segment_path.stat().st_size < offset + length:
+                break
+            if flags & GROUP_END:
+                committed = count
+
+        self._index = [record[1:4] for record in records[:committed]]
+        self._heights_by_hash = {
+            record[0].hex(): height for height, record in enumerate(records[:committed])
+        }
+        if len(data) != committed * INDEX_RECORD.size:
+            self._truncate_index(committed)
+        if self._index:
+            segment, offset, length = self._index[-1]
+            self._truncate_segments(segment, offset + length)
+        else:
+            self._truncate_segments(0, 0)
+
+    def _append_group(self, blocks):
+        segment, end = (0, 0)
+        if self._index:
+            segment, offset, length = self._index[-1]
+            end = offset + length
+
+        writes = {}
+        entries = []
+        for block in blocks:
+            record = encode_block(block)
+            if end and end + len(record) > self.segment_bytes:
+                segment, end = segment + 1, 0
+            writes.setdefault(segment, bytearray()).extend(record)
+            entries.append((bytes.fromhex(block.hash), segment, end, len(record)))
+            end += len(record)
+
+        # Data first, one sequential write per segment, then the index records
+        for segment, data in writes.items():
+            fd = os.open(self._segment_path(segment), os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+            try:
+                os.write(fd, data)
+                if self.fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+
+        index_data = b"".join(
+            INDEX_RECORD.pack(*entry, GROUP_END if i == len(entries) - 1 else 0)
+            for i, entry in enumerate(entries)
+        )
+        os.pwrite(self._index_fd, index_data, len(self._index) * INDEX_RECORD.size)
+        if self.fsync:
+            os.fsync(self._index_fd)
+
+        for block, (_, segment, offset, length) in zip(blocks, entries):
+            self._heights_by_hash[block.hash] = len(self._index)
+            self._index.append((segment, offset, length))
+
+    def _read(self, height):
+        """Slice one record out of its mapped segment"""
+        with self._lock:
+            segment, offset, length = self._index[height]
+            return self._map(segment, offset + length)[offset : offset + length]
+
+    def _read_header(self, height):
+        """Decode the header of one record in place, without copying its transactions"""
+        with self._lock:
+            segment, offset, length = self._index[height]
+            with memoryview(self._map(segment, offset + length)) as view:
+                return decode_header(view[offset : offset + length])
+
+    def _map(self, segment, size):
+        """Get the mapping of a segment that covers at least ``size`` bytes"""
+        segment_map = self._maps.get(segment)
+        if segment_map is None or len(segment_map) < size:
+            # The active segment grew since it was mapped
+            if segment_map is not None:
+                segment_map.close()
+            with open(self._segment_path(segment), "rb") as f:
+                segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = segment_map
+        return segment_map
+
+    def _truncate_index(self, count):
+        for block_hash, height in list(self._heights_by_hash.items()):
+            if height >= count:
+                del self._heights_by_hash[block_hash]
+        del self._index[count:]
+        os.ftruncate(self._index_fd, count * INDEX_RECORD.size)
+        if self.fsync:
+            os.fsync(self._index_fd)
+
+    def _truncate_segments(self, segment, size):
+        """Cut the given segment to size and delete every later segment"""
+        for segment_number in [number for number in self._maps if number >= segment]:
+            self._maps.pop(segment_number).close()
+        segment_path = self._segment_path(segment)
+        if segment_path.exists():
+            os.truncate(segment_path, size)
+        later = segment + 1
+        while self._segment_path(later).exists():
+            self._segment_path(later).unlink()
+            later += 1
+
+    def _rewrite_flags(self, height, flags):
+        position = height * INDEX_RECORD.size
+        record = INDEX_RECORD.unpack(os.pread(self._index_fd, INDEX_RECORD.size, position))
+        os.pwrite(self._index_fd, INDEX_RECORD.pack(*record[:4], flags), position)
+        if self.fsync:
+            os.fsync(self._index_fd)
@@ -0,0 +1,69 @@
+from ..chain import BlockHeader
+from .base import GROUP_COMMIT_SIZE, BlockPrunedError, BlockStore
+
+
+class MemoryBlockStore(BlockStore):
+    """Block store that keeps blocks in a list, for the CLI, benchmarks and tests"""
+
+    supports_pruning = True
+
+    def __init__(self):
+        self._headers = []
+        self._blocks = []
+        self._heights_by_hash = {}
+        self._state = None
+
+    def __len__(self):
+        return len(self._headers)
+
+    def load_headers(self, start=0, end=None):
+        return self._headers[max(start, 0) : end]
+
+    def iter_blocks(self, start=0, end=None):
+        start = max(start, 0)
+        if start < self.pruned_height and start < len(self._blocks):
+            raise BlockPrunedError(start, self.pruned_height)
+        return iter(self._blocks[start:end])
+
+    def load_block(self, height):
+        if height < 0 or height >= len(self._blocks):
+            return None
+        if height < self.pruned_height:
+            raise BlockPrunedError(height, self.pruned_height)
+        return self._blocks[height]
+
+    def load_block_by_hash(self, block_hash):
+        height = self._heights_by_hash.get(block_hash)
+        return None if height is None else self.load_block(height)
+
+    def append_blocks(self, blocks, group_commit_size=GROUP_COMMIT_SIZE):
+        blocks = list(blocks)
+        for expected_index, block in enumerate(blocks, start=len(self._blocks)):
+            if block.index != expected_index:
+                raise ValueError(f"Block {block.index} does not extend the stored chain")
+        for block in blocks:
+            self._heights_by_hash[block.hash] = block.index
+            self._headers.append(BlockHeader.from_block(block))
+            self._blocks.append(block)
+        return len(blocks)
+
+    def truncate(self, height):
+        if height < 0 or height >= len(self._blocks):
+            raise ValueError(f"Cannot truncate to height {height}")
+        for header in self._headers[height + 1 :]:
+            self._heights_by_hash.pop(header.hash, None)
+        del self._headers[height + 1 :]
+        del self._blocks[height + 1 :]
+
+    def load_state(self):
+        return self._state
+
+    def save_state(self, state):
+        self._state = state._replace(balances=dict(state.balances))
+
+    def prune_bodies(self, start, end):
+        for height in range(max(start, 0), min(end, len(self._blocks))):
+            self._blocks[height] = None
+        self.pruned_height = max(self.pruned_height, end)
+        if self._state is not None:
+            self._state = self._state._replace(pruned_height=self.pruned_height)
@@ -0,0 +1,418 @@
+from datetime import timezone
+from sqlalchemy import create_engine, delete, func, insert, select, update
+from sqlalchemy.orm import sessionmaker as make_sessionmaker
+from api.database.models import Base, BalanceDB, BlockDB, ChainStateDB, TransactionDB
+from ..block import Block
+from ..chain import BLOCK_OVERHEAD_BYTES, TRANSACTION_OVERHEAD_BYTES, BlockHeader
+from ..state import ChainState
+from ..tracing import span
+from ..transaction import Transaction
+from .base import GROUP_COMMIT_SIZE, LOAD_BATCH_SIZE, BlockPrunedError, BlockStore
+
+# Primary key of the single chain_state row
+CHAIN_STATE_ID = 1
+
+
+def to_db_timestamp(timestamp):
+    """
+    Convert a timestamp for the naive ``DateTime`` columns, which hold UTC wall-clock time.
+
+    :param timestamp: Aware datetime, or a naive one that is already UTC
+    :return: Naive datetime in UTC
+    """
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def from_db_timestamp(timestamp):
+    """
+    Restore a timestamp read from the naive ``DateTime`` columns as an aware UTC datetime.
+
+    Blocks are mined with aware UTC timestamps and their hashes cover the timestamp's
+    string form, so the offset must come back for stored hashes to verify.
+    """
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def select_block_rows(start, end=None, limit=LOAD_BATCH_SIZE):
+    """
+    Build a query for plain block rows in a height range.
+
+    :param start: First height to select
+    :param end: Height to stop before, or None for no upper bound
+    :param limit: Maximum number of rows
+    :return: SQLAlchemy select statement
+    """
+    blocks_table = BlockDB.__table__
+    query = (
+        select(
+            blocks_table.c.id,
+            blocks_table.c.index,
+            blocks_table.c.timestamp,
+            blocks_table.c.previous_hash,
+            blocks_table.c.nonce,
+            blocks_table.c.hash,
+        )
+        .where(blocks_table.c.index >= start)
+        .order_by(blocks_table.c.index)
+        .limit(limit)
+    )
+    if end is not None:
+        query = query.where(blocks_table.c.index < end)
+    return query
+
+
+def select_transaction_rows(block_ids):
+    """
+    Build a query for the plain transaction rows of some blocks, grouped by block.
+
+    :param block_ids: Database ids of the blocks
+    :return: SQLAlchemy select statement
+    """
+    txs_table = TransactionDB.__table__
+    return (
+        select(
+            txs_table.c.block_id,
+            txs_table.c.sender,
+            txs_table.c.recipient,
+            txs_table.c.amount,
+            txs_table.c.timestamp,
+            txs_table.c.signature,
+        )
+        .where(txs_table.c.block_id.in_(block_ids))
+        .order_by(txs_table.c.block_id, txs_table.c.id)
+    )
+
+
+def build_blocks(block_rows, tx_rows):
+    """
+    Build in-memory blocks from plain rows without recomputing their hashes.
+
+    :param block_rows: Rows from select_block_rows
+    :param tx_rows: Rows from select_transaction_rows for the same blocks
+    :return: List of Block objects in the order of block_rows
+    """
+    transactions = {row.id: [] for row in block_rows}
+    restore_tx = Transaction.restore
+    for block_id, sender, recipient, amount, timestamp, signature in tx_rows:
+        transactions[block_id].append(
+            restore_tx(sender, recipient, amount, from_db_timestamp(timestamp), signature)
+        )
+    return [
+        Block.restore(
+            row.index,
+            from_db_timestamp(row.timestamp),
+            transactions[row.id],
+            row.previous_hash,
+            row.nonce,
+            row.hash,
+        )
+        for row in block_rows
+    ]
+
+
+def iter_blocks_from_db(session, start=0, end=None, batch_size=LOAD_BATCH_SIZE):
+    """
+    Stream blocks from the database in height order.
+
+    Block rows are read in keyset batches and the transactions of each batch are fetched
+    with a second query and grouped per block, so no ORM objects or joined result sets are
+    built. Stored hashes are trusted and not recomputed.
+
+    :param session: SQLAlchemy session for database queries
+    :param start: First height to load
+    :param end: Height to stop before, or None to load through the tip
+    :param batch_size: Number of blocks read per round-trip
+    :return: Iterator of Block objects
+    """
+    next_height = start
+    while end is None or next_height < end:
+        block_rows = session.execute(select_block_rows(next_height, end, batch_size)).all()
+        if not block_rows:
+            return
+        tx_rows = session.execute(select_transaction_rows([row.id for row in block_rows]))
+        yield from build_blocks(block_rows, tx_rows)
+        next_height = block_rows[-1].index + 1
+
+
+def load_headers_from_db(session, start=0, end=None):
+    """
+    Load block headers without transaction bodies.
+
+    :param session: SQLAlchemy session for database queries
+    :param start: First height to load
+    :param end: Height to stop before, or None to load through the tip
+    :return: List of BlockHeader objects ordered by height
+    """
+    blocks_table = BlockDB.__table__
+    query = select(
+        blocks_table.c.index,
+        blocks_table.c.timestamp,
+        blocks_table.c.previous_hash,
+        blocks_table.c.nonce,
+        blocks_table.c.hash,
+    ).order_by(blocks_table.c.index)
+    if start > 0:
+        query = query.where(blocks_table.c.index >= start)
+    if end is not None:
+        query = query.where(blocks_table.c.index < end)
+    rows = session.execute(query)
+    return [
+        BlockHeader(index, from_db_timestamp(timestamp), previous_hash, nonce, block_hash)
+        for index, timestamp, previous_hash, nonce, block_hash in rows
+    ]
+
+
+def save_blocks_to_db(session, blocks, group_commit_size=GROUP_COMMIT_SIZE):
+    """
+    Save many blocks, committing once per group of blocks.
+
+    Each group inserts its block rows with one statement and all of their transactions
+    with one multi-row statement, then commits. A block and its transactions always
+    share a transaction, so a crash never leaves a partial block visible.
+
+    :param session: SQLAlchemy session for database operations
+    :param blocks: Block objects to save, in height order
+    :param group_commit_size: Number of blocks persisted per commit
+    :return: Number of blocks saved
+    """
+    if group_commit_size < 1:
+        raise ValueError("group_commit_size must be at least 1")
+    blocks = list(blocks)
+    for start in range(0, len(blocks), group_commit_size):
+        group = blocks[start : start + group_commit_size]
+        try:
+            with span("sql.insert", blocks=len(group)) as current:
+                block_ids = session.execute(
+                    insert(BlockDB).returning(BlockDB.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "index": block.index,
+                            "timestamp": to_db_timestamp(block.timestamp),
+                            "previous_hash": block.previous_hash,
+                            "nonce": block.nonce,
+                            "hash": block.hash,
+                        }
+                        for block in group
+                    ],
+                ).scalars()
+                tx_rows = [
+                    {
+                        "sender": tx.sender,
+                        "recipient": tx.recipient,
+                        "amount": tx.amount,
+                        "timestamp": to_db_timestamp(tx.timestamp),
+                        "signature": tx.signature,
+                        "block_id": block_id,
+                    }
+                    for block, block_id in zip(group, block_ids)
+                    for tx in block.data
+                ]
+                current.set_attribute("transactions", len(tx_rows))
+                if tx_rows:
+                    session.execute(insert(TransactionDB), tx_rows)
+            with span("sql.commit"):
+                session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    return len(blocks)
+
+
+def delete_blocks_above(session, height):
+    """
+    Delete every block above a height together with its transactions.
+
+    :param session: SQLAlchemy session for database operations
+    :param height: Height of the block that becomes the new tip
+    """
+    try:
+        block_ids = select(BlockDB.id).where(BlockDB.index > height)
+        session.execute(delete(TransactionDB).where(TransactionDB.block_id.in_(block_ids)))
+        session.execute(delete(BlockDB).where(BlockDB.index > height))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def load_state_from_db(session):
+    """
+    Load the committed balance state and pruned height.
+
+    :param session: SQLAlchemy session for database queries
+    :return: ChainState, or None if no state has been saved
+    """
+    row = session.get(ChainStateDB, CHAIN_STATE_ID)
+    if row is None:
+        return None
+    balances = dict(session.execute(select(BalanceDB.address, BalanceDB.amount)).all())
+    return ChainState(row.height, balances, row.pruned_height)
+
+
+def save_state_to_db(session, state):
+    """
+    Replace the stored balances and state height in a single transaction.
+
+    :param session: SQLAlchemy session for database operations
+    :param state: ChainState to persist
+    """
+    try:
+        session.execute(delete(BalanceDB))
+        if state.balances:
+            session.execute(
+                insert(BalanceDB),
+                [
+                    {"address": address, "amount": amount}
+                    for address, amount in state.balances.items()
+                ],
+            )
+        row = session.get(ChainStateDB, CHAIN_STATE_ID)
+        if row is None:
+            session.add(ChainStateDB(id=CHAIN_STATE_ID, height=state.height, pruned_height=0))
+        else:
+            row.height = state.height
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def prune_transactions(session, start, end):
+    """
+    Delete the transactions of the blocks in [start, end) and record the new pruned height.
+
+    Block rows are kept so headers and hash lookups keep working.
+
+    :param session: SQLAlchemy session for database operations
+    :param start: First height to prune
+    :param end: Height to stop before; becomes the pruned height
+    """
+    try:
+        block_ids = select(BlockDB.id).where(BlockDB.index >= start, BlockDB.index < end)
+        session.execute(delete(TransactionDB).where(TransactionDB.block_id.in_(block_ids)))
+        result = session.execute(
+            update(ChainStateDB)
+            .where(ChainStateDB.id == CHAIN_STATE_ID, ChainStateDB.pruned_height < end)
+            .values(pruned_height=end)
+        )
+        if result.rowcount == 0 and session.get(ChainStateDB, CHAIN_STATE_ID) is None:
+            raise ValueError("The balance state must be saved before pruning")
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def select_body_sizes(start, end):
+    """
+    Build a query for the approximate transaction body size of each block in a range.
+
+    :param start: First height to measure
+    :param end: Height to stop before
+    :return: SQLAlchemy select statement with one (index, tx_count, tx_bytes) row per block
+    """
+    blocks_table = BlockDB.__table__
+    txs_table = TransactionDB.__table__
+    tx_bytes = (
+        func.coalesce(func.length(txs_table.c.sender), 0)
+        + func.coalesce(func.length(txs_table.c.recipient), 0)
+        + func.coalesce(func.length(txs_table.c.signature), 0)
+    )
+    return (
+        select(
+            blocks_table.c.index,
+            func.count(txs_table.c.id),
+            func.coalesce(func.sum(tx_bytes), 0),
+        )
+        .select_from(blocks_table.outerjoin(txs_table, txs_table.c.block_id == blocks_table.c.id))
+        .where(blocks_table.c.index >= start, blocks_table.c.index < end)
+        .group_by(blocks_table.c.index)
+        .order_by(blocks_table.c.index)
+    )
+
+
+class SQLBlockStore(BlockStore):
+    """
+    Block store backed by the SQLAlchemy ``blocks`` and ``transactions`` tables.
+
+    Balances and the pruned height live in the ``balances`` and ``chain_state`` tables.
+    Pruning deletes transaction rows but keeps block rows, so headers remain available.
+    """
+
+    supports_pruning = True
+
+    def __init__(self, sessionmaker, batch_size=LOAD_BATCH_SIZE):
+        """
+        :param sessionmaker: SQLAlchemy sessionmaker for database operations
+        :param batch_size: Number of blocks read per round-trip when streaming blocks
+        """
+        self.sessionmaker = sessionmaker
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_url(cls, database_url):
+        """Create a store for a database URL, creating the chain tables if needed"""
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        return cls(make_sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+    def __len__(self):
+        with self.sessionmaker() as session:
+            # Heights are contiguous from 0, so the highest one is an index lookup
+            tip = session.scalar(select(func.max(BlockDB.index)))
+        return 0 if tip is None else tip + 1
+
+    def load_headers(self, start=0, end=None):
+        with self.sessionmaker() as session:
+            return load_headers_from_db(session, start, end)
+
+    def iter_blocks(self, start=0, end=None):
+        if start < self.pruned_height:
+            raise BlockPrunedError(start, self.pruned_height)
+        with self.sessionmaker() as session:
+            yield from iter_blocks_from_db(session, start, end, self.batch_size)
+
+    def load_block_by_hash(self, block_hash):
+        with self.sessionmaker() as session:
+            height = session.scalar(select(BlockDB.index).where(BlockDB.hash == block_hash))
+            if height is None:
+                return None
+            if height < self.pruned_height:
+                raise BlockPrunedError(height, self.pruned_height)
+            return next(iter_blocks_from_db(session, height, height + 1), None)
+
+    def append_blocks(self, blocks, group_commit_size=GROUP_COMMIT_SIZE):
+        with self.sessionmaker() as session:
+            return save_blocks_to_db(session, blocks, group_commit_size)
+
+    def truncate(self, height):
+        with self.sessionmaker() as session:
+            delete_blocks_above(session, height)
+
+    def body_sizes(self, start, end):
+        with self.sessionmaker() as session:
+            rows = session.execute(select_body_sizes(start, end)).all()
+        return [
+            BLOCK_OVERHEAD_BYTES + tx_count * TRANSACTION_OVERHEAD_BYTES + tx_bytes
+            for _, tx_count, tx_bytes in rows
+        ]
+
+    def load_state(self):
+        with self.sessionmaker() as session:
+            state = load_state_from_db(session)
+        if state is not None:
+            self.pruned_height = state.pruned_height
+        return state
+
+    def save_state(self, state):
+        with self.sessionmaker() as session:
+            save_state_to_db(session, state)
+
+    def prune_bodies(self, start, end):
+        with self.sessionmaker() as session:
+            prune_transactions(session, start, end)
+        self.pruned_height = max(self.pruned_height, end)
@@ -0,0 +1,294 @@
+"""
+Lightweight tracing spans for the mining, verification and persistence paths.
+
+Code marks a unit of work with ``with span("name", key=value):``. Spans opened inside
+another span become its children, also across ``asyncio.to_thread`` and tasks, because
+the current span lives in a context variable. When the outermost span of a trace ends the
+whole tree is handed to the configured exporter.
+
+Tracing is off until ``configure`` or ``setup`` installs an exporter. Until then ``span``
+returns one shared no-op object, so an instrumented call costs a function call and a
+global lookup.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+# Spans kept per trace; a batch verifying thousands of signatures records only the first
+MAX_SPANS_PER_TRACE = 1000
+
+# Exporter of finished traces, None while tracing is disabled
+_exporter = None
+_current = ContextVar("ravenchain_span", default=None)
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """Spans finished so far under one root span"""
+
+    __slots__ = ("trace_id", "exporter", "spans", "dropped")
+
+    def __init__(self, exporter):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.exporter = exporter
+        self.spans = []
+        self.dropped = 0
+
+    def finish(self, span):
+        if span.parent is None:
+            self.spans.append(span)
+            self.exporter.export(self)
+        elif len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+class Span:
+    """One timed unit of work; use through ``span``"""
+
+    __slots__ = (
+        "name",
+        "attributes",
+        "trace",
+        "parent",
+        "span_id",
+        "start_ns",
+        "end_ns",
+        "error",
+        "_token",
+    )
+
+    def __init__(self, exporter, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.parent = _current.get()
+        # A child joins its parent's trace even if the exporter changed in between
+        self.trace = self.parent.trace if self.parent is not None else _Trace(exporter)
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.start_ns = self.end_ns = 0
+        self.error = None
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.trace.finish(self)
+        return False
+
+    def set_attribute(self, key, value):
+        """Record a value learned while the span runs, e.g. the number of hashes tried"""
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self):
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+def span(name, **attributes):
+    """
+    Open a span, or return a no-op stand-in while tracing is disabled.
+
+    :param name: Name of the unit of work, e.g. "mine_block"
+    :param attributes: Values describing it, e.g. the block height
+    :return: Context manager yielding an object with ``set_attribute``
+    """
+    exporter = _exporter
+    if exporter is None:
+        return NOOP_SPAN
+    return Span(exporter, name, attributes)
+
+
+def enabled():
+    """Whether spans are being recorded"""
+    return _exporter is not None
+
+
+def configure(exporter):
+    """
+    Start recording spans and send finished traces to an exporter.
+
+    :param exporter: Object with an ``export(trace)`` method, or None to disable tracing
+    """
+    global _exporter
+    _exporter = exporter
+
+
+def disable():
+    """Stop recording spans, e.g. in worker processes that inherited the exporter"""
+    configure(None)
+
+
+def setup(mode, path=None, logger=None, service_name="ravenchain"):
+    """
+    Configure tracing from a setting value.
+
+    :param mode: "log" to emit traces through ``logger``, "otlp" to append them to
+        ``path`` as OTLP/JSON, or an empty string or "off" to disable tracing
+    :param path: File written in "otlp" mode
+    :param logger: Logger used in "log" mode
+    :param service_name: service.name resource attribute of exported traces
+    :raises: ValueError for an unknown mode
+    """
+    if mode in ("", "off"):
+        disable()
+    elif mode == "log":
+        configure(LogExporter(logger or logging.getLogger("ravenchain.tracing")))
+    elif mode == "otlp":
+        configure(OTLPFileExporter(path, service_name))
+    else:
+        raise ValueError(f"Unknown tracing mode {mode!r}, expected log, otlp or off")
+
+
+def span_tree(trace):
+    """
+    Arrange the spans of a finished trace as nested dictionaries.
+
+    :return: The root span with its children, times in milliseconds from the root's start
+    """
+    root = trace.spans[-1]
+    nodes = {}
+    for item in trace.spans:
+        node = {
+            "name": item.name,
+            "start_ms": round((item.start_ns - root.start_ns) / 1e6, 3),
+            "duration_ms": round(item.duration_ms, 3),
+        }
+        if item.attributes:
+            node["attributes"] = item.attributes
+        if item.error:
+            node["error"] = item.error
+        nodes[item.span_id] = node
+    for item in trace.spans:
+        if item.parent is not None:
+            parent = nodes.get(item.parent.span_id)
+            # Children of a dropped span are attached to the root instead
+            parent = parent if parent is not None else nodes[root.span_id]
+            parent.setdefault("children", []).append(nodes[item.span_id])
+    for node in nodes.values():
+        if "children" in node:
+            node["children"].sort(key=lambda child: child["start_ms"])
+    return nodes[root.span_id]
+
+
+class LogExporter:
+    """Emit every finished trace as one structured log record holding its span tree"""
+
+    def __init__(self, logger, level=logging.INFO):
+        """
+        :param logger: Logger to write to; with the JSON formatter the tree is a field
+        :param level: Level of the trace records
+        """
+        self.logger = logger
+        self.level = level
+
+    def export(self, trace):
+        root = trace.spans[-1]
+        props = {
+            "trace_id": trace.trace_id,
+            "duration_ms": round(root.duration_ms, 3),
+            "spans": span_tree(trace),
+        }
+        if trace.dropped:
+            props["dropped_spans"] = trace.dropped
+        self.logger.log(self.level, f"Trace {root.name}", extra={"props": props})
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPFileExporter:
+    """
+    Append finished traces to a file in the OTLP/JSON format, one export request per line.
+
+    This is the layout the OpenTelemetry Collector's file exporter writes and its
+    ``otlpjsonfile`` receiver reads. Each line is written with a single append, so worker
+    processes can share the file.
+    """
+
+    def __init__(self, path, service_name="ravenchain"):
+        """
+        :param path: File to append to, created with its directory if missing
+        :param service_name: service.name resource attribute
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.resource = {"attributes": _otlp_attributes({"service.name": service_name})}
+        self._lock = threading.Lock()
+        self._fd = None
+
+    def export(self, trace):
+        spans = []
+        for item in trace.spans:
+            encoded = {
+                "traceId": trace.trace_id,
+                "spanId": item.span_id,
+                "name": item.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(item.start_ns),
+                "endTimeUnixNano": str(item.end_ns),
+                "attributes": _otlp_attributes(item.attributes),
+                "status": {"code": 2, "message": item.error} if item.error else {},
+            }
+            if item.parent is not None:
+                encoded["parentSpanId"] = item.parent.span_id
+            spans.append(encoded)
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": self.resource,
+                    "scopeSpans": [{"scope": {"name": "ravenchain"}, "spans": spans}],
+                }
+            ]
+        }
+        line = (json.dumps(request, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            os.write(self._fd, line)
+
+    def close(self):
+        """Close the file; the next export reopens it"""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -12,6 +12,17 @@ class Transaction:
         self.timestamp = datetime.now(timezone.utc)
         self.signature = signature
 
+    @classmethod
+    def restore(cls, sender, recipient, amount, timestamp, signature=None):
+        """Rebuild a stored transaction from trusted fields, keeping its original timestamp"""
+        tx = cls.__new__(cls)
+        tx.sender = sender
+        tx.recipient = recipient
+        tx.amount = amount
+        tx.timestamp = timestamp
+        tx.signature = signature
+        return tx
+
     def to_dict(self):
         """Convert the transaction to a dictionary format"""
         return {
@@ -0,0 +1,185 @@
+"""
+Parallel verification of block hashes, hash links and transaction signatures.
+
+Blocks are verified in chunks of codec-encoded records, so only compact bytes cross the
+process boundary. Every chunk carries the hash its first block must link to, which makes
+chunks independent: they are verified in any order on a process pool and handed back to
+the caller in their original order.
+
+Signed transactions submitted by clients are checked the same way, against the public key
+each client supplied.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from . import codec, tracing
+from .tracing import span
+from .wallet import Wallet
+
+# Number of blocks verified by one worker task
+VERIFY_CHUNK_SIZE = 500
+# Number of submitted transactions verified by one worker task
+VERIFY_TRANSACTION_CHUNK_SIZE = 50
+
+# Public keys of the current worker process, set once by the pool initializer
+_public_keys = None
+
+
+class VerificationError(ValueError):
+    """Raised when a block fails verification"""
+
+    def __init__(self, height, reason):
+        super().__init__(f"Block {height} failed verification: {reason}")
+        self.height = height
+        self.reason = reason
+
+
+def verify_signature(tx, public_keys):
+    """
+    Check a transaction signature against the public key of its sender.
+
+    Transactions without a sender or signature, such as mining rewards, pass unchecked.
+
+    :param tx: Transaction to check
+    :param public_keys: Dictionary mapping addresses to public key hex strings
+    :return: None if the signature is valid, otherwise the reason it is not
+    """
+    if not (tx.signature and tx.sender):
+        return None
+    public_key = public_keys.get(tx.sender)
+    if public_key is None:
+        return f"no public key for sender {tx.sender}"
+    with span("verify_signature"):
+        if not Wallet.verify_signature(public_key, tx.signature, tx):
+            return f"invalid signature from {tx.sender}"
+    return None
+
+
+def verify_transactions(items):
+    """
+    Check submitted transactions against the public keys their clients supplied.
+
+    Unlike ``verify_signature``, a missing signature is a failure here, and the key must
+    belong to the sender's address.
+
+    :param items: (transaction, public key hex string) pairs
+    :return: List with None for each valid transaction, otherwise the reason it is not
+    """
+    with span("verify_transactions", transactions=len(items)):
+        return [_verify_submitted(tx, public_key) for tx, public_key in items]
+
+
+def _verify_submitted(tx, public_key):
+    if not tx.signature:
+        return "missing signature"
+    try:
+        if Wallet.address_from_public_key(public_key) != tx.sender:
+            return f"public key does not belong to sender {tx.sender}"
+        return verify_signature(tx, {tx.sender: public_key})
+    except (ValueError, AssertionError):
+        # ecdsa reports keys that are not a curve point as AssertionError subclasses
+        return "malformed public key"
+
+
+def verify_blocks(blocks, previous_hash, public_keys=None):
+    """
+    Verify consecutive blocks: hash links, recomputed hashes and signatures.
+
+    :param blocks: Blocks in height order
+    :param previous_hash: Hash the first block must link to
+    :param public_keys: Dictionary mapping addresses to public key hex strings,
+        or None to skip signature checks
+    :return: None if every block is valid, otherwise a (height, reason) tuple
+        for the first invalid block
+    """
+    with span("verify_blocks", signatures=public_keys is not None):
+        for block in blocks:
+            if block.previous_hash != previous_hash:
+                return block.index, "does not link to the previous block"
+            if block.hash != block.calculate_hash():
+                return block.index, "hash does not match the block contents"
+            if public_keys is not None:
+                for tx in block.data:
+                    reason = verify_signature(tx, public_keys)
+                    if reason:
+                        return block.index, reason
+            previous_hash = block.hash
+    return None
+
+
+def verify_records(records, previous_hash, public_keys=None):
+    """
+    Decode and verify a chunk of codec-encoded blocks.
+
+    :param records: Encoded blocks in height order
+    :param previous_hash: Hash the first block must link to
+    :param public_keys: Dictionary mapping addresses to public key hex strings,
+        or None to skip signature checks
+    :return: None if every block is valid, otherwise a (height, reason) tuple
+    """
+    blocks = [codec.decode_block(record)[0] for record in records]
+    return verify_blocks(blocks, previous_hash, public_keys)
+
+
+def _init_worker(public_keys):
+    global _public_keys
+    _public_keys = public_keys
+    # Spans of a forked worker would have no parent and flood the exporter
+    tracing.disable()
+
+
+def _verify_in_worker(records, previous_hash):
+    return verify_records(records, previous_hash, _public_keys)
+
+
+def verify_chunks(chunks, public_keys=None, workers=None, max_pending=None):
+    """
+    Verify chunks of encoded blocks in parallel and yield them back in order.
+
+    At most ``max_pending`` chunks are in flight, so memory stays bounded however long
+    the input is, and the caller can persist each verified chunk while later chunks are
+    still being checked.
+
+    :param chunks: Iterable of (records, previous_hash, item) tuples, where ``item`` is
+        whatever the caller wants back for the chunk, e.g. its decoded blocks
+    :param public_keys: Dictionary mapping addresses to public key hex strings,
+        or None to skip signature checks
+    :param workers: Number of worker processes, defaults to the CPU count; with one
+        worker chunks are verified in the calling process
+    :param max_pending: Maximum number of chunks in flight, defaults to twice the workers
+    :return: Iterator of the items of verified chunks, in input order
+    :raises: VerificationError for the first invalid chunk
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for records, previous_hash, item in chunks:
+            failure = verify_records(records, previous_hash, public_keys)
+            if failure:
+                raise VerificationError(*failure)
+            yield item
+        return
+
+    max_pending = max_pending or workers * 2
+    pending = deque()
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(public_keys,)
+    ) as executor:
+        try:
+            for records, previous_hash, item in chunks:
+                pending.append((executor.submit(_verify_in_worker, records, previous_hash), item))
+                if len(pending) >= max_pending:
+                    yield _verified(*pending.popleft())
+            while pending:
+                yield _verified(*pending.popleft())
+        finally:
+            for future, _ in pending:
+                future.cancel()
+
+
+def _verified(future, item):
+    failure = future.result()
+    if failure:
+        raise VerificationError(*failure)
+    return item
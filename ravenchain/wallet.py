@@ -38,15 +38,19 @@ class Wallet:
         if not self._public_key:
             raise ValueError("Wallet not initialized. Call create_wallet first.")
 
-        public_key_bytes = self._public_key.to_string()
-        sha256_hash = hashlib.sha256(public_key_bytes).digest()
+        self._address = Wallet.address_from_public_key(self._public_key.to_string().hex())
+        return self._address
+
+    @staticmethod
+    def address_from_public_key(public_key):
+        """Derive the address of a public key given as a hex string"""
+        sha256_hash = hashlib.sha256(bytes.fromhex(public_key)).digest()
         ripemd160_hash = hashlib.new("ripemd160")
         ripemd160_hash.update(sha256_hash)
         version_hash = b"\x00" + ripemd160_hash.digest()
         double_sha256 = hashlib.sha256(hashlib.sha256(version_hash).digest()).digest()
         binary_address = version_hash + double_sha256[:4]
-        self._address = base58.b58encode(binary_address).decode("utf-8")
-        return self._address
+        return base58.b58encode(binary_address).decode("utf-8")
 
     def sign_transaction(self, transaction):
         """Sign a transaction with the wallet's private key"""
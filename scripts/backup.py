@@ -1,58 +1,280 @@
 #!/usr/bin/env python3
 """
-Backup script for RavenChain data and wallets.
-Creates compressed backups with timestamps.
+Incremental backup script for the RavenChain block store and wallets.
+Each run streams only the blocks added since the previous backup into a compressed,
+checksummed segment, and restore replays the segments in bulk.
 """
+
+import argparse
+import gzip
+import hashlib
+import json
 import os
 import shutil
-import logging
-from datetime import datetime
+import struct
+from datetime import datetime, timezone
 from pathlib import Path
 from config.logging import setup_logging
+from config.settings import settings
+from ravenchain import codec
+from ravenchain.storage import create_block_store
+from ravenchain.storage.base import GROUP_COMMIT_SIZE
 
 logger = setup_logging("ravenchain.backup")
 
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+SEGMENT_TEMPLATE = "segment-{:06d}.rvb.gz"
+WALLET_FILE = "wallets.dat"
+RECORD_LENGTH = struct.Struct("<I")
+CHUNK_SIZE = 1024 * 1024
 
-def create_backup(data_dir: str = "data", backup_dir: str = "backups"):
-    try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = Path(backup_dir) / f"ravenchain_backup_{timestamp}"
 
-        # Create backup directory if it doesn't exist
-        Path(backup_dir).mkdir(parents=True, exist_ok=True)
+class BackupError(Exception):
+    """Raised when a backup cannot be written or does not verify"""
+
+
+class HashingWriter:
+    """File wrapper that hashes every byte written through it"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+    def flush(self):
+        self.fileobj.flush()
 
-        # Create backup
-        shutil.make_archive(
-            str(backup_path),
-            "gztar",
-            data_dir,
-        )
 
-        logger.info(
-            "Backup created successfully", backup_file=f"{backup_path}.tar.gz", timestamp=timestamp
+def load_manifest(backup_dir: Path) -> dict:
+    """Read the manifest, or start an empty one for a new backup directory."""
+    path = backup_dir / MANIFEST_FILE
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "segments": []}
+    manifest = json.loads(path.read_text())
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise BackupError(f"Unsupported manifest version {manifest.get('version')}")
+    return manifest
+
+
+def save_manifest(backup_dir: Path, manifest: dict):
+    """Atomically replace the manifest so a crash never leaves it half written."""
+    tmp_path = backup_dir / f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, backup_dir / MANIFEST_FILE)
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file in fixed-size chunks."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def backup_blocks(storage, backup_dir: str = "backups") -> dict:
+    """
+    Write every block above the last backed-up height to a new segment.
+
+    :param storage: BlockStore to read from
+    :param backup_dir: Directory holding the manifest and segments
+    :return: Manifest entry of the new segment, or None when there were no new blocks
+    :raises: BackupError if blocks that need backing up have been pruned
+    """
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(backup_dir)
+    previous = manifest["segments"][-1] if manifest["segments"] else None
+    start = previous["end_height"] + 1 if previous else 0
+    # Pruned stores only know their pruned height from the saved state
+    storage.load_state()
+    if start < storage.pruned_height:
+        raise BackupError(
+            f"Blocks from height {start} are needed but everything below "
+            f"{storage.pruned_height} has been pruned; back up an unpruned node"
         )
 
-        # Clean old backups (keep last 5)
-        cleanup_old_backups(backup_dir)
+    # Only the last backed-up header and the tip are read, not the whole chain
+    height = len(storage)
+    if previous:
+        last = storage.load_headers(previous["end_height"], previous["end_height"] + 1)
+        if not last or last[0].hash != previous["end_hash"]:
+            raise BackupError(
+                f"The chain no longer contains block {previous['end_height']} from the last "
+                "backup; start a full backup in a new directory"
+            )
+    if start >= height:
+        logger.info("No new blocks to back up", height=height - 1)
+        return None
 
-    except Exception as e:
-        logger.error("Backup failed", error=str(e), exc_info=True)
-        raise
+    number = len(manifest["segments"]) + 1
+    segment_path = backup_dir / SEGMENT_TEMPLATE.format(number)
+    tmp_path = segment_path.with_suffix(".tmp")
+    count = 0
+    first_block = last_block = None
+    with open(tmp_path, "wb") as raw:
+        writer = HashingWriter(raw)
+        with gzip.GzipFile(fileobj=writer, mode="wb", mtime=0) as segment:
+            for block in storage.iter_blocks(start, height):
+                data = codec.encode_block(block)
+                segment.write(RECORD_LENGTH.pack(len(data)))
+                segment.write(data)
+                count += 1
+                if first_block is None:
+                    first_block = block
+                last_block = block
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, segment_path)
 
+    entry = {
+        "file": segment_path.name,
+        "start_height": start,
+        "end_height": last_block.index,
+        "start_previous_hash": first_block.previous_hash,
+        "end_hash": last_block.hash,
+        "blocks": count,
+        "bytes": writer.size,
+        "sha256": writer.sha256.hexdigest(),
+        "previous_sha256": previous["sha256"] if previous else None,
+        "created": datetime.now(timezone.utc).isoformat(),
+    }
+    manifest["segments"].append(entry)
+    save_manifest(backup_dir, manifest)
+    logger.info(
+        "Backup segment written",
+        file=entry["file"],
+        start_height=start,
+        end_height=entry["end_height"],
+        bytes=entry["bytes"],
+    )
+    return entry
 
-def cleanup_old_backups(backup_dir: str, keep_last: int = 5):
-    """Remove old backups, keeping only the specified number of recent ones."""
-    try:
-        backups = sorted(Path(backup_dir).glob("ravenchain_backup_*.tar.gz"), key=os.path.getmtime)
 
-        # Remove old backups
-        for backup in backups[:-keep_last]:
-            backup.unlink()
-            logger.info("Removed old backup", file=str(backup))
+def verify_backup(backup_dir: str = "backups") -> dict:
+    """
+    Check that the segments form an unbroken chain and match their checksums.
+
+    :param backup_dir: Directory holding the manifest and segments
+    :return: The verified manifest
+    :raises: BackupError on the first inconsistency
+    """
+    backup_dir = Path(backup_dir)
+    manifest = load_manifest(backup_dir)
+    previous = None
+    for entry in manifest["segments"]:
+        if previous is None:
+            linked = entry["previous_sha256"] is None and entry["start_height"] == 0
+        else:
+            linked = (
+                entry["previous_sha256"] == previous["sha256"]
+                and entry["start_height"] == previous["end_height"] + 1
+                and entry["start_previous_hash"] == previous["end_hash"]
+            )
+        if not linked:
+            raise BackupError(f"Segment {entry['file']} does not follow its predecessor")
+        if file_sha256(backup_dir / entry["file"]) != entry["sha256"]:
+            raise BackupError(f"Checksum mismatch in segment {entry['file']}")
+        previous = entry
+    return manifest
+
+
+def iter_segment_blocks(path: Path):
+    """Stream the blocks stored in one segment."""
+    with gzip.open(path, "rb") as segment:
+        while header := segment.read(RECORD_LENGTH.size):
+            (length,) = RECORD_LENGTH.unpack(header)
+            data = segment.read(length)
+            if len(data) != length:
+                raise BackupError(f"Truncated record in segment {path.name}")
+            yield codec.decode_block(data)[0]
+
+
+def restore_blocks(storage, backup_dir: str = "backups", group_commit_size=GROUP_COMMIT_SIZE):
+    """
+    Replay verified segments into a block store, continuing from its current tip.
+
+    :param storage: BlockStore to restore into
+    :param backup_dir: Directory holding the manifest and segments
+    :param group_commit_size: Number of blocks persisted per commit
+    :return: Number of blocks restored
+    """
+    backup_dir = Path(backup_dir)
+    manifest = verify_backup(backup_dir)
+    next_height = len(storage)
+    tip = storage.load_headers(next_height - 1, next_height) if next_height else []
+    previous_hash = tip[0].hash if tip else "0"
+    restored = 0
+    for entry in manifest["segments"]:
+        if entry["end_height"] < next_height:
+            continue
+        group = []
+        for block in iter_segment_blocks(backup_dir / entry["file"]):
+            if block.index < next_height:
+                continue
+            if block.index != next_height or (block.index and block.previous_hash != previous_hash):
+                raise BackupError(
+                    f"Block {block.index} in {entry['file']} does not extend the chain"
+                )
+            group.append(block)
+            next_height, previous_hash = block.index + 1, block.hash
+            if len(group) == group_commit_size:
+                restored += storage.append_blocks(group, group_commit_size)
+                group = []
+        if group:
+            restored += storage.append_blocks(group, group_commit_size)
+        logger.info("Restored backup segment", file=entry["file"], height=next_height - 1)
+    return restored
 
+
+def backup_wallets(data_dir: str, backup_dir: str):
+    """Copy the wallet file next to the block segments."""
+    source = Path(data_dir) / WALLET_FILE
+    if source.exists():
+        tmp_path = Path(backup_dir) / f"{WALLET_FILE}.tmp"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, Path(backup_dir) / WALLET_FILE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=("backup", "restore", "verify"))
+    parser.add_argument("--backup-dir", default="backups")
+    parser.add_argument("--backend", default=settings.STORAGE_BACKEND)
+    parser.add_argument("--data-dir", default=settings.DATA_DIR)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "verify":
+            manifest = verify_backup(args.backup_dir)
+            logger.info("Backup verified", segments=len(manifest["segments"]))
+            return
+        storage = create_block_store(
+            args.backend, data_dir=args.data_dir, database_url=args.database_url
+        )
+        try:
+            if args.command == "backup":
+                backup_blocks(storage, args.backup_dir)
+                backup_wallets(args.data_dir, args.backup_dir)
+            else:
+                restored = restore_blocks(storage, args.backup_dir)
+                logger.info("Restore complete", blocks=restored)
+        finally:
+            storage.close()
     except Exception as e:
-        logger.error("Cleanup failed", error=str(e), exc_info=True)
+        logger.error("Backup command failed", command=args.command, error=str(e), exc_info=True)
+        raise
 
 
 if __name__ == "__main__":
-    create_backup()
+    main()
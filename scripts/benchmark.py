@@ -3,11 +3,13 @@
 Benchmark script for RavenChain performance testing.
 Tests transaction processing, mining speed, and chain validation.
 """
+
 import time
 import statistics
 from typing import List, Tuple, Dict
 from config.logging import setup_logging
 from ravenchain.blockchain import Blockchain
+from ravenchain.storage import MemoryBlockStore
 from ravenchain.wallet import Wallet
 
 logger = setup_logging("ravenchain.benchmark")
@@ -15,8 +17,9 @@ logger = setup_logging("ravenchain.benchmark")
 
 class BlockchainBenchmark:
     def __init__(self, difficulty: int = 2):
-        self.blockchain = Blockchain(difficulty=difficulty)
-        self.wallet = Wallet()
+        # Keep blocks in memory so storage I/O does not skew the mining and validation timings
+        self.blockchain = Blockchain(difficulty=difficulty, storage=MemoryBlockStore())
+        self.wallet = Wallet().create_wallet()
         self.wallet_registry: Dict[str, Wallet] = {self.wallet.address: self.wallet}
 
     def benchmark_mining(self, num_blocks: int = 5) -> List[float]:
@@ -26,7 +29,7 @@ class BlockchainBenchmark:
         for _ in range(num_blocks):
             # Add some transactions
             for _ in range(3):
-                recipient = Wallet()
+                recipient = Wallet().create_wallet()
                 self.wallet_registry[recipient.address] = recipient
                 self.blockchain.add_transaction(
                     self.wallet.address, recipient.address, 1.0, wallet=self.wallet
@@ -44,7 +47,7 @@ class BlockchainBenchmark:
         start_time = time.time()
 
         for _ in range(num_transactions):
-            recipient = Wallet()
+            recipient = Wallet().create_wallet()
             self.wallet_registry[recipient.address] = recipient
             self.blockchain.add_transaction(
                 self.wallet.address, recipient.address, 1.0, wallet=self.wallet
@@ -56,7 +59,7 @@ class BlockchainBenchmark:
         """Benchmark chain validation speed."""
         # First, create a decent-sized chain
         for _ in range(5):
-            recipient = Wallet()
+            recipient = Wallet().create_wallet()
             self.wallet_registry[recipient.address] = recipient
             self.blockchain.add_transaction(
                 self.wallet.address, recipient.address, 1.0, wallet=self.wallet
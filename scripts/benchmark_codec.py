@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for RavenChain.
+Compares the JSON block representation used by the API with the binary codec.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+from config.logging import setup_logging
+from ravenchain import codec
+from ravenchain.block import Block
+from ravenchain.transaction import Transaction
+
+logger = setup_logging("ravenchain.benchmark")
+
+
+def make_blocks(num_blocks: int, txs_per_block: int) -> List[Block]:
+    """Create linked blocks with signed-looking transactions."""
+    blocks = []
+    previous_hash = "0"
+    for index in range(num_blocks):
+        transactions = [Transaction(None, "1MinerAddress", 10.0)] + [
+            Transaction(
+                f"1Sender{index}x{i}", f"1Recipient{index}x{i}", 1.25, signature=os.urandom(71)
+            )
+            for i in range(txs_per_block)
+        ]
+        block = Block(index, data=transactions, previous_hash=previous_hash)
+        previous_hash = block.hash
+        blocks.append(block)
+    return blocks
+
+
+def time_call(func, items, repeat: int) -> float:
+    """Return the best time of ``repeat`` runs of func over every item."""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def benchmark_codec(num_blocks: int = 200, txs_per_block: int = 100, repeat: int = 3) -> Dict:
+    """Measure encode/decode throughput and encoded size for JSON and the binary codec."""
+    blocks = make_blocks(num_blocks, txs_per_block)
+    json_data = [json.dumps(block.to_dict()).encode() for block in blocks]
+    binary_data = [codec.encode_block(block) for block in blocks]
+
+    results = {
+        "blocks": num_blocks,
+        "transactions_per_block": txs_per_block,
+        "json_bytes": sum(len(data) for data in json_data),
+        "binary_bytes": sum(len(data) for data in binary_data),
+        "json_encode_seconds": time_call(
+            lambda block: json.dumps(block.to_dict()).encode(), blocks, repeat
+        ),
+        "binary_encode_seconds": time_call(codec.encode_block, blocks, repeat),
+        "json_decode_seconds": time_call(
+            lambda data: Block.from_dict(json.loads(data)), json_data, repeat
+        ),
+        "binary_decode_seconds": time_call(codec.decode_block, binary_data, repeat),
+    }
+    return results
+
+
+def run_benchmarks(num_blocks: int = 200, txs_per_block: int = 100) -> Dict:
+    """Run the codec benchmark and log the results."""
+    try:
+        result = benchmark_codec(num_blocks, txs_per_block)
+        logger.info(
+            "Codec benchmark complete",
+            blocks=result["blocks"],
+            transactions_per_block=result["transactions_per_block"],
+            size_reduction=f"{1 - result['binary_bytes'] / result['json_bytes']:.1%}",
+            encode_speedup=(
+                f"{result['json_encode_seconds'] / result['binary_encode_seconds']:.2f}x"
+            ),
+            decode_speedup=(
+                f"{result['json_decode_seconds'] / result['binary_decode_seconds']:.2f}x"
+            ),
+        )
+        return result
+    except Exception as e:
+        logger.error("Benchmark failed", error=str(e), exc_info=True)
+        raise
+
+
+if __name__ == "__main__":
+    run_benchmarks(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Database benchmark for RavenChain.
+Measures how fast the chain is loaded from and saved to the database at different chain sizes.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import joinedload, sessionmaker
+from api.database.models import Base, BlockDB, TransactionDB
+from config.logging import setup_logging
+from ravenchain.block import Block
+from ravenchain.blockchain import Blockchain
+from ravenchain.transaction import Transaction
+
+logger = setup_logging("ravenchain.benchmark")
+
+TRANSACTIONS_PER_BLOCK = 100
+
+
+def populate_database(engine, num_transactions: int, txs_per_block: int = TRANSACTIONS_PER_BLOCK):
+    """Fill an empty database with synthetic blocks using bulk core inserts."""
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    signature = os.urandom(64)
+    num_blocks = max(1, num_transactions // txs_per_block)
+    previous_hash = "0"
+    with engine.begin() as conn:
+        for index in range(num_blocks):
+            block_hash = f"{index:064x}"
+            block_id = conn.execute(
+                insert(BlockDB).values(
+                    index=index,
+                    timestamp=now,
+                    previous_hash=previous_hash,
+                    nonce=index,
+                    hash=block_hash,
+                )
+            ).inserted_primary_key[0]
+            conn.execute(
+                insert(TransactionDB),
+                [
+                    {
+                        "sender": f"sender{i}",
+                        "recipient": f"recipient{i}",
+                        "amount": 1.0,
+                        "timestamp": now,
+                        "signature": signature,
+                        "block_id": block_id,
+                    }
+                    for i in range(txs_per_block)
+                ],
+            )
+            previous_hash = block_hash
+    return num_blocks
+
+
+def load_with_orm(session) -> List[Block]:
+    """The previous load path: joined ORM graph re-wrapped and rehashed block by block."""
+    chain = []
+    db_blocks = (
+        session.query(BlockDB)
+        .options(joinedload(BlockDB.transactions))
+        .order_by(BlockDB.index)
+        .all()
+    )
+    for db_block in db_blocks:
+        transactions = []
+        for db_tx in db_block.transactions:
+            tx = Transaction(db_tx.sender, db_tx.recipient, db_tx.amount, signature=db_tx.signature)
+            tx.timestamp = db_tx.timestamp
+            transactions.append(tx)
+        block = Block(db_block.index, db_block.timestamp, transactions, db_block.previous_hash)
+        block.nonce = db_block.nonce
+        block.hash = db_block.hash
+        chain.append(block)
+    return chain
+
+
+def benchmark_load(num_transactions: int) -> Dict[str, float]:
+    """Compare blocks/sec of the ORM load path and the bulk load path."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{tmp_dir}/bench.db")
+        Session = sessionmaker(bind=engine)
+        num_blocks = populate_database(engine, num_transactions)
+        blockchain = Blockchain(Session)
+
+        results = {"transactions": num_transactions, "blocks": num_blocks}
+        for name, load in (
+            ("orm", load_with_orm),
+            ("bulk", blockchain.load_chain_from_db),
+        ):
+            with Session() as session:
+                start_time = time.perf_counter()
+                chain = load(session)
+                elapsed = time.perf_counter() - start_time
+            assert len(chain) == num_blocks
+            results[f"{name}_seconds"] = elapsed
+            results[f"{name}_blocks_per_second"] = num_blocks / elapsed
+        engine.dispose()
+    return results
+
+
+def make_blocks(num_blocks: int, txs_per_block: int = TRANSACTIONS_PER_BLOCK) -> List[Block]:
+    """Build a linked chain of unmined blocks that follows a genesis block."""
+    signature = os.urandom(64)
+    blocks = []
+    previous_hash = "0"
+    for index in range(1, num_blocks + 1):
+        transactions = [
+            Transaction(f"sender{i}", f"recipient{i}", 1.0, signature=signature)
+            for i in range(txs_per_block)
+        ]
+        block = Block(index, data=transactions, previous_hash=previous_hash)
+        previous_hash = block.hash
+        blocks.append(block)
+    return blocks
+
+
+def save_with_orm(session, blocks: List[Block]):
+    """The previous write path: one session.add per row and one commit per block."""
+    for block in blocks:
+        db_block = BlockDB(
+            index=block.index,
+            timestamp=block.timestamp,
+            previous_hash=block.previous_hash,
+            nonce=block.nonce,
+            hash=block.hash,
+        )
+        session.add(db_block)
+        session.flush()
+        for tx in block.data:
+            session.add(
+                TransactionDB(
+                    sender=tx.sender,
+                    recipient=tx.recipient,
+                    amount=tx.amount,
+                    timestamp=tx.timestamp,
+                    signature=tx.signature,
+                    block_id=db_block.id,
+                )
+            )
+        session.commit()
+
+
+def benchmark_save(num_transactions: int, group_commit_size: int = 100) -> Dict[str, float]:
+    """Compare blocks/sec of per-block ORM commits and bulk group commits."""
+    num_blocks = max(1, num_transactions // TRANSACTIONS_PER_BLOCK)
+    blocks = make_blocks(num_blocks)
+    results = {"transactions": num_transactions, "blocks": num_blocks}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in ("orm", "per_block", "group"):
+            engine = create_engine(f"sqlite:///{tmp_dir}/{name}.db")
+            Base.metadata.create_all(engine)
+            Session = sessionmaker(bind=engine)
+            blockchain = Blockchain(Session)
+            with Session() as session:
+                start_time = time.perf_counter()
+                if name == "orm":
+                    save_with_orm(session, blocks)
+                elif name == "per_block":
+                    for block in blocks:
+                        blockchain.save_block_to_db(session, block)
+                else:
+                    blockchain.save_blocks_to_db(session, blocks, group_commit_size)
+                elapsed = time.perf_counter() - start_time
+            results[f"{name}_seconds"] = elapsed
+            results[f"{name}_blocks_per_second"] = num_blocks / elapsed
+            engine.dispose()
+    return results
+
+
+def run_benchmarks(sizes=(10_000, 100_000, 1_000_000)) -> List[Dict[str, float]]:
+    """Run the load and save benchmarks for each chain size and log the results."""
+    results = []
+    try:
+        for num_transactions in sizes:
+            logger.info("Starting load benchmark", transactions=num_transactions)
+            result = benchmark_load(num_transactions)
+            logger.info(
+                "Load benchmark complete",
+                transactions=num_transactions,
+                blocks=result["blocks"],
+                orm_blocks_per_second=f"{result['orm_blocks_per_second']:.1f}",
+                bulk_blocks_per_second=f"{result['bulk_blocks_per_second']:.1f}",
+                speedup=f"{result['orm_seconds'] / result['bulk_seconds']:.2f}x",
+            )
+            results.append(result)
+
+            logger.info("Starting save benchmark", transactions=num_transactions)
+            result = benchmark_save(num_transactions)
+            logger.info(
+                "Save benchmark complete",
+                transactions=num_transactions,
+                blocks=result["blocks"],
+                orm_blocks_per_second=f"{result['orm_blocks_per_second']:.1f}",
+                per_block_blocks_per_second=f"{result['per_block_blocks_per_second']:.1f}",
+                group_blocks_per_second=f"{result['group_blocks_per_second']:.1f}",
+            )
+            results.append(result)
+        return results
+    except Exception as e:
+        logger.error("Benchmark failed", error=str(e), exc_info=True)
+        raise
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or (10_000, 100_000, 1_000_000)
+    run_benchmarks(sizes)
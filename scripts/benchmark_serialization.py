@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+JSON serialization benchmark for RavenChain block responses.
+Compares FastAPI's generic encoding of ``block.to_dict()`` with the single-pass encoder.
+"""
+
+import json
+import sys
+from typing import Dict, List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from api import serialization
+from config.logging import setup_logging
+from scripts.benchmark_codec import make_blocks, time_call
+
+logger = setup_logging("ravenchain.benchmark")
+
+BLOCK_SIZES = (1, 10, 100, 1000)
+
+
+def generic_json(block) -> bytes:
+    """Encode a block the way FastAPI renders a returned dictionary."""
+    return JSONResponse(jsonable_encoder(block.to_dict())).body
+
+
+def benchmark_serialization(txs_per_block: int, num_blocks: int = 50, repeat: int = 3) -> Dict:
+    """Measure per-block encode time of the generic and single-pass JSON paths."""
+    blocks = make_blocks(num_blocks, txs_per_block)
+    for block in blocks:
+        if serialization.encode_block(block) != generic_json(block):
+            raise AssertionError(f"Encodings of block {block.index} differ")
+    return {
+        "transactions_per_block": txs_per_block,
+        "generic_us": time_call(generic_json, blocks, repeat) / num_blocks * 1e6,
+        "to_dict_json_us": time_call(
+            lambda block: json.dumps(block.to_dict(), separators=(",", ":")), blocks, repeat
+        )
+        / num_blocks
+        * 1e6,
+        "single_pass_us": time_call(serialization.encode_block, blocks, repeat) / num_blocks * 1e6,
+    }
+
+
+def run_benchmarks(block_sizes: List[int] = BLOCK_SIZES) -> List[Dict]:
+    """Run the serialization benchmark for every block size and log the results."""
+    try:
+        results = []
+        for txs_per_block in block_sizes:
+            result = benchmark_serialization(txs_per_block)
+            logger.info(
+                "Serialization benchmark complete",
+                transactions_per_block=txs_per_block,
+                orjson=serialization.orjson is not None,
+                generic_us=f"{result['generic_us']:.1f}",
+                to_dict_json_us=f"{result['to_dict_json_us']:.1f}",
+                single_pass_us=f"{result['single_pass_us']:.1f}",
+                speedup=f"{result['generic_us'] / result['single_pass_us']:.1f}x",
+            )
+            results.append(result)
+        return results
+    except Exception as e:
+        logger.error("Benchmark failed", error=str(e), exc_info=True)
+        raise
+
+
+if __name__ == "__main__":
+    run_benchmarks([int(arg) for arg in sys.argv[1:]] or BLOCK_SIZES)
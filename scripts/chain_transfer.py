@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Bulk export and import of the RavenChain block history.
+Export dumps the chain as compressed height-range files. Import bulk-loads them with
+Postgres COPY (or batched group commits on other backends) while hash links, block hashes
+and signatures are verified in parallel chunks; only verified blocks are ever loaded.
+
+Every loaded chunk is committed before the next one is loaded. A failed import keeps the
+verified blocks before the failure, and running it again resumes from the store's tip.
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import pickle
+from pathlib import Path
+from config.logging import setup_logging
+from config.settings import settings
+from ravenchain import codec
+from ravenchain.storage import create_block_store
+from ravenchain.verify import VERIFY_CHUNK_SIZE, verify_chunks
+from scripts.backup import RECORD_LENGTH, HashingWriter, file_sha256
+
+logger = setup_logging("ravenchain.transfer")
+
+EXPORT_MANIFEST = "export.json"
+EXPORT_VERSION = 1
+RANGE_TEMPLATE = "blocks-{:09d}-{:09d}.rvb.gz"
+RANGE_SIZE = 10000
+# Compression level of range files; import speed matters more than size
+COMPRESS_LEVEL = 1
+# Blocks persisted per commit when importing without COPY
+BULK_GROUP_SIZE = 1000
+NULL = "\\N"
+
+
+class TransferError(Exception):
+    """Raised when an export cannot be written or read back"""
+
+
+def export_chain(storage, export_dir, start=0, end=None, range_size=RANGE_SIZE):
+    """
+    Dump the blocks in [start, end) to one file per height range.
+
+    :param storage: BlockStore to read from
+    :param export_dir: Directory receiving the range files and the manifest
+    :param start: First height to export
+    :param end: Height to stop before, or None for the tip
+    :param range_size: Number of blocks per range file
+    :return: Manifest describing the written ranges
+    :raises: TransferError if the range starts below the store's pruned height
+    """
+    # Pruned stores only know their pruned height from the saved state
+    storage.load_state()
+    headers = storage.load_headers()
+    end = len(headers) if end is None else min(end, len(headers))
+    if start < storage.pruned_height and start < end:
+        raise TransferError(
+            f"Blocks below height {storage.pruned_height} have been pruned; "
+            "export from a later start height or from an unpruned node"
+        )
+    export_dir = Path(export_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"version": EXPORT_VERSION, "ranges": []}
+    for range_start in range(start, end, range_size):
+        range_end = min(range_start + range_size, end)
+        path = export_dir / RANGE_TEMPLATE.format(range_start, range_end - 1)
+        tmp_path = path.with_suffix(".tmp")
+        transactions = 0
+        with open(tmp_path, "wb") as raw:
+            writer = HashingWriter(raw)
+            with gzip.GzipFile(
+                fileobj=writer, mode="wb", compresslevel=COMPRESS_LEVEL, mtime=0
+            ) as out:
+                for block in storage.iter_blocks(range_start, range_end):
+                    data = codec.encode_block(block)
+                    out.write(RECORD_LENGTH.pack(len(data)))
+                    out.write(data)
+                    transactions += len(block.data)
+        os.replace(tmp_path, path)
+        manifest["ranges"].append(
+            {
+                "file": path.name,
+                "start_height": range_start,
+                "end_height": range_end - 1,
+                "start_previous_hash": headers[range_start].previous_hash,
+                "end_hash": headers[range_end - 1].hash,
+                "blocks": range_end - range_start,
+                "transactions": transactions,
+                "bytes": writer.size,
+                "sha256": writer.sha256.hexdigest(),
+            }
+        )
+        logger.info("Exported block range", file=path.name, transactions=transactions)
+    (export_dir / EXPORT_MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def load_export_manifest(export_dir):
+    """
+    Read an export manifest and check that its ranges are contiguous and intact.
+
+    :param export_dir: Directory written by export_chain
+    :return: The manifest
+    :raises: TransferError on the first inconsistency
+    """
+    export_dir = Path(export_dir)
+    manifest = json.loads((export_dir / EXPORT_MANIFEST).read_text())
+    if manifest.get("version") != EXPORT_VERSION:
+        raise TransferError(f"Unsupported export version {manifest.get('version')}")
+    previous = None
+    for entry in manifest["ranges"]:
+        if previous and (
+            entry["start_height"] != previous["end_height"] + 1
+            or entry["start_previous_hash"] != previous["end_hash"]
+        ):
+            raise TransferError(f"Range {entry['file']} does not follow its predecessor")
+        if file_sha256(export_dir / entry["file"]) != entry["sha256"]:
+            raise TransferError(f"Checksum mismatch in range {entry['file']}")
+        previous = entry
+    return manifest
+
+
+def iter_records(path):
+    """Stream the encoded blocks stored in one range file."""
+    with gzip.open(path, "rb") as ranges:
+        while header := ranges.read(RECORD_LENGTH.size):
+            (length,) = RECORD_LENGTH.unpack(header)
+            data = ranges.read(length)
+            if len(data) != length:
+                raise TransferError(f"Truncated record in range {path.name}")
+            yield data
+
+
+def load_public_keys(wallet_file):
+    """
+    Read the public keys of the wallets saved by the CLI.
+
+    :param wallet_file: Pickled wallet dictionary, e.g. data/wallets.dat
+    :return: Dictionary mapping addresses to public key hex strings
+    """
+    with open(wallet_file, "rb") as f:
+        wallets = pickle.load(f)
+    return {wallet.address: wallet.public_key for wallet in wallets.values()}
+
+
+class AppendLoader:
+    """Load blocks through ``BlockStore.append_blocks``, committing each loaded chunk"""
+
+    def __init__(self, storage, group_commit_size=BULK_GROUP_SIZE):
+        self.storage = storage
+        self.group_commit_size = group_commit_size
+
+    def load(self, blocks):
+        return self.storage.append_blocks(blocks, self.group_commit_size)
+
+    def commit(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class CopyLoader:
+    """
+    Load blocks into Postgres with ``COPY ... FROM STDIN``, one database transaction per chunk.
+
+    Block ids of a chunk are assigned up front under an exclusive table lock, so
+    transaction rows can reference them without a round-trip per block. Like AppendLoader,
+    every chunk is committed once loaded, and timestamps are written as naive UTC like the
+    ORM path writes them.
+    """
+
+    def __init__(self, engine):
+        self.connection = engine.raw_connection()
+        self.cursor = self.connection.cursor()
+
+    def load(self, blocks):
+        from ravenchain.storage.sql import to_db_timestamp
+
+        self.cursor.execute("LOCK TABLE blocks IN EXCLUSIVE MODE")
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM blocks")
+        next_id = self.cursor.fetchone()[0] + 1
+        block_rows, tx_rows = io.StringIO(), io.StringIO()
+        block_writer, tx_writer = csv.writer(block_rows), csv.writer(tx_rows)
+        for block in blocks:
+            block_id = next_id
+            next_id += 1
+            block_writer.writerow(
+                (
+                    block_id,
+                    block.index,
+                    to_db_timestamp(block.timestamp).isoformat(),
+                    block.previous_hash,
+                    block.nonce,
+                    block.hash,
+                )
+            )
+            for tx in block.data:
+                tx_writer.writerow(
+                    (
+                        NULL if tx.sender is None else tx.sender,
+                        NULL if tx.recipient is None else tx.recipient,
+                        tx.amount,
+                        to_db_timestamp(tx.timestamp).isoformat(),
+                        "\\x" + tx.signature.hex() if tx.signature else NULL,
+                        block_id,
+                    )
+                )
+        block_rows.seek(0)
+        tx_rows.seek(0)
+        self.cursor.copy_expert(
+            'COPY blocks (id, "index", timestamp, previous_hash, nonce, hash) '
+            f"FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+            block_rows,
+        )
+        self.cursor.copy_expert(
+            "COPY transactions (sender, recipient, amount, timestamp, signature, block_id) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+            tx_rows,
+        )
+        self.cursor.execute(
+            "SELECT setval(pg_get_serial_sequence('blocks', 'id'), MAX(id)) FROM blocks"
+        )
+        self.connection.commit()
+        return len(blocks)
+
+    def commit(self):
+        # Every chunk was committed by load
+        self.connection.close()
+
+    def abort(self):
+        self.connection.rollback()
+        self.connection.close()
+
+
+def make_loader(storage, group_commit_size=BULK_GROUP_SIZE):
+    """Pick COPY for Postgres-backed SQL stores and group commits for everything else."""
+    from ravenchain.storage.sql import SQLBlockStore
+
+    if isinstance(storage, SQLBlockStore):
+        engine = storage.sessionmaker.kw["bind"]
+        if engine.dialect.name == "postgresql":
+            return CopyLoader(engine)
+    return AppendLoader(storage, group_commit_size)
+
+
+def import_chain(
+    storage,
+    export_dir,
+    public_keys=None,
+    workers=None,
+    chunk_size=VERIFY_CHUNK_SIZE,
+    loader=None,
+):
+    """
+    Bulk-load an export on top of the store's current tip.
+
+    Blocks the store already has are skipped. Chunks of blocks are verified on a process
+    pool and loaded in height order as soon as they pass, so a bad block stops the
+    import before it or anything after it is loaded. Chunks loaded before the failure stay
+    committed.
+
+    :param storage: BlockStore to import into
+    :param export_dir: Directory written by export_chain
+    :param public_keys: Dictionary mapping addresses to public key hex strings,
+        or None to skip signature checks
+    :param workers: Number of verification processes, defaults to the CPU count
+    :param chunk_size: Number of blocks per verification chunk
+    :param loader: Loader to persist blocks with, defaults to make_loader(storage)
+    :return: Number of blocks imported
+    :raises: TransferError or VerificationError if the export does not extend the chain
+    """
+    export_dir = Path(export_dir)
+    manifest = load_export_manifest(export_dir)
+    headers = storage.load_headers()
+    tip = (len(headers), headers[-1].hash if headers else "0")
+
+    def chunks():
+        next_height, previous_hash = tip
+        records, blocks, chunk_previous_hash = [], [], previous_hash
+        for entry in manifest["ranges"]:
+            if entry["end_height"] < next_height:
+                continue
+            for record in iter_records(export_dir / entry["file"]):
+                block = codec.decode_block(record)[0]
+                if block.index < next_height:
+                    continue
+                if block.index != next_height:
+                    raise TransferError(f"Block {block.index} does not extend the chain")
+                records.append(record)
+                blocks.append(block)
+                next_height, previous_hash = block.index + 1, block.hash
+                if len(records) == chunk_size:
+                    yield records, chunk_previous_hash, blocks
+                    records, blocks, chunk_previous_hash = [], [], previous_hash
+        if records:
+            yield records, chunk_previous_hash, blocks
+
+    loader = loader or make_loader(storage)
+    imported = 0
+    try:
+        for blocks in verify_chunks(chunks(), public_keys, workers):
+            imported += loader.load(blocks)
+        loader.commit()
+    except Exception:
+        loader.abort()
+        raise
+    logger.info("Import complete", blocks=imported, height=tip[0] + imported - 1)
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("--export-dir", default="export")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--end", type=int, default=None)
+    parser.add_argument("--range-size", type=int, default=RANGE_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--wallet-file", default=None)
+    parser.add_argument("--backend", default=settings.STORAGE_BACKEND)
+    parser.add_argument("--data-dir", default=settings.DATA_DIR)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    args = parser.parse_args()
+
+    storage = create_block_store(
+        args.backend, data_dir=args.data_dir, database_url=args.database_url
+    )
+    try:
+        if args.command == "export":
+            export_chain(storage, args.export_dir, args.start, args.end, args.range_size)
+            return
+        wallet_file = Path(args.wallet_file or Path(args.data_dir) / "wallets.dat")
+        public_keys = None
+        if wallet_file.exists():
+            public_keys = load_public_keys(wallet_file)
+        else:
+            logger.warning("No wallet file found; signatures will not be verified")
+        import_chain(storage, args.export_dir, public_keys, args.workers)
+    except Exception as e:
+        logger.error("Transfer failed", command=args.command, error=str(e), exc_info=True)
+        raise
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,13 @@
 Generate test data for RavenChain development and testing.
 Creates wallets, transactions, and mines blocks.
 """
+
 import random
 from pathlib import Path
 from config.logging import setup_logging
+from config.settings import settings
 from ravenchain.blockchain import Blockchain
+from ravenchain.storage import create_block_store
 from ravenchain.wallet import Wallet
 
 logger = setup_logging("ravenchain.testdata")
@@ -20,13 +23,20 @@ def generate_test_data(
 ):
     try:
         # Initialize blockchain
-        blockchain = Blockchain(difficulty=2)
+        blockchain = Blockchain(
+            difficulty=2,
+            storage=create_block_store(
+                settings.STORAGE_BACKEND,
+                data_dir=settings.DATA_DIR,
+                database_url=settings.DATABASE_URL,
+            ),
+        )
         wallets = []
 
         # Create wallets
         logger.info("Creating test wallets", count=num_wallets)
         for i in range(num_wallets):
-            wallet = Wallet()
+            wallet = Wallet().create_wallet()
             wallets.append(wallet)
             logger.debug(f"Created wallet {i+1}", address=wallet.address)
 
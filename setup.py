@@ -12,9 +12,12 @@ setup(
         "sqlalchemy>=2.0.38",
         "alembic>=1.13.0",
         "psycopg2-binary>=2.9.10",
+        "asyncpg>=0.29.0",
         "python-jose[cryptography]>=3.3.0",
         "passlib[bcrypt]>=1.7.4",
+        "bcrypt<4.1",
         "slowapi>=0.1.9",
+        "prometheus_client>=0.17.0",
         "pydantic>=2.1.1",
         "pydantic-core>=2.7.0",
         "pydantic[email]>=2.1.1",
@@ -26,8 +29,15 @@ setup(
             "pytest-cov>=4.1.0",
             "pytest-asyncio>=0.23.0",
             "httpx>=0.26.0",  # For testing FastAPI endpoints
+            "aiosqlite>=0.20.0",  # Async SQLite stand-in for Postgres
             "python-dotenv>=1.0.0",  # For loading environment variables
         ],
+        "analytics": [
+            "numpy>=1.24.0",  # Columnar transaction analytics
+        ],
+        "speedups": [
+            "orjson>=3.8.0",  # Faster JSON encoding of block responses
+        ],
         "dev": [
             "black>=25.0.0",
             "isort>=5.13.0",
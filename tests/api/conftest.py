@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from api.auth.utils import last_seen, token_cache, user_cache
+from api.database.models import Base
+from api.dependencies import get_async_db, get_blockchain, limiter, response_cache
+from api.main import app
+from ravenchain import Blockchain
+
+
+# Function-scoped fixture for a file-backed SQLite database shared by sync and async engines
+@pytest.fixture
+def database_path(tmp_path):
+    """Create an empty SQLite database file with all tables"""
+    path = tmp_path / "api.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return path
+
+
+# Async session factory standing in for Postgres
+@pytest.fixture
+def async_session_factory(database_path):
+    """Create an async SQLite sessionmaker for the request handlers"""
+    # NullPool keeps connections from leaking between the test and TestClient event loops
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+# Blockchain backed by the same database file
+@pytest.fixture
+def api_blockchain(database_path):
+    """Create a blockchain instance for the API routes"""
+    engine = create_engine(f"sqlite:///{database_path}")
+    yield Blockchain(sessionmaker(bind=engine), difficulty=1)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(async_session_factory, api_blockchain):
+    """Create a test client with the database and blockchain dependencies overridden"""
+
+    async def override_get_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_blockchain] = lambda: api_blockchain
+    limiter.reset()
+    response_cache.clear()
+    token_cache.clear()
+    user_cache.clear()
+    last_seen.clear()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Register a user and return bearer token headers for it"""
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "alice", "email": "alice@example.com", "password": "password123"},
+    )
+    response = client.post(
+        "/api/v1/auth/login", data={"username": "alice", "password": "password123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from api.dependencies import get_analytics
+from api.main import app
+from ravenchain.analytics import TransactionColumns
+
+
+@pytest.fixture
+def columns(client, api_blockchain):
+    columns = TransactionColumns()
+    api_blockchain.add_listener(columns)
+    app.dependency_overrides[get_analytics] = lambda: columns
+    return columns
+
+
+def test_analytics_disabled(client, auth_headers):
+    response = client.get("/api/v1/analytics/volume", headers=auth_headers)
+    assert response.status_code == 503
+
+
+def test_analytics_endpoints(client, auth_headers, api_blockchain, columns):
+    api_blockchain.add_transaction("alice", "bob", 4.0)
+    api_blockchain.mine_pending_transactions("miner")
+
+    response = client.get("/api/v1/analytics/volume", headers=auth_headers)
+    assert response.json() == [{"height": 1, "volume": 4.0}]
+
+    response = client.get("/api/v1/analytics/top-senders?hours=1", headers=auth_headers)
+    assert response.json() == [{"address": "alice", "amount": 4.0, "transactions": 1}]
+
+    response = client.get("/api/v1/analytics/transactions-per-hour?hours=2", headers=auth_headers)
+    assert sum(row["transactions"] for row in response.json()) == 2
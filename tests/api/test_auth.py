@@ -0,0 +1,110 @@
+from api.auth.utils import last_seen, password_hasher, token_cache
+
+
+def test_register_first_user_is_admin(client):
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"username": "alice", "email": "alice@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+    assert response.json()["is_admin"] is True
+
+
+def test_register_duplicate_username(client, auth_headers):
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"username": "alice", "email": "other@example.com", "password": "password123"},
+    )
+    assert response.status_code == 400
+
+
+def test_login_with_wrong_password(client, auth_headers):
+    response = client.post("/api/v1/auth/login", data={"username": "alice", "password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_get_me(client, auth_headers):
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == "alice"
+    assert response.json()["last_login"] is not None
+
+
+def test_update_me(client, auth_headers):
+    response = client.put(
+        "/api/v1/auth/me", headers=auth_headers, json={"wallet_address": "1RavenAddress"}
+    )
+    assert response.status_code == 200
+    assert response.json()["wallet_address"] == "1RavenAddress"
+
+
+def test_admin_lists_users(client, auth_headers):
+    response = client.get("/api/v1/admin/users", headers=auth_headers)
+    assert response.status_code == 200
+    assert [user["username"] for user in response.json()] == ["alice"]
+
+
+def test_requires_authentication(client):
+    response = client.get("/api/v1/auth/me")
+    assert response.status_code == 401
+
+
+def test_authenticated_reads_defer_last_login_writes(client, auth_headers):
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    assert len(last_seen) == 1
+    assert token_cache.stats()["hits"] >= 1
+
+
+def test_admin_deactivation_takes_effect_immediately(client, auth_headers):
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "bob", "email": "bob@example.com", "password": "password123"},
+    )
+    login = client.post("/api/v1/auth/login", data={"username": "bob", "password": "password123"})
+    bob_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    me = client.get("/api/v1/auth/me", headers=bob_headers)
+    assert me.status_code == 200
+
+    response = client.put(
+        f"/api/v1/admin/users/{me.json()['id']}", headers=auth_headers, json={"is_active": False}
+    )
+    assert response.status_code == 200
+    assert client.get("/api/v1/auth/me", headers=bob_headers).status_code == 403
+
+
+def test_update_me_refreshes_cached_user(client, auth_headers):
+    client.get("/api/v1/auth/me", headers=auth_headers)
+    client.put("/api/v1/auth/me", headers=auth_headers, json={"wallet_address": "1RavenAddress"})
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.json()["wallet_address"] == "1RavenAddress"
+
+
+def test_login_is_shed_when_password_hashing_is_overloaded(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(password_hasher, "workers", 0)
+    monkeypatch.setattr(password_hasher, "max_queue", 0)
+    response = client.post(
+        "/api/v1/auth/login", data={"username": "alice", "password": "password123"}
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_admin_reads_auth_stats(client, auth_headers):
+    response = client.get("/api/v1/admin/auth/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["password_hashing"]["completed"] >= 2
+
+
+def test_rate_limits_are_keyed_by_user(client, auth_headers):
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "bob", "email": "bob@example.com", "password": "password123"},
+    )
+    login = client.post("/api/v1/auth/login", data={"username": "bob", "password": "password123"})
+    bob_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    for _ in range(20):
+        assert client.get("/api/v1/blocks/latest", headers=auth_headers).status_code != 429
+    assert client.get("/api/v1/blocks/latest", headers=auth_headers).status_code == 429
+    # Same client address, different user
+    assert client.get("/api/v1/blocks/latest", headers=bob_headers).status_code != 429
@@ -0,0 +1,239 @@
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from api import dependencies
+from api.database import chain_reads
+from api.dependencies import get_blockchain, initialize_blockchain
+from api.main import app
+from config.settings import settings
+from ravenchain import Blockchain, codec
+
+
+@pytest.fixture
+def paged_blockchain(database_path, api_blockchain):
+    """Blockchain with several blocks where only the tip is resident"""
+    for _ in range(3):
+        api_blockchain.mine_pending_transactions("miner")
+    engine = create_engine(f"sqlite:///{database_path}")
+    yield Blockchain(sessionmaker(bind=engine), difficulty=1, resident_blocks=1)
+    engine.dispose()
+
+
+def test_get_all_blocks(client, auth_headers, api_blockchain):
+    api_blockchain.mine_pending_transactions("miner")
+    response = client.get("/api/v1/blocks", headers=auth_headers)
+    assert response.status_code == 200
+    assert [block["index"] for block in response.json()] == [0, 1]
+
+
+def test_get_latest_block(client, auth_headers, api_blockchain):
+    response = client.get("/api/v1/blocks/latest", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["hash"] == api_blockchain.chain.tip.hash
+
+
+def test_get_block_by_hash(client, auth_headers, api_blockchain):
+    api_blockchain.mine_pending_transactions("miner")
+    block = api_blockchain.chain[1]
+    response = client.get(f"/api/v1/blocks/{block.hash}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == block.to_dict()
+
+
+def test_get_unknown_block(client, auth_headers):
+    response = client.get(f"/api/v1/blocks/{'f' * 64}", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_non_resident_blocks_load_asynchronously(client, auth_headers, paged_blockchain):
+    app.dependency_overrides[get_blockchain] = lambda: paged_blockchain
+    expected = [header.hash for header in paged_blockchain.chain.headers()]
+    response = client.get(f"/api/v1/blocks/{expected[1]}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["index"] == 1
+
+    response = client.get("/api/v1/blocks", headers=auth_headers)
+    assert [block["hash"] for block in response.json()] == expected
+    assert paged_blockchain.chain.stats()["misses"] >= 2
+
+
+def test_production_blockchain_reads_through_the_async_session(
+    client, auth_headers, database_path, api_blockchain, monkeypatch
+):
+    for _ in range(3):
+        api_blockchain.mine_pending_transactions("miner")
+    engine = create_engine(f"sqlite:///{database_path}")
+    monkeypatch.setattr(dependencies, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(dependencies, "blockchain", None)
+    monkeypatch.setattr(settings, "RESIDENT_BLOCKS", 1)
+    blockchain = initialize_blockchain()
+    app.dependency_overrides[get_blockchain] = lambda: blockchain
+
+    async_loads = []
+    load_blocks = chain_reads.load_blocks
+
+    async def counting_load_blocks(db, start, end):
+        async_loads.append((start, end))
+        return await load_blocks(db, start, end)
+
+    def no_sync_reads(*args, **kwargs):
+        raise AssertionError("block read through the synchronous store")
+
+    monkeypatch.setattr(chain_reads, "load_blocks", counting_load_blocks)
+    monkeypatch.setattr(blockchain.storage, "iter_blocks", no_sync_reads)
+    monkeypatch.setattr(blockchain.storage, "load_block", no_sync_reads)
+    try:
+        response = client.get("/api/v1/blocks", headers=auth_headers)
+        assert response.status_code == 200
+        assert [block["index"] for block in response.json()] == [0, 1, 2, 3]
+        assert async_loads
+    finally:
+        engine.dispose()
+
+
+def test_pruned_block_returns_gone(client, auth_headers, api_blockchain):
+    for _ in range(3):
+        api_blockchain.mine_pending_transactions("miner")
+    api_blockchain.prune_keep_blocks = 2
+    api_blockchain.prune()
+
+    response = client.get(
+        f"/api/v1/blocks/{api_blockchain.chain.header(1).hash}", headers=auth_headers
+    )
+    assert response.status_code == 410
+    assert response.json()["detail"]["status"] == "pruned"
+    assert response.json()["detail"]["pruned_height"] == 2
+
+    response = client.get("/api/v1/blocks", headers=auth_headers)
+    assert [block["index"] for block in response.json()] == [2, 3]
+
+
+def test_get_blocks_as_octet_stream(client, auth_headers, api_blockchain):
+    api_blockchain.mine_pending_transactions("miner")
+    headers = {**auth_headers, "Accept": "application/octet-stream"}
+
+    response = client.get("/api/v1/blocks", headers=headers)
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert [block.hash for block in codec.decode_blocks(response.content)] == [
+        header.hash for header in api_blockchain.chain.headers()
+    ]
+
+    tip = api_blockchain.chain.tip
+    response = client.get(f"/api/v1/blocks/{tip.hash}", headers=headers)
+    block, _ = codec.decode_block(response.content)
+    assert block.to_dict() == tip.to_dict()
+
+
+def test_get_blocks_pages_with_next_link(client, auth_headers, api_blockchain):
+    for _ in range(4):
+        api_blockchain.mine_pending_transactions("miner")
+
+    response = client.get("/api/v1/blocks?limit=2", headers=auth_headers)
+    assert [block["index"] for block in response.json()] == [0, 1]
+    assert "from_height=2" in response.headers["link"]
+
+    response = client.get("/api/v1/blocks?from_height=4&limit=2", headers=auth_headers)
+    assert [block["index"] for block in response.json()] == [4]
+    assert "link" not in response.headers
+
+    response = client.get("/api/v1/blocks?limit=100000", headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_stream_blocks_as_ndjson(client, auth_headers, paged_blockchain):
+    app.dependency_overrides[get_blockchain] = lambda: paged_blockchain
+    headers = {**auth_headers, "Accept": "application/x-ndjson"}
+    response = client.get("/api/v1/blocks?from_height=1", headers=headers)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["hash"] for line in lines] == [
+        header.hash for header in paged_blockchain.chain.headers()[1:]
+    ]
+
+    response = client.get("/api/v1/blocks?from_height=1&limit=1", headers=headers)
+    assert len(response.text.splitlines()) == 1
+
+
+def test_block_responses_are_cached_with_etags(client, auth_headers, api_blockchain):
+    api_blockchain.mine_pending_transactions("miner")
+    block = api_blockchain.chain[1]
+    url = f"/api/v1/blocks/{block.hash}"
+
+    first = client.get(url, headers=auth_headers)
+    assert "immutable" in first.headers["cache-control"]
+    etag = first.headers["etag"]
+    second = client.get(url, headers=auth_headers)
+    assert second.content == first.content
+    assert second.json() == block.to_dict()
+
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    binary = client.get(url, headers={**auth_headers, "Accept": "application/octet-stream"})
+    assert binary.headers["etag"] != etag
+
+    stats = client.get("/api/v1/chain/cache", headers=auth_headers).json()["responses"]
+    assert (stats["hits"], stats["misses"], stats["not_modified"]) == (1, 2, 1)
+
+
+def test_block_page_etag_changes_with_the_tip(client, auth_headers, api_blockchain):
+    first = client.get("/api/v1/blocks", headers=auth_headers)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    conditional = {**auth_headers, "If-None-Match": etag}
+    assert client.get("/api/v1/blocks", headers=conditional).status_code == 304
+    assert client.get("/api/v1/blocks/latest", headers=conditional).status_code == 200
+
+    api_blockchain.mine_pending_transactions("miner")
+    response = client.get("/api/v1/blocks", headers=conditional)
+    assert response.status_code == 200
+    assert [block["index"] for block in response.json()] == [0, 1]
+
+
+def test_get_block_by_height(client, auth_headers, paged_blockchain):
+    app.dependency_overrides[get_blockchain] = lambda: paged_blockchain
+    header = paged_blockchain.chain.header(1)
+    response = client.get("/api/v1/blocks/height/1", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["hash"] == header.hash
+    assert response.headers["cache-control"] == "no-cache"
+    assert client.get("/api/v1/blocks/height/99", headers=auth_headers).status_code == 404
+
+
+def test_get_block_window(client, auth_headers, api_blockchain):
+    for _ in range(5):
+        api_blockchain.mine_pending_transactions("miner")
+
+    response = client.get("/api/v1/blocks?start=2&end=5", headers=auth_headers)
+    assert [block["index"] for block in response.json()] == [2, 3, 4]
+    assert "link" not in response.headers
+
+    response = client.get("/api/v1/blocks?start=1&end=5&limit=2", headers=auth_headers)
+    assert [block["index"] for block in response.json()] == [1, 2]
+    assert "start=3" in response.headers["link"]
+    assert "end=5" in response.headers["link"]
+
+
+def test_get_block_headers(client, auth_headers, api_blockchain):
+    for _ in range(3):
+        api_blockchain.mine_pending_transactions("miner")
+    api_blockchain.prune_keep_blocks = 1
+    api_blockchain.prune()
+
+    response = client.get("/api/v1/blocks/headers?start=1&end=3", headers=auth_headers)
+    expected = [api_blockchain.chain.header(height) for height in (1, 2)]
+    assert response.json() == [
+        {
+            "index": header.index,
+            "timestamp": header.timestamp.isoformat(),
+            "previous_hash": header.previous_hash,
+            "nonce": header.nonce,
+            "hash": header.hash,
+        }
+        for header in expected
+    ]
+    conditional = {**auth_headers, "If-None-Match": response.headers["etag"]}
+    response = client.get("/api/v1/blocks/headers?start=1&end=3", headers=conditional)
+    assert response.status_code == 304
@@ -0,0 +1,44 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from api.dependencies import live_feed
+from ravenchain.transaction import Transaction
+
+
+@pytest.fixture
+def feed(api_blockchain):
+    api_blockchain.add_listener(live_feed)
+    yield live_feed
+    api_blockchain.remove_listener(live_feed)
+
+
+def token(headers):
+    return headers["Authorization"].split()[1]
+
+
+def test_block_feed_pushes_new_blocks(client, auth_headers, api_blockchain, feed):
+    url = f"/api/v1/ws/blocks?token={token(auth_headers)}"
+    with client.websocket_connect(url) as websocket:
+        response = client.post(
+            "/api/v1/mine", headers=auth_headers, json={"miner_address": "miner"}
+        )
+        assert response.status_code == 200
+        event = websocket.receive_json()
+    assert event["type"] == "block"
+    assert event["height"] == 1
+    assert event["hash"] == api_blockchain.get_latest_block().hash
+
+
+def test_mempool_feed_filters_by_address(client, auth_headers, api_blockchain, feed):
+    url = "/api/v1/ws/mempool?address=bob"
+    with client.websocket_connect(url, headers=auth_headers) as websocket:
+        api_blockchain.add_pending_transaction(Transaction("alice", "carol", 1.0))
+        api_blockchain.add_pending_transaction(Transaction("alice", "bob", 2.0))
+        event = websocket.receive_json()
+    assert (event["type"], event["recipient"], event["amount"]) == ("transaction", "bob", 2.0)
+
+
+def test_feeds_require_authentication(client):
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect("/api/v1/ws/blocks?token=invalid") as websocket:
+            websocket.receive_text()
+    assert error.value.code == 1008
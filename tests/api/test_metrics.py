@@ -0,0 +1,27 @@
+from ravenchain.transaction import Transaction
+
+
+def test_metrics_report_routes_mempool_and_caches(client, auth_headers, api_blockchain):
+    api_blockchain.add_pending_transaction(Transaction("alice", "bob", 1.5))
+    client.get("/api/v1/blocks/latest", headers=auth_headers)
+    client.get("/api/v1/blocks/latest", headers=auth_headers)
+    client.get("/api/v1/blocks/height/0", headers=auth_headers)
+    client.get("/api/v1/no-such-route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'ravenchain_http_requests_total{method="GET",route="/api/v1/blocks/latest",status="200"}'
+        in body
+    )
+    assert 'route="/api/v1/blocks/height/{height}",status="200"' in body
+    assert 'route="unmatched",status="404"' in body
+    assert "ravenchain_mempool_transactions 1.0" in body
+    assert 'ravenchain_cache_hits{cache="tokens"} 2.0' in body
+
+
+def test_metrics_are_not_rate_limited(client):
+    for _ in range(15):
+        assert client.get("/metrics").status_code == 200
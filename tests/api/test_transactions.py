@@ -0,0 +1,93 @@
+from config.settings import settings
+from ravenchain import tracing
+from ravenchain.transaction import Transaction
+from ravenchain.wallet import Wallet
+
+
+def test_mine_and_list_pending_transactions(client, auth_headers, api_blockchain):
+    api_blockchain.add_pending_transaction(Transaction("alice", "bob", 1.5))
+    response = client.get("/api/v1/transactions", headers=auth_headers)
+    assert [tx["amount"] for tx in response.json()] == [1.5]
+
+    response = client.post("/api/v1/mine", headers=auth_headers, json={"miner_address": "miner"})
+    assert response.status_code == 200
+    assert response.json()["height"] == 1
+    assert len(api_blockchain.chain[1].data) == 2
+    assert client.get("/api/v1/transactions", headers=auth_headers).json() == []
+
+
+def signed(wallet, recipient, amount):
+    tx = Transaction(wallet.address, recipient, amount)
+    return {
+        "sender_address": wallet.address,
+        "recipient_address": recipient,
+        "amount": amount,
+        "signature": wallet.sign_transaction(tx).hex(),
+        "public_key": wallet.public_key,
+    }
+
+
+def test_batch_admits_valid_transactions_and_reports_the_rest(client, auth_headers, api_blockchain):
+    alice, mallory = Wallet().create_wallet(), Wallet().create_wallet()
+    forged = {**signed(mallory, "bob", 2.0), "sender_address": alice.address}
+    batch = [signed(alice, "bob", 1.0), forged, {**signed(alice, "bob", 3.0), "amount": -3.0}]
+    response = client.post(
+        "/api/v1/transactions/batch", headers=auth_headers, json={"transactions": batch}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["admitted"], body["rejected"], body["block_index"]) == (1, 2, 1)
+    assert [result["status"] for result in body["results"]] == ["admitted", "rejected", "rejected"]
+    assert body["results"][1]["reason"] == f"public key does not belong to sender {alice.address}"
+    assert body["results"][2]["reason"] == "Transaction amount must be positive"
+    assert [tx.amount for tx in api_blockchain.pending_transactions] == [1.0]
+
+
+def test_atomic_batch_is_admitted_whole_or_not_at_all(client, auth_headers, api_blockchain):
+    alice = Wallet().create_wallet()
+    batch = [signed(alice, "bob", 1.0), {**signed(alice, "bob", 2.0), "signature": "zz"}]
+    response = client.post(
+        "/api/v1/transactions/batch",
+        headers=auth_headers,
+        json={"transactions": batch, "atomic": True},
+    )
+    assert response.status_code == 422
+    assert [result["status"] for result in response.json()["results"]] == ["skipped", "rejected"]
+    assert api_blockchain.pending_transactions == []
+
+    response = client.post(
+        "/api/v1/transactions/batch",
+        headers=auth_headers,
+        json={"transactions": batch[:1], "atomic": True},
+    )
+    assert response.json()["admitted"] == 1
+    assert len(api_blockchain.pending_transactions) == 1
+
+
+def test_batch_size_is_limited(client, auth_headers):
+    item = signed(Wallet().create_wallet(), "bob", 1.0)
+    for transactions in ([], [item] * (settings.TRANSACTION_BATCH_MAX + 1)):
+        response = client.post(
+            "/api/v1/transactions/batch", headers=auth_headers, json={"transactions": transactions}
+        )
+        assert response.status_code == 422
+
+
+def test_batch_requests_are_traced(client, auth_headers):
+    traces = []
+    tracing.configure(type("Collector", (), {"export": lambda self, trace: traces.append(trace)})())
+    try:
+        client.post(
+            "/api/v1/transactions/batch",
+            headers=auth_headers,
+            json={"transactions": [signed(Wallet().create_wallet(), "bob", 1.0)]},
+        )
+    finally:
+        tracing.disable()
+    tree = tracing.span_tree(traces[-1])
+    assert tree["name"] == "POST /api/v1/transactions/batch"
+    assert tree["attributes"]["status"] == 200
+    (verify,) = tree["children"]
+    assert verify["name"] == "verify_signatures"
+    assert verify["children"][0]["name"] == "verify_transactions"
+    assert verify["children"][0]["children"][0]["name"] == "verify_signature"
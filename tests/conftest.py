@@ -1,8 +1,14 @@
+import os
+import tempfile
+
+# Keep the shared rate-limit table of test runs out of the data directory
+os.environ.setdefault("RAVENCHAIN_RATE_LIMIT_STORAGE", f"shm://{tempfile.mkdtemp()}/ratelimits.bin")
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from api.database.models import Base
 from ravenchain import Blockchain, Wallet, Block, Transaction
+from ravenchain.storage import MemoryBlockStore
 from datetime import datetime
 
 
@@ -21,14 +27,11 @@ def test_sessionmaker(test_engine):
     return sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
 
-# Function-scoped fixture for the blockchain with a clean database
+# Function-scoped fixture for the blockchain with in-memory block storage
 @pytest.fixture
-def blockchain(test_sessionmaker, test_engine):
-    """Create a fresh blockchain instance for testing with a clean database"""
-    # Drop and recreate tables to ensure a clean state for each test
-    Base.metadata.drop_all(test_engine)
-    Base.metadata.create_all(test_engine)
-    return Blockchain(test_sessionmaker, difficulty=2)  # Pass sessionmaker to Blockchain
+def blockchain():
+    """Create a fresh blockchain instance for testing without a database"""
+    return Blockchain(difficulty=2, storage=MemoryBlockStore())
 
 
 # Fixture for a single test wallet
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ravenchain import analytics
+from ravenchain.analytics import TransactionColumns
+from ravenchain.blockchain import Blockchain
+
+
+def mine(blockchain, transfers):
+    for sender, recipient, amount in transfers:
+        blockchain.add_transaction(sender, recipient, amount)
+    blockchain.mine_pending_transactions("miner")
+
+
+@pytest.fixture
+def blockchain():
+    blockchain = Blockchain(difficulty=1)
+    mine(blockchain, [("alice", "bob", 1.5), ("bob", "carol", 0.25)])
+    return blockchain
+
+
+def test_columns_follow_the_chain(blockchain):
+    columns = TransactionColumns()
+    blockchain.add_listener(columns)
+    assert columns.height == 1 and len(columns) == 3
+
+    mine(blockchain, [("alice", "carol", 2)])
+    data = columns.columns()
+    assert data["height"].tolist() == [1, 1, 1, 2, 2]
+    assert data["amount"][-1] == 2 * analytics.AMOUNT_SCALE
+    assert columns.address(int(data["sender"][-1])) == "alice"
+
+    blockchain.rollback_to(1)
+    assert len(columns) == 3 and columns.height == 1
+
+
+def test_aggregates(blockchain):
+    columns = TransactionColumns()
+    blockchain.add_listener(columns)
+    mine(blockchain, [("alice", "carol", 2), ("carol", "bob", 0.5)])
+
+    assert analytics.volume_per_block(columns) == [(1, 1.75), (2, 2.5)]
+    assert analytics.volume_per_block(columns, start=2, include_rewards=True) == [(2, 12.5)]
+
+    since = datetime.now(timezone.utc) - timedelta(hours=24)
+    top = analytics.top_senders(columns, since, limit=2)
+    assert [(row["address"], row["amount"], row["transactions"]) for row in top] == [
+        ("alice", 3.5, 2),
+        ("carol", 0.5, 1),
+    ]
+
+    hours = analytics.transactions_per_hour(columns, since)
+    assert len(hours) == 25
+    assert sum(count for _, count in hours) == 6
+    assert analytics.top_senders(columns, datetime.now(timezone.utc) + timedelta(hours=1)) == []
+
+
+def test_persisted_columns_reopen(tmp_path, blockchain):
+    columns = TransactionColumns(tmp_path / "analytics")
+    blockchain.add_listener(columns)
+    for i in range(400):
+        mine(blockchain, [("alice", f"user{i}", 1), ("bob", "alice", 0.5)])
+
+    blockchain.remove_listener(columns)
+    columns.close()
+    reopened = TransactionColumns(tmp_path / "analytics")
+    assert reopened.height == columns.height == 401
+    assert isinstance(reopened.columns()["amount"].base, np.memmap)
+    assert np.array_equal(reopened.columns()["sender"], columns.columns()["sender"])
+    assert reopened.address(len(reopened._addresses) - 1) == "user399"
+
+    mine(blockchain, [("carol", "dave", 3)])
+    blockchain.add_listener(reopened)
+    assert reopened.height == 402
+    reopened.close()
+
+
+def test_read_only_columns_follow_the_writer(tmp_path, blockchain):
+    writer = TransactionColumns(tmp_path / "analytics")
+    reader = TransactionColumns(tmp_path / "analytics", read_only=True)
+    blockchain.add_listener(writer)
+    # Readers pick up the writer's changes when they query the columns
+    assert len(reader.columns()["amount"]) == 3 and reader.height == 1
+
+    for i in range(600):
+        mine(blockchain, [("alice", f"user{i}", 1)])
+    writer.flush()
+    data = reader.columns()
+    assert len(data["amount"]) == len(writer.columns()["amount"]) and reader.height == 601
+    assert reader.address(int(data["recipient"][-1])) == "user599"
+
+    blockchain.rollback_to(3)
+    writer.flush()
+    assert reader.columns()["height"][-1] == 3
+    with pytest.raises(RuntimeError):
+        reader.append_block(blockchain.chain[3])
+    writer.close()
@@ -0,0 +1,164 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from api.auth.cache import CachedUser, LastSeenWriter, TTLCache, UserInvalidations
+from api.database.models import Base, User
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("api.auth.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10)
+    cache.set("token", "alice")
+    cache.set("short", "bob", ttl=2)
+    assert cache.get("token") == "alice"
+    now[0] += 5
+    assert cache.get("short") is None
+    assert cache.get("token") == "alice"
+    now[0] += 5
+    assert cache.get("token") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_ttl_cache_clamps_ttl_and_skips_expired_values(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("api.auth.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10)
+    cache.set("expired", "alice", ttl=-1)
+    assert len(cache) == 0
+    cache.set("long", "bob", ttl=3600)
+    now[0] += 11
+    assert cache.get("long") is None
+
+
+def test_ttl_cache_evicts_oldest_when_full():
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+
+
+def test_cached_user_copies_row():
+    created = datetime(2024, 1, 1)
+    user = User(
+        id=1,
+        username="alice",
+        email="alice@example.com",
+        hashed_password="hash",
+        is_active=True,
+        is_admin=False,
+        created_at=created,
+    )
+    cached = CachedUser.from_user(user)
+    assert cached.username == "alice"
+    assert cached.created_at == created
+    assert cached.last_login is None
+    assert not hasattr(cached, "hashed_password")
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+
+    async def create():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(
+                User.__table__.insert(),
+                [
+                    {"id": i, "username": f"user{i}", "email": f"user{i}@x", "hashed_password": "h"}
+                    for i in (1, 2, 3)
+                ],
+            )
+
+    asyncio.run(create())
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+def last_logins(session_factory):
+    async def read():
+        async with session_factory() as session:
+            rows = await session.execute(User.__table__.select())
+            return {row.id: row.last_login for row in rows}
+
+    return asyncio.run(read())
+
+
+def test_last_seen_writer_coalesces_and_flushes(session_factory):
+    writer = LastSeenWriter()
+    first = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    latest = datetime(2024, 1, 1, 12, 5, tzinfo=timezone.utc)
+    writer.touch(1, first)
+    writer.touch(1, latest)
+    writer.touch(3, first)
+    assert len(writer) == 2
+
+    async def flush():
+        async with session_factory() as session:
+            return await writer.flush(session)
+
+    assert asyncio.run(flush()) == 2
+    assert len(writer) == 0
+    stored = last_logins(session_factory)
+    assert stored[1] == latest.replace(tzinfo=None)
+    assert stored[2] is None
+    assert stored[3] == first.replace(tzinfo=None)
+    assert asyncio.run(flush()) == 0
+
+
+def test_last_seen_writer_keeps_times_when_flush_fails():
+    writer = LastSeenWriter()
+    seen = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    writer.touch(1, seen)
+
+    class FailingSession:
+        rolled_back = False
+
+        async def execute(self, *args):
+            # A newer time arrives while the write is in flight
+            writer.touch(1, seen.replace(hour=1))
+            raise RuntimeError("database unavailable")
+
+        async def rollback(self):
+            self.rolled_back = True
+
+    session = FailingSession()
+    with pytest.raises(RuntimeError):
+        asyncio.run(writer.flush(session))
+    assert session.rolled_back
+    assert writer._pending == {1: seen.replace(hour=1)}
+
+
+def test_user_invalidations_reach_other_workers(tmp_path):
+    from api.chain_service import SocketTipNotifier, SocketTipSubscription
+
+    async def run():
+        caches = [TTLCache(ttl=60), TTLCache(ttl=60)]
+        workers = [UserInvalidations(cache) for cache in caches]
+        subscriptions = [SocketTipSubscription(tmp_path, worker.handle) for worker in workers]
+        for worker, subscription in zip(workers, subscriptions):
+            await subscription.start()
+            worker.notifier = SocketTipNotifier(tmp_path)
+            worker.cache.set("alice", "snapshot")
+            worker.cache.set("bob", "snapshot")
+
+        await workers[0].invalidate("alice")
+        for _ in range(100):
+            if caches[1].get("alice") is None:
+                break
+            await asyncio.sleep(0.01)
+        assert [cache.get("alice") for cache in caches] == [None, None]
+        assert caches[1].get("bob") == "snapshot"
+        assert not workers[1].handle({"height": 3, "hash": "ab"})
+
+        for worker, subscription in zip(workers, subscriptions):
+            worker.close()
+            await subscription.close()
+
+    asyncio.run(run())
@@ -0,0 +1,118 @@
+import json
+import pytest
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage import FlatFileBlockStore, MemoryBlockStore
+from ravenchain.storage.sql import SQLBlockStore
+from scripts.backup import BackupError, backup_blocks, restore_blocks, verify_backup
+
+
+@pytest.fixture
+def blockchain(tmp_path):
+    store = FlatFileBlockStore(tmp_path / "chain", fsync=False)
+    blockchain = Blockchain(difficulty=1, storage=store)
+    yield blockchain
+    store.close()
+
+
+def mine(blockchain, count):
+    for _ in range(count):
+        blockchain.add_transaction("alice", "bob", 1.0)
+        blockchain.mine_pending_transactions("miner")
+
+
+def test_incremental_backup_and_restore(tmp_path, blockchain):
+    backup_dir = tmp_path / "backups"
+    mine(blockchain, 3)
+    first = backup_blocks(blockchain.storage, backup_dir)
+    assert (first["start_height"], first["end_height"]) == (0, 3)
+    assert backup_blocks(blockchain.storage, backup_dir) is None
+
+    mine(blockchain, 2)
+    second = backup_blocks(blockchain.storage, backup_dir)
+    assert (second["start_height"], second["end_height"], second["blocks"]) == (4, 5, 2)
+    assert second["previous_sha256"] == first["sha256"]
+
+    restored_store = MemoryBlockStore()
+    assert restore_blocks(restored_store, backup_dir, group_commit_size=2) == 6
+    restored = Blockchain(difficulty=1, storage=restored_store)
+    assert [h.hash for h in restored.chain.headers()] == [
+        h.hash for h in blockchain.chain.headers()
+    ]
+    assert restored.get_balance("bob") == 5.0
+    assert restore_blocks(restored_store, backup_dir) == 0
+
+
+def test_corrupt_segment_is_rejected(tmp_path, blockchain):
+    backup_dir = tmp_path / "backups"
+    mine(blockchain, 2)
+    entry = backup_blocks(blockchain.storage, backup_dir)
+    segment = backup_dir / entry["file"]
+    data = bytearray(segment.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    segment.write_bytes(bytes(data))
+    with pytest.raises(BackupError):
+        restore_blocks(MemoryBlockStore(), backup_dir)
+
+
+def test_broken_manifest_link_is_rejected(tmp_path, blockchain):
+    backup_dir = tmp_path / "backups"
+    mine(blockchain, 1)
+    backup_blocks(blockchain.storage, backup_dir)
+    mine(blockchain, 1)
+    backup_blocks(blockchain.storage, backup_dir)
+    manifest = json.loads((backup_dir / "manifest.json").read_text())
+    manifest["segments"][1]["previous_sha256"] = "0" * 64
+    (backup_dir / "manifest.json").write_text(json.dumps(manifest))
+    with pytest.raises(BackupError):
+        verify_backup(backup_dir)
+
+
+def test_backup_after_rollback_requires_new_directory(tmp_path, blockchain):
+    backup_dir = tmp_path / "backups"
+    mine(blockchain, 3)
+    backup_blocks(blockchain.storage, backup_dir)
+    blockchain.rollback_to(1)
+    mine(blockchain, 3)
+    with pytest.raises(BackupError):
+        backup_blocks(blockchain.storage, backup_dir)
+
+
+def test_backup_refuses_pruned_blocks(tmp_path):
+    url = f"sqlite:///{tmp_path / 'chain.db'}"
+    blockchain = Blockchain(difficulty=1, storage=SQLBlockStore.from_url(url), prune_keep_blocks=2)
+    mine(blockchain, 5)
+    blockchain.prune()
+    with pytest.raises(BackupError):
+        backup_blocks(SQLBlockStore.from_url(url), tmp_path / "backups")
+
+
+class HeaderCountingStore(SQLBlockStore):
+    def __init__(self, sessionmaker):
+        super().__init__(sessionmaker)
+        self.headers_read = 0
+
+    def load_headers(self, start=0, end=None):
+        headers = super().load_headers(start, end)
+        self.headers_read += len(headers)
+        return headers
+
+
+def test_incremental_runs_read_only_the_boundary_headers(tmp_path, blockchain):
+    backup_dir = tmp_path / "backups"
+    mine(blockchain, 5)
+    backup_blocks(blockchain.storage, backup_dir)
+    url = f"sqlite:///{tmp_path / 'restored.db'}"
+    store = HeaderCountingStore(SQLBlockStore.from_url(url).sessionmaker)
+    assert restore_blocks(store, backup_dir) == 6
+
+    mine(blockchain, 2)
+    backup_blocks(blockchain.storage, backup_dir)
+    store.headers_read = 0
+    assert restore_blocks(store, backup_dir) == 2
+    assert store.headers_read == 1
+    assert backup_blocks(store, tmp_path / "copy") is not None
+    store.headers_read = 0
+    assert backup_blocks(store, tmp_path / "copy") is None
+    # The stored tip and the last backed-up block, never the whole chain
+    assert store.headers_read == 1
+    assert len(store) == 8
@@ -1,9 +1,11 @@
 import pytest
+import threading
 from datetime import datetime, timezone
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from api.database.models import Base
-from ravenchain.blockchain import Blockchain
+from ravenchain.blockchain import Blockchain, ChainListener
+from ravenchain.storage import MemoryBlockStore
 from ravenchain.transaction import Transaction
 from ravenchain.wallet import Wallet
 from ravenchain.block import Block
@@ -123,3 +125,180 @@ def test_mining_reward(blockchain, wallet):
     assert blockchain.get_balance(wallet.address) == blockchain.mining_reward
     blockchain.mine_pending_transactions(wallet.address)
     assert blockchain.get_balance(wallet.address) == blockchain.mining_reward * 2
+
+
+def test_load_chain_from_db_restores_stored_blocks(blockchain, db_session, wallet, monkeypatch):
+    recipient = Wallet()
+    recipient.create_wallet()
+    blockchain.add_transaction(wallet.address, recipient.address, 5.0, wallet)
+    blockchain.mine_pending_transactions(wallet.address)
+    blockchain.mine_pending_transactions(wallet.address)
+
+    def fail_hash(self):
+        raise AssertionError("stored blocks must not be rehashed")
+
+    monkeypatch.setattr(Block, "calculate_hash", fail_hash)
+    with db_session() as session:
+        loaded = blockchain.load_chain_from_db(session, batch_size=2)
+
+    assert [block.hash for block in loaded] == [block.hash for block in blockchain.chain]
+    assert [len(block.data) for block in loaded] == [0, 2, 1]
+    stored_tx, original_tx = loaded[1].data[1], blockchain.chain[1].data[1]
+    assert stored_tx.sender == original_tx.sender
+    assert stored_tx.signature == original_tx.signature
+    assert stored_tx.timestamp.replace(tzinfo=None) == original_tx.timestamp.replace(tzinfo=None)
+
+
+def mine_detached_blocks(blockchain, count, miner_address):
+    blocks = []
+    previous = blockchain.get_latest_block()
+    for _ in range(count):
+        block = Block(
+            previous.index + 1,
+            data=[Transaction(None, miner_address, blockchain.mining_reward)],
+            previous_hash=previous.hash,
+        )
+        block.mine_block(blockchain.difficulty)
+        blocks.append(block)
+        previous = block
+    return blocks
+
+
+def test_import_blocks_group_commit(blockchain, db_session, wallet):
+    blocks = mine_detached_blocks(blockchain, 5, wallet.address)
+    assert blockchain.import_blocks(blocks, group_commit_size=2) == 5
+    assert len(blockchain.chain) == 6
+    with db_session() as session:
+        loaded = blockchain.load_chain_from_db(session)
+    assert [block.hash for block in loaded] == [block.hash for block in blockchain.chain]
+    assert blockchain.get_balance(wallet.address) == 5 * blockchain.mining_reward
+
+
+def test_import_blocks_rejects_unlinked_blocks(blockchain, wallet):
+    blocks = mine_detached_blocks(blockchain, 2, wallet.address)
+    with pytest.raises(ValueError):
+        blockchain.import_blocks(blocks[1:])
+    assert len(blockchain.chain) == 1
+
+
+def test_failed_group_commit_leaves_no_partial_block(blockchain, db_session, wallet):
+    good, duplicate = mine_detached_blocks(blockchain, 2, wallet.address)
+    duplicate.index = 0  # collides with the genesis block
+    with db_session() as session:
+        with pytest.raises(Exception):
+            blockchain.save_blocks_to_db(session, [good, duplicate], group_commit_size=2)
+    with db_session() as session:
+        loaded = blockchain.load_chain_from_db(session)
+    assert len(loaded) == 1
+
+
+def test_get_block_by_hash(mined_blockchain):
+    block = mined_blockchain.chain[2]
+    assert mined_blockchain.get_block_by_hash(block.hash) is block
+    assert mined_blockchain.get_block_by_hash("0" * 64) is None
+
+
+def test_rollback_to(mined_blockchain, db_session):
+    removed = mined_blockchain.rollback_to(1)
+    assert [block.index for block in removed] == [3, 2]
+    assert len(mined_blockchain.chain) == 2
+    assert mined_blockchain.get_block_by_hash(removed[0].hash) is None
+    with db_session() as session:
+        assert len(mined_blockchain.load_chain_from_db(session)) == 2
+    mined_blockchain.mine_pending_transactions("miner")
+    assert mined_blockchain.get_latest_block().index == 2
+
+
+def test_read_only_blockchain_refreshes_new_blocks(wallet):
+    storage = MemoryBlockStore()
+    writer = Blockchain(storage=storage, difficulty=1)
+    reader = Blockchain(storage=storage, difficulty=1, read_only=True)
+    connected = []
+
+    class Recorder(ChainListener):
+        def block_connected(self, block):
+            connected.append(block.index)
+
+    reader.add_listener(Recorder())
+    for _ in range(2):
+        writer.mine_pending_transactions(wallet.address)
+    assert len(reader.chain) == 1
+    assert reader.refresh() == 2
+    assert reader.get_latest_block().hash == writer.get_latest_block().hash
+    assert connected == [1, 2]
+    assert reader.get_balance(wallet.address) == 20.0
+    assert reader.refresh() == 0
+
+
+def test_refresh_follows_a_rollback(wallet):
+    storage = MemoryBlockStore()
+    writer = Blockchain(storage=storage, difficulty=1)
+    reader = Blockchain(storage=storage, difficulty=1, read_only=True)
+    for _ in range(3):
+        writer.mine_pending_transactions(wallet.address)
+    reader.refresh()
+    rolled_back = []
+
+    class Recorder(ChainListener):
+        def chain_rolled_back(self, height, removed):
+            rolled_back.append((height, [block.index for block in removed]))
+
+    reader.add_listener(Recorder())
+    writer.rollback_to(1)
+    writer.mine_pending_transactions(wallet.address)
+    assert reader.refresh() == 1
+    assert rolled_back == [(1, [3, 2])]
+    assert reader.chain.headers() == writer.chain.headers()
+    assert reader.get_balance(wallet.address) == 20.0
+
+
+def test_refresh_reads_storage_without_the_chain_lock(wallet):
+    storage = MemoryBlockStore()
+    writer = Blockchain(storage=storage, difficulty=1)
+    reader = Blockchain(storage=storage, difficulty=1, read_only=True)
+    # Build the balance state first, so the checks below only wait for the chain lock
+    reader.get_balance(wallet.address)
+    writer.mine_pending_transactions(wallet.address)
+    reads = []
+
+    class CheckingStore(MemoryBlockStore):
+        def _check_unlocked(self, name):
+            # A request on another thread must not wait for this read
+            balance = threading.Thread(target=reader.get_balance, args=(wallet.address,))
+            balance.start()
+            balance.join(timeout=5)
+            assert not balance.is_alive()
+            reads.append(name)
+
+        def load_headers(self, start=0, end=None):
+            self._check_unlocked("load_headers")
+            return storage.load_headers(start, end)
+
+        def iter_blocks(self, start=0, end=None):
+            self._check_unlocked("iter_blocks")
+            return storage.iter_blocks(start, end)
+
+        def load_block(self, height):
+            raise AssertionError("refresh compares headers, not full blocks")
+
+    reader.storage = CheckingStore()
+    assert reader.refresh() == 1
+    assert reads == ["load_headers", "iter_blocks"]
+
+
+def test_read_only_blockchain_rejects_writes(wallet):
+    storage = MemoryBlockStore()
+    Blockchain(storage=storage, difficulty=1)
+    reader = Blockchain(storage=storage, difficulty=1, read_only=True)
+    with pytest.raises(RuntimeError):
+        reader.mine_pending_transactions(wallet.address)
+    with pytest.raises(RuntimeError):
+        reader.add_transaction(wallet.address, "recipient", 1.0)
+
+
+def test_read_only_blockchain_waits_for_genesis(wallet):
+    storage = MemoryBlockStore()
+    reader = Blockchain(storage=storage, difficulty=1, read_only=True)
+    assert len(reader.chain) == 0
+    Blockchain(storage=storage, difficulty=1)
+    assert reader.refresh() == 1
@@ -0,0 +1,156 @@
+import threading
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from api.database.models import Base
+from ravenchain.block import Block
+from ravenchain.blockchain import Blockchain
+from ravenchain.chain import BlockHeader, Chain, estimate_block_size
+from ravenchain.transaction import Transaction
+
+
+def make_blocks(count):
+    blocks = []
+    previous_hash = "0"
+    for i in range(count):
+        block = Block(i, data=[Transaction(None, f"miner{i}", 10.0)], previous_hash=previous_hash)
+        previous_hash = block.hash
+        blocks.append(block)
+    return blocks
+
+
+def headers_of(blocks):
+    return [BlockHeader.from_block(block) for block in blocks]
+
+
+@pytest.fixture
+def blocks():
+    return make_blocks(10)
+
+
+@pytest.fixture
+def paged_chain(blocks):
+    store = {block.index: block for block in blocks}
+    chain = Chain(loader=store.__getitem__, resident_blocks=3, cache_bytes=10**6)
+    for block in blocks:
+        chain.append(block)
+    return chain
+
+
+def test_len_tip_and_iteration(paged_chain, blocks):
+    assert len(paged_chain) == 10
+    assert paged_chain.tip is blocks[-1]
+    assert paged_chain[-1] is blocks[-1]
+    assert [block.hash for block in paged_chain] == [block.hash for block in blocks]
+    assert [block.index for block in paged_chain[2:5]] == [2, 3, 4]
+
+
+def test_index_out_of_range(paged_chain):
+    with pytest.raises(IndexError):
+        paged_chain[10]
+    with pytest.raises(IndexError):
+        paged_chain[-11]
+
+
+def test_append_rejects_gap(paged_chain):
+    with pytest.raises(ValueError):
+        paged_chain.append(Block(12))
+
+
+def test_evicted_blocks_are_loaded_on_demand(blocks):
+    loads = []
+
+    def loader(height):
+        loads.append(height)
+        return blocks[height]
+
+    chain = Chain(loader=loader, resident_blocks=2, cache_bytes=0)
+    chain.reset(headers_of(blocks), blocks[-2:])
+    assert chain[0] is blocks[0]
+    assert chain[0] is blocks[0]
+    assert loads == [0, 0]
+    assert chain.stats()["misses"] == 2
+    assert chain.stats()["resident_blocks"] == 2
+
+
+def test_cache_hits_and_byte_budget(blocks):
+    budget = estimate_block_size(blocks[1]) + estimate_block_size(blocks[2])
+    chain = Chain(loader=blocks.__getitem__, resident_blocks=1, cache_bytes=budget)
+    chain.reset(headers_of(blocks), blocks[-1:])
+    chain[0]
+    chain[0]
+    chain[1]
+    chain[2]
+    stats = chain.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["cached_blocks"] == 2
+    assert stats["cached_bytes"] <= budget
+    assert stats["hit_rate"] == pytest.approx(0.25)
+
+
+def test_pop_keeps_tip_resident(blocks):
+    chain = Chain(loader=blocks.__getitem__, resident_blocks=1)
+    for block in blocks:
+        chain.append(block)
+    assert chain.pop() is blocks[-1]
+    assert len(chain) == 9
+    assert chain.tip is blocks[-2]
+
+
+def test_without_loader_everything_stays_resident(blocks):
+    chain = Chain(resident_blocks=1)
+    for block in blocks:
+        chain.append(block)
+    assert chain.stats()["resident_blocks"] == 10
+
+
+def test_blockchain_pages_old_blocks_from_db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    blockchain = Blockchain(Session, difficulty=1, resident_blocks=2)
+    for _ in range(4):
+        blockchain.mine_pending_transactions("miner")
+
+    reloaded = Blockchain(Session, difficulty=1, resident_blocks=2)
+    assert len(reloaded.chain) == 5
+    assert reloaded.get_latest_block().hash == blockchain.chain.tip.hash
+    assert reloaded.chain[0].hash == blockchain.chain[0].hash
+    assert reloaded.chain.stats()["misses"] == 1
+    assert reloaded.get_balance("miner") == 40.0
+
+
+def test_hash_index_tracks_append_and_pop(paged_chain, blocks):
+    assert paged_chain.height_of(blocks[4].hash) == 4
+    assert paged_chain.get_by_hash(blocks[0].hash) is blocks[0]
+    assert paged_chain.get_by_hash("missing") is None
+    paged_chain.pop()
+    assert paged_chain.height_of(blocks[-1].hash) is None
+    assert paged_chain.height_of(blocks[-2].hash) == 8
+
+
+def test_loads_run_without_the_chain_lock(blocks):
+    def loader(height):
+        # Another thread can take the lock while a block is being read
+        appender = threading.Thread(target=chain.append, args=(extra,))
+        appender.start()
+        appender.join(timeout=5)
+        assert not appender.is_alive()
+        return blocks[height]
+
+    extra = make_blocks(11)[-1]
+    chain = Chain(loader=loader, resident_blocks=1)
+    chain.reset(headers_of(blocks), blocks[-1:])
+    assert chain[0] is blocks[0]
+    assert len(chain) == 11
+    # Block 0 from the load and block 9, demoted by the append
+    assert chain.stats()["cached_blocks"] == 2
+
+
+def test_store_ignores_blocks_rolled_back_while_loading(blocks):
+    chain = Chain(loader=blocks.__getitem__, resident_blocks=1)
+    chain.reset(headers_of(blocks), blocks[-1:])
+    # A different block at height 2, as a concurrent rollback and re-mine would leave
+    chain.store(Block(2, previous_hash="other"))
+    assert chain.stats()["cached_blocks"] == 0
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import pytest
+from api.chain_service import (
+    ChainFollower,
+    ChainService,
+    ChainServiceClient,
+    ChainServiceError,
+    ChainServiceUnavailable,
+    SocketTipNotifier,
+    SocketTipSubscription,
+    TipPublisher,
+)
+from ravenchain.blockchain import Blockchain, ChainListener
+from ravenchain.storage import MemoryBlockStore
+from ravenchain.transaction import Transaction
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.published = []
+        self.closed = False
+
+    def send(self, messages):
+        self.published.extend(json.loads(message) for message in messages)
+
+    def close(self):
+        self.closed = True
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_tip_publisher_announces_appends_and_rollbacks():
+    notifier = RecordingNotifier()
+    blockchain = Blockchain(storage=MemoryBlockStore(), difficulty=1)
+    publisher = TipPublisher(notifier)
+    blockchain.add_listener(publisher)
+    block = blockchain.mine_pending_transactions("miner")
+    publisher.close()
+    assert notifier.published[-1] == {"height": 1, "hash": block.hash}
+    assert notifier.closed
+
+    notifier = RecordingNotifier()
+    publisher = TipPublisher(notifier)
+    blockchain.add_listener(publisher)
+    blockchain.rollback_to(0)
+    publisher.close()
+    assert notifier.published == [{"height": 0, "hash": None}]
+
+
+def test_readers_follow_the_writer_and_forward_changes(tmp_path):
+    storage = MemoryBlockStore()
+    writer = Blockchain(storage=storage, difficulty=1)
+    reader = Blockchain(storage=storage, difficulty=1, read_only=True)
+    tips = tmp_path / "tips"
+    publisher = TipPublisher(SocketTipNotifier(tips))
+    writer.add_listener(publisher)
+    admitted = []
+
+    class Recorder(ChainListener):
+        def transaction_added(self, tx):
+            admitted.append(tx)
+
+    reader.add_listener(Recorder())
+
+    async def run():
+        service = ChainService(writer, tmp_path / "chain.sock")
+        await service.start()
+        follower = ChainFollower(reader, interval=60)
+        subscription = SocketTipSubscription(tips, follower.notify)
+        await subscription.start()
+        following = asyncio.create_task(follower.run())
+        client = ChainServiceClient(str(tmp_path / "chain.sock"), reader)
+        try:
+            tx = Transaction("alice", "bob", 2.5)
+            assert await client.add_transaction(tx) == 1
+            # The admission is announced to the readers' listeners
+            await wait_for(lambda: admitted)
+            assert (admitted[0].sender, admitted[0].timestamp) == ("alice", tx.timestamp)
+            pending = await client.pending()
+            assert [(p.sender, p.amount, p.timestamp) for p in pending] == [
+                ("alice", 2.5, tx.timestamp)
+            ]
+
+            # Mining through the service is visible to the forwarding reader at once
+            assert await client.mine("miner") == 1
+            assert len(reader.chain) == 2
+            assert await client.pending() == []
+
+            batch = [Transaction("alice", "carol", 1.0), Transaction("bob", "carol", 2.0)]
+            assert await client.add_transactions(batch) == 2
+            assert [p.sender for p in await client.pending()] == ["alice", "bob"]
+
+            # Blocks appended by the writer reach the reader through the announcement
+            block = await asyncio.to_thread(writer.mine_pending_transactions, "miner")
+            await wait_for(lambda: len(reader.chain) == 3)
+            assert reader.get_latest_block().hash == block.hash
+
+            with pytest.raises(ChainServiceError):
+                await client._call("rollback", height=0)
+        finally:
+            following.cancel()
+            await subscription.close()
+            await service.close()
+
+    asyncio.run(run())
+    publisher.close()
+    assert not list(tips.glob("*.sock"))
+
+
+def test_client_reports_a_missing_service(tmp_path):
+    reader = Blockchain(storage=MemoryBlockStore(), difficulty=1, read_only=True)
+    client = ChainServiceClient(str(tmp_path / "missing.sock"), reader)
+    with pytest.raises(ChainServiceUnavailable):
+        asyncio.run(client.pending())
+
+
+def test_notifier_drops_stale_reader_sockets(tmp_path):
+    import socket
+
+    stale = tmp_path / "reader-1.sock"
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(str(stale))
+    sock.close()
+    notifier = SocketTipNotifier(tmp_path)
+    notifier.send(['{"height": 1, "hash": "hash"}'])
+    notifier.close()
+    assert not stale.exists()
+
+
+def test_serve_creates_tables_and_configures_logging(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine, inspect
+    from api import chain_service
+    from config.settings import settings
+
+    url = f"sqlite:///{tmp_path / 'chain.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    monkeypatch.setattr(settings, "CHAIN_SERVICE_SOCKET", str(tmp_path / "service.sock"))
+    monkeypatch.setattr(settings, "TIP_NOTIFY", "socket")
+    monkeypatch.setattr(settings, "TIP_SOCKET_DIR", str(tmp_path / "tips"))
+    monkeypatch.setattr(settings, "ANALYTICS_ENABLED", False)
+    configured = []
+    monkeypatch.setattr(chain_service, "setup_logging", configured.append)
+
+    async def run():
+        task = asyncio.create_task(chain_service.serve())
+        await wait_for(lambda: (tmp_path / "service.sock").exists())
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    # Importing the module configures nothing; serve() sets up the service's handlers
+    assert configured == [chain_service.logger.name]
+    assert "blocks" in inspect(create_engine(url)).get_table_names()
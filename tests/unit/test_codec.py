@@ -0,0 +1,58 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+import pytest
+from ravenchain import codec
+from ravenchain.block import Block
+from ravenchain.transaction import Transaction
+
+
+@pytest.fixture
+def block():
+    transactions = [
+        Transaction(None, "miner", 10.0),
+        Transaction("alice", "bob", 2, signature=os.urandom(71)),
+        Transaction("bob", "carol", 0.1),
+    ]
+    transactions[2].timestamp = datetime(2024, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=-5)))
+    block = Block(7, data=transactions, previous_hash="ab" * 32)
+    block.mine_block(1)
+    return block
+
+
+def test_block_round_trip_preserves_hash(block):
+    decoded, end = codec.decode_block(codec.encode_block(block))
+    assert end == len(codec.encode_block(block))
+    assert decoded.to_dict() == block.to_dict()
+    assert decoded.calculate_hash() == block.hash
+    assert isinstance(decoded.data[1].amount, int)
+    assert decoded.data[1].signature == block.data[1].signature
+
+
+def test_genesis_and_naive_timestamps():
+    genesis = Block(0, datetime(2024, 1, 1, 0, 0, 0, 123456), [], "0")
+    decoded, _ = codec.decode_block(codec.encode_block(genesis))
+    assert decoded.previous_hash == "0"
+    assert decoded.timestamp == genesis.timestamp and decoded.timestamp.tzinfo is None
+    assert decoded.calculate_hash() == genesis.hash
+
+
+def test_header_and_sequence_decoding(block):
+    header = codec.decode_header(codec.encode_block(block))
+    assert (header.index, header.hash, header.nonce) == (block.index, block.hash, block.nonce)
+
+    genesis = Block(0, previous_hash="0")
+    decoded = codec.decode_blocks(codec.encode_blocks([genesis, block]))
+    assert [b.hash for b in decoded] == [genesis.hash, block.hash]
+
+
+def test_smaller_than_json(block):
+    assert len(codec.encode_block(block)) < len(json.dumps(block.to_dict()).encode()) / 2
+
+
+def test_rejects_unknown_version_and_truncated_data(block):
+    data = codec.encode_block(block)
+    with pytest.raises(codec.CodecError):
+        codec.decode_block(b"\x02" + data[1:])
+    with pytest.raises(codec.CodecError):
+        codec.decode_block(data[:-5])
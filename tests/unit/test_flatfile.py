@@ -0,0 +1,127 @@
+import os
+import pytest
+from ravenchain.block import Block
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage.flatfile import INDEX_FILE, FlatFileBlockStore
+from ravenchain.transaction import Transaction
+
+
+def make_blocks(count, start=0, previous_hash="0"):
+    blocks = []
+    for i in range(start, start + count):
+        block = Block(
+            i,
+            data=[
+                Transaction(None, f"miner{i}", 10.0),
+                Transaction("alice", "bob", 2, signature=os.urandom(70)),
+            ],
+            previous_hash=previous_hash,
+        )
+        previous_hash = block.hash
+        blocks.append(block)
+    return blocks
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FlatFileBlockStore(tmp_path / "chain", segment_bytes=2048, fsync=False)
+    yield store
+    store.close()
+
+
+def assert_same_block(loaded, original):
+    assert loaded.to_dict() == original.to_dict()
+    assert loaded.calculate_hash() == original.hash
+
+
+def test_append_and_read_back(store):
+    blocks = make_blocks(20)
+    assert store.append_blocks(blocks, group_commit_size=7) == 20
+    assert len(store) == 20
+    assert_same_block(store.load_block(13), blocks[13])
+    assert [block.hash for block in store.iter_blocks(5, 8)] == [b.hash for b in blocks[5:8]]
+    assert store.load_block(20) is None
+    assert len(list(store.path.glob("blocks-*.dat"))) > 1
+
+
+def test_headers_and_hash_lookup(store):
+    blocks = make_blocks(5)
+    store.append_blocks(blocks)
+    headers = store.load_headers()
+    assert [header.hash for header in headers] == [block.hash for block in blocks]
+    assert headers[3].timestamp == blocks[3].timestamp
+    assert_same_block(store.load_block_by_hash(blocks[2].hash), blocks[2])
+    assert store.load_block_by_hash("f" * 64) is None
+
+
+def test_headers_are_decoded_without_copying_records(store, monkeypatch):
+    blocks = make_blocks(12)
+    store.append_blocks(blocks, group_commit_size=5)
+
+    def copy_record(height):
+        raise AssertionError(f"record {height} was copied")
+
+    monkeypatch.setattr(store, "_read", copy_record)
+    headers = store.load_headers(4, 9)
+    assert [header.hash for header in headers] == [block.hash for block in blocks[4:9]]
+    assert headers[0].previous_hash == blocks[3].hash
+    # No view of a mapping outlives the call, so segments can still be cut and closed
+    store.truncate(2)
+    assert len(store) == 3
+
+
+def test_rejects_gap(store):
+    store.append_blocks(make_blocks(2))
+    with pytest.raises(ValueError):
+        store.append_blocks(make_blocks(1, start=5))
+
+
+def test_reopen_and_truncate(store, tmp_path):
+    blocks = make_blocks(12)
+    store.append_blocks(blocks)
+    store.truncate(4)
+    assert store.load_block_by_hash(blocks[8].hash) is None
+    store.close()
+
+    reopened = FlatFileBlockStore(tmp_path / "chain", segment_bytes=2048, fsync=False)
+    assert len(reopened) == 5
+    more = make_blocks(2, start=5, previous_hash=blocks[4].hash)
+    reopened.append_blocks(more)
+    assert_same_block(reopened.load_block(6), more[1])
+    reopened.close()
+
+
+def test_incomplete_group_is_discarded(store, tmp_path):
+    blocks = make_blocks(6)
+    store.append_blocks(blocks[:3])
+    store.append_blocks(blocks[3:], group_commit_size=3)
+    store.close()
+
+    # Simulate a crash part way through writing the last group's index records
+    index_path = tmp_path / "chain" / INDEX_FILE
+    os.truncate(index_path, os.path.getsize(index_path) - 10)
+    with open(sorted((tmp_path / "chain").glob("blocks-*.dat"))[-1], "ab") as f:
+        f.write(b"torn write")
+
+    recovered = FlatFileBlockStore(tmp_path / "chain", segment_bytes=2048, fsync=False)
+    assert len(recovered) == 3
+    assert recovered.load_block_by_hash(blocks[3].hash) is None
+    recovered.append_blocks(blocks[3:])
+    assert_same_block(recovered.load_block(5), blocks[5])
+    recovered.close()
+
+
+def test_blockchain_on_flat_files(tmp_path):
+    store = FlatFileBlockStore(tmp_path / "chain", fsync=False)
+    blockchain = Blockchain(storage=store, difficulty=1, resident_blocks=2)
+    for _ in range(4):
+        blockchain.mine_pending_transactions("miner")
+    store.close()
+
+    store = FlatFileBlockStore(tmp_path / "chain", fsync=False)
+    reloaded = Blockchain(storage=store, difficulty=1, resident_blocks=2)
+    assert len(reloaded.chain) == 5
+    assert reloaded.chain[1].hash == blockchain.chain[1].hash
+    assert reloaded.get_balance("miner") == 40.0
+    assert reloaded.is_chain_valid({})
+    store.close()
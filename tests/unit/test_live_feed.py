@@ -0,0 +1,104 @@
+import asyncio
+import json
+from api.live_feed import BLOCKS, DISCONNECT, MEMPOOL, LiveFeed, Subscriber
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage import MemoryBlockStore
+from ravenchain.transaction import Transaction
+
+
+async def drain(subscriber):
+    """Let queued call_soon_threadsafe callbacks run, then collect the queued events"""
+    await asyncio.sleep(0)
+    events = []
+    while not subscriber.queue.empty():
+        message = subscriber.queue.get_nowait()
+        events.append(None if message is None else json.loads(message))
+    return events
+
+
+def test_block_events_are_filtered_by_address():
+    blockchain = Blockchain(storage=MemoryBlockStore(), difficulty=1)
+    feed = LiveFeed()
+    blockchain.add_listener(feed)
+
+    async def run():
+        everything = Subscriber(BLOCKS)
+        alice = Subscriber(BLOCKS, ["alice"])
+        carol = Subscriber(BLOCKS, ["carol"])
+        for subscriber in (everything, alice, carol):
+            assert feed.subscribe(subscriber)
+        blockchain.add_pending_transaction(Transaction("alice", "bob", 3.0))
+        block = blockchain.mine_pending_transactions("miner")
+        blockchain.rollback_to(0)
+        return block, await drain(everything), await drain(alice), await drain(carol)
+
+    block, everything, alice, carol = asyncio.run(run())
+    assert everything[0]["hash"] == block.hash
+    assert everything[0]["transactions"] == 2
+    assert "matches" not in everything[0]
+    assert alice[0]["matches"] == [
+        {
+            "sender": "alice",
+            "recipient": "bob",
+            "amount": 3.0,
+            "timestamp": block.data[1].timestamp.isoformat(),
+        }
+    ]
+    # Everyone learns about rollbacks, filtered or not
+    assert [event["type"] for event in carol] == ["rollback"]
+    assert everything[1] == {"type": "rollback", "height": 0, "removed": [block.hash]}
+
+
+def test_mempool_events():
+    blockchain = Blockchain(storage=MemoryBlockStore(), difficulty=1)
+    feed = LiveFeed()
+    blockchain.add_listener(feed)
+
+    async def run():
+        bob = Subscriber(MEMPOOL, ["bob"])
+        feed.subscribe(bob)
+        blockchain.add_pending_transaction(Transaction("alice", "bob", 1.0))
+        blockchain.add_pending_transaction(Transaction("alice", "carol", 1.0))
+        return await drain(bob)
+
+    events = asyncio.run(run())
+    assert [(event["type"], event["recipient"]) for event in events] == [("transaction", "bob")]
+
+
+def test_slow_subscribers_drop_oldest_events():
+    async def run():
+        subscriber = Subscriber(BLOCKS, max_queue=2)
+        for i in range(5):
+            subscriber.offer(json.dumps(i))
+        return subscriber, await drain(subscriber)
+
+    subscriber, events = asyncio.run(run())
+    assert events == [3, 4]
+    assert subscriber.dropped == 3
+
+
+def test_slow_subscribers_can_be_disconnected():
+    async def run():
+        subscriber = Subscriber(BLOCKS, max_queue=2, overflow=DISCONNECT)
+        for i in range(3):
+            subscriber.offer(json.dumps(i))
+        subscriber.offer(json.dumps(4))
+        return subscriber, await subscriber.next_event()
+
+    subscriber, event = asyncio.run(run())
+    assert subscriber.closed
+    assert event is None
+
+
+def test_subscriber_limit():
+    feed = LiveFeed(max_subscribers=1)
+
+    async def run():
+        first, second = Subscriber(BLOCKS), Subscriber(MEMPOOL)
+        assert feed.subscribe(first)
+        assert not feed.subscribe(second)
+        feed.unsubscribe(first)
+        assert feed.subscribe(second)
+
+    asyncio.run(run())
+    assert feed.stats()["mempool_subscribers"] == 1
@@ -0,0 +1,161 @@
+import io
+import json
+import logging
+import queue
+import threading
+import pytest
+from config import logging as log_config
+from config.logging import (
+    BatchedStreamHandler,
+    LogQueueHandler,
+    LogQueueListener,
+    SamplingFilter,
+    parse_logger_values,
+    setup_logging,
+)
+
+
+def make_record(name="ravenchain.api", level=logging.INFO, msg="Request %s", args=("a",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+def test_parse_logger_values():
+    assert parse_logger_values("") == {}
+    assert parse_logger_values("a.b=0.5, c=10") == {"a.b": 0.5, "c": 10.0}
+    with pytest.raises(ValueError):
+        parse_logger_values("a.b")
+
+
+def test_sampling_applies_to_child_loggers_but_never_to_warnings():
+    sampler = SamplingFilter(sample_rates={"ravenchain.api.health": 0.0, "ravenchain": 1.0})
+    assert not sampler.filter(make_record("ravenchain.api.health"))
+    assert not sampler.filter(make_record("ravenchain.api.health.probe"))
+    assert sampler.filter(make_record("ravenchain.api.health", level=logging.WARNING))
+    assert sampler.filter(make_record("ravenchain.api"))
+    assert sampler.suppressed == 2
+
+
+def test_rate_limits_each_message_of_a_logger(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(log_config.time, "monotonic", lambda: now[0])
+    sampler = SamplingFilter(rate_limits={"ravenchain.api": 2})
+    passed = [sampler.filter(make_record()) for _ in range(4)]
+    assert passed == [True, True, False, False]
+    # Another message template has its own allowance
+    assert sampler.filter(make_record(msg="Other"))
+    # Two per minute refill one every 30 seconds
+    now[0] += 30
+    assert [sampler.filter(make_record()) for _ in range(2)] == [True, False]
+
+
+def test_rate_limits_preformatted_messages_per_logger(monkeypatch):
+    monkeypatch.setattr(log_config.time, "monotonic", lambda: 100.0)
+    sampler = SamplingFilter(rate_limits={"ravenchain.api": 2}, max_buckets=4)
+    passed = [
+        sampler.filter(make_record(msg=f"Error getting block {i}", args=())) for i in range(4)
+    ]
+    assert passed == [True, True, False, False]
+    for i in range(10):
+        sampler.filter(make_record(msg=f"Request {i} %s"))
+    assert len(sampler._buckets) == 4
+
+
+def test_queue_handler_defers_formatting_and_reports_drops():
+    log_queue = queue.Queue(2)
+    handler = LogQueueHandler(log_queue)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record()
+        record.exc_info = __import__("sys").exc_info()
+    handler.handle(record)
+    queued = log_queue.get_nowait()
+    assert (queued.msg, queued.args, queued.exc_info) == ("Request a", None, None)
+    assert "ValueError: boom" in queued.exc_text
+
+    for _ in range(4):
+        handler.handle(make_record())
+    assert handler.dropped == 2
+    log_queue.get_nowait()
+    log_queue.get_nowait()
+    handler.handle(make_record())
+    report = log_queue.get_nowait()
+    assert report.levelno == logging.WARNING
+    assert report.getMessage() == "Dropped 2 log records, the log queue was full"
+
+
+def test_listener_flushes_batched_handlers_per_batch():
+    stream = CountingStream()
+    handler = BatchedStreamHandler(stream)
+    log_queue = queue.Queue()
+    for i in range(7):
+        log_queue.put_nowait(make_record(args=(i,)))
+    listener = LogQueueListener(log_queue, handler, batch_size=3)
+    listener.start()
+    listener.stop()
+    assert stream.getvalue().splitlines() == [f"Request {i}" for i in range(7)]
+    # After 3 and 6 records, then once the queue ran dry or the listener stopped
+    assert stream.flushes == 3
+
+
+def test_listener_stops_when_the_queue_is_full():
+    released = threading.Event()
+
+    class SlowStream(CountingStream):
+        def write(self, text):
+            released.wait(5)
+            return super().write(text)
+
+    stream = SlowStream()
+    log_queue = queue.Queue(3)
+    listener = LogQueueListener(log_queue, logging.StreamHandler(stream))
+    listener.start()
+    for i in range(4):
+        log_queue.put(make_record(args=(i,)), timeout=5)
+    # The listener is stuck on the first record and the queue is full
+    assert log_queue.full()
+    threading.Timer(0.1, released.set).start()
+    listener.stop()
+    assert listener._thread is None
+    assert stream.getvalue().splitlines() == [f"Request {i}" for i in range(4)]
+
+
+def test_setup_logging_writes_through_the_listener(tmp_path, monkeypatch):
+    for name in ("MAIN_LOG", "ERROR_LOG", "DEBUG_LOG"):
+        monkeypatch.setattr(log_config, name, tmp_path / f"{name.lower()}.log")
+    logger = setup_logging(
+        "ravenchain.test_logging",
+        json_output=True,
+        console_output=False,
+        rate_limits={"ravenchain.test_logging.noisy": 1},
+        batch_size=10,
+    )
+    noisy = logging.getLogger("ravenchain.test_logging.noisy")
+    try:
+        logger.info("Block mined", height=3)
+        for _ in range(5):
+            noisy.info("Probe")
+        logger.error("Storage failed")
+    finally:
+        # Only this logger's listener; the API's keeps running for later tests
+        log_config._listeners.pop("ravenchain.test_logging").stop()
+        logger.handlers = []
+
+    lines = [json.loads(line) for line in (tmp_path / "main_log.log").read_text().splitlines()]
+    assert [(line["message"], line.get("height")) for line in lines] == [
+        ("Block mined", 3),
+        ("Probe", None),
+        ("Storage failed", None),
+    ]
+    errors = (tmp_path / "error_log.log").read_text().splitlines()
+    assert [json.loads(line)["message"] for line in errors] == ["Storage failed"]
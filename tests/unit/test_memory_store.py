@@ -0,0 +1,49 @@
+import pytest
+from ravenchain.block import Block
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage import FlatFileBlockStore, MemoryBlockStore, create_block_store
+from ravenchain.transaction import Transaction
+
+
+def make_blocks(count, start=0, previous_hash="0"):
+    blocks = []
+    for i in range(start, start + count):
+        block = Block(i, data=[Transaction(None, f"miner{i}", 10.0)], previous_hash=previous_hash)
+        previous_hash = block.hash
+        blocks.append(block)
+    return blocks
+
+
+def test_append_read_and_truncate():
+    store = MemoryBlockStore()
+    blocks = make_blocks(5)
+    assert store.append_blocks(blocks) == 5
+    assert store.load_block(3) is blocks[3]
+    assert store.load_block(5) is None
+    assert store.load_block_by_hash(blocks[2].hash) is blocks[2]
+    assert [header.hash for header in store.load_headers()] == [block.hash for block in blocks]
+
+    store.truncate(2)
+    assert len(store) == 3
+    assert store.load_block_by_hash(blocks[4].hash) is None
+    with pytest.raises(ValueError):
+        store.append_blocks(make_blocks(1, start=5))
+
+
+def test_blockchain_defaults_to_memory_storage():
+    blockchain = Blockchain(difficulty=1)
+    blockchain.mine_pending_transactions("miner")
+    assert isinstance(blockchain.storage, MemoryBlockStore)
+    assert len(blockchain.storage) == 2
+    assert blockchain.is_chain_valid({})
+
+
+def test_create_block_store(tmp_path):
+    assert isinstance(create_block_store("memory"), MemoryBlockStore)
+    store = create_block_store("flatfile", data_dir=str(tmp_path))
+    assert isinstance(store, FlatFileBlockStore)
+    store.close()
+    with pytest.raises(ValueError):
+        create_block_store("sql")
+    with pytest.raises(ValueError):
+        create_block_store("redis")
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from api.metrics import ChainMetrics, TimedSQLBlockStore
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage import MemoryBlockStore
+from ravenchain.storage.sql import SQLBlockStore
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_chain_metrics_follow_the_tip():
+    blockchain = Blockchain(difficulty=1, storage=MemoryBlockStore())
+    blockchain.mine_pending_transactions("miner")
+    blockchain.add_listener(ChainMetrics())
+    assert sample("ravenchain_chain_height") == 1
+
+    block = blockchain.mine_pending_transactions("miner")
+    interval = (block.timestamp - blockchain.chain[1].timestamp).total_seconds()
+    assert sample("ravenchain_chain_height") == 2
+    if interval > 0:
+        assert sample("ravenchain_hashrate") == 16 / interval
+
+    blockchain.rollback_to(1)
+    assert sample("ravenchain_chain_height") == 1
+
+
+def test_chain_metrics_use_the_block_interval():
+    blockchain = Blockchain(difficulty=2, storage=MemoryBlockStore())
+    metrics = ChainMetrics()
+    blockchain.add_listener(metrics)
+    block = blockchain.mine_pending_transactions("miner")
+    metrics._tip_timestamp = block.timestamp - timedelta(seconds=4)
+    metrics.block_connected(block)
+    assert sample("ravenchain_block_interval_seconds") == 4
+    assert sample("ravenchain_hashrate") == 64
+
+
+def test_timed_block_store_records_saves_and_loads(tmp_path):
+    before = {
+        operation: sample("ravenchain_storage_seconds_count", operation=operation)
+        for operation in ("append_blocks", "load_headers", "iter_blocks")
+    }
+    store = TimedSQLBlockStore.from_url(f"sqlite:///{tmp_path / 'chain.db'}")
+    blockchain = Blockchain(difficulty=1, storage=store)
+    blockchain.mine_pending_transactions("miner")
+    assert len(Blockchain(difficulty=1, storage=store).chain) == 2
+    # Still an SQLBlockStore, so the API reads its blocks through the async session
+    assert isinstance(store, SQLBlockStore)
+    assert sample("ravenchain_storage_seconds_count", operation="append_blocks") == (
+        before["append_blocks"] + 2
+    )
+    assert sample("ravenchain_storage_seconds_count", operation="load_headers") == (
+        before["load_headers"] + 2
+    )
+    assert sample("ravenchain_storage_seconds_count", operation="iter_blocks") > (
+        before["iter_blocks"]
+    )
+
+
+def test_workers_are_aggregated(tmp_path):
+    worker = (
+        "from api.metrics import CHAIN_HEIGHT, record_signature_verifications\n"
+        "import sys\n"
+        "record_signature_verifications(3, 1)\n"
+        "CHAIN_HEIGHT.set(int(sys.argv[1]))\n"
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for height in ("5", "7"):
+        subprocess.run([sys.executable, "-c", worker, height], env=env, check=True)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    valid = registry.get_sample_value(
+        "ravenchain_signature_verifications_total", {"result": "valid"}
+    )
+    assert valid == 6
+    # Both writers have exited, but neither marked itself dead, so the highest one wins
+    assert registry.get_sample_value("ravenchain_chain_height") == 7
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import pytest
+from passlib.context import CryptContext
+from api.auth.hashing import HasherOverloaded, PasswordHasher
+
+
+class BlockingContext:
+    """Hashing context whose operations wait until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed-{password}"
+
+    def verify(self, password, hashed_password):
+        self.release.wait(5)
+        return hashed_password == f"hashed-{password}"
+
+
+def test_hashes_and_verifies_off_the_event_loop():
+    hasher = PasswordHasher(CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+
+    async def run():
+        hashed = await hasher.hash("password123")
+        return await hasher.verify("password123", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        assert asyncio.run(run()) == (True, False)
+    finally:
+        hasher.shutdown()
+    stats = hasher.stats()
+    assert stats["completed"] == 3
+    assert stats["in_flight"] == 0
+    assert stats["hash_seconds_max"] > 0
+
+
+def test_sheds_load_beyond_the_queue_limit():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, workers=1, max_queue=1)
+
+    async def run():
+        running = asyncio.ensure_future(hasher.hash("a"))
+        queued = asyncio.ensure_future(hasher.hash("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(HasherOverloaded):
+            await hasher.hash("c")
+        assert hasher.stats()["queued"] == 1
+        context.release.set()
+        return await asyncio.gather(running, queued)
+
+    try:
+        assert asyncio.run(run()) == ["hashed-a", "hashed-b"]
+    finally:
+        hasher.shutdown()
+    stats = hasher.stats()
+    assert stats["rejected"] == 1
+    assert stats["peak_queued"] == 1
+    assert stats["completed"] == 2
+    assert stats["in_flight"] == 0
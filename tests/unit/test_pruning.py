@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from api.database.models import Base
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage import BlockPrunedError, FlatFileBlockStore, MemoryBlockStore
+from ravenchain.storage.sql import SQLBlockStore
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def mine(blockchain, count):
+    for i in range(count):
+        blockchain.add_transaction("alice", "bob", 1.5)
+        blockchain.mine_pending_transactions(f"miner{i % 2}")
+
+
+@pytest.mark.parametrize("backend", ["memory", "sql"])
+def test_prune_keeps_balances_and_recent_blocks(backend, session_factory):
+    storage = MemoryBlockStore() if backend == "memory" else SQLBlockStore(session_factory)
+    blockchain = Blockchain(difficulty=1, storage=storage, resident_blocks=2, prune_keep_blocks=3)
+    mine(blockchain, 9)
+    balances = {address: blockchain.get_balance(address) for address in ("alice", "bob", "miner0")}
+
+    assert blockchain.prune(batch_size=4) == 7
+    assert blockchain.pruned_height == 7
+    assert {address: blockchain.get_balance(address) for address in balances} == balances
+    assert blockchain.chain[7].index == 7
+    with pytest.raises(BlockPrunedError):
+        blockchain.chain[5]
+    assert blockchain.chain.header(5).index == 5
+    assert blockchain.is_chain_valid({})
+    assert blockchain.prune() == 0
+
+
+def test_pruned_sql_chain_reloads_from_committed_state(session_factory):
+    blockchain = Blockchain(session_factory, difficulty=1, prune_keep_blocks=2)
+    mine(blockchain, 6)
+    blockchain.prune()
+    mine(blockchain, 2)
+
+    reloaded = Blockchain(session_factory, difficulty=1, prune_keep_blocks=2)
+    assert reloaded.pruned_height == 5
+    assert len(reloaded.chain) == 9
+    assert reloaded.get_balance("bob") == blockchain.get_balance("bob") == 12.0
+    assert [block.index for block in reloaded.load_chain_from_db(session_factory())] == [
+        5,
+        6,
+        7,
+        8,
+    ]
+    with pytest.raises(BlockPrunedError):
+        reloaded.storage.load_block_by_hash(reloaded.chain.header(1).hash)
+
+
+def test_rollback_updates_committed_state(session_factory):
+    blockchain = Blockchain(session_factory, difficulty=1, prune_keep_blocks=3)
+    mine(blockchain, 6)
+    blockchain.prune()
+    with pytest.raises(ValueError):
+        blockchain.rollback_to(blockchain.pruned_height - 1)
+
+    blockchain.rollback_to(5)
+    assert blockchain.get_balance("bob") == 7.5
+    reloaded = Blockchain(session_factory, difficulty=1, prune_keep_blocks=3)
+    assert reloaded.get_balance("bob") == 7.5
+
+
+def test_prune_by_bytes_keeps_minimum_blocks():
+    blockchain = Blockchain(difficulty=1, prune_keep_blocks=2, prune_keep_bytes=1)
+    mine(blockchain, 5)
+    assert blockchain.prune_target() == 4
+
+    roomy = Blockchain(difficulty=1, prune_keep_blocks=1, prune_keep_bytes=10**9)
+    mine(roomy, 5)
+    assert roomy.prune_target() == 0
+
+
+def test_pruning_requires_supporting_storage(tmp_path):
+    store = FlatFileBlockStore(tmp_path / "chain", fsync=False)
+    with pytest.raises(ValueError):
+        Blockchain(difficulty=1, storage=store, prune_keep_blocks=10)
+    store.close()
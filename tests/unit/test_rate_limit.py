@@ -0,0 +1,103 @@
+import multiprocessing
+import time
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from api.rate_limit import SharedMemoryStorage
+
+
+@pytest.fixture
+def table_uri(tmp_path):
+    return f"shm://{tmp_path / 'ratelimits.bin'}"
+
+
+@pytest.fixture
+def storage(table_uri):
+    storage = SharedMemoryStorage(table_uri)
+    yield storage
+    storage.close()
+
+
+def test_registered_for_shm_uris(table_uri):
+    storage = storage_from_string(table_uri)
+    try:
+        assert isinstance(storage, SharedMemoryStorage)
+        assert storage.check()
+    finally:
+        storage.close()
+
+
+def test_counts_and_expires(storage, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("api.rate_limit.time.time", lambda: now[0])
+    assert storage.incr("ip:1", 60) == 1
+    assert storage.incr("ip:1", 60, amount=2) == 3
+    assert storage.get("ip:1") == 3
+    assert storage.get("ip:2") == 0
+    assert storage.get_expiry("ip:1") == 1060.0
+    now[0] += 61
+    assert storage.get("ip:1") == 0
+    assert storage.incr("ip:1", 60) == 1
+    assert storage.get_expiry("ip:1") == 1121.0
+
+
+def test_clear_and_reset(storage):
+    storage.incr("a", 60)
+    storage.incr("b", 60)
+    storage.clear("a")
+    assert storage.get("a") == 0
+    assert storage.get("b") == 1
+    assert storage.reset() == 1
+    assert storage.get("b") == 0
+
+
+def test_full_stripe_evicts_the_counter_closest_to_expiry(tmp_path):
+    storage = SharedMemoryStorage(f"shm://{tmp_path / 'small.bin'}", stripes=1, slots_per_stripe=2)
+    try:
+        storage.incr("short", 10)
+        storage.incr("long", 100)
+        storage.incr("new", 50)
+        assert storage.get("short") == 0
+        assert storage.get("long") == 1
+        assert storage.get("new") == 1
+    finally:
+        storage.close()
+
+
+def test_processes_share_one_table(table_uri, storage):
+    other = SharedMemoryStorage(table_uri, stripes=8)
+    try:
+        # The geometry of the existing table wins
+        assert other.stripes == storage.stripes
+        other.incr("user:1", 60)
+        assert storage.get("user:1") == 1
+    finally:
+        other.close()
+
+
+def _hammer(uri, count):
+    storage = SharedMemoryStorage(uri)
+    for _ in range(count):
+        storage.incr("shared", 60)
+    storage.close()
+
+
+def test_increments_are_atomic_across_processes(table_uri, storage):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_hammer, args=(table_uri, 300)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert storage.get("shared") == 1200
+
+
+def test_enforces_limits_with_limits_strategy(storage):
+    limiter = FixedWindowRateLimiter(storage)
+    limit = parse("2/minute")
+    assert limiter.hit(limit, "alice")
+    assert limiter.hit(limit, "alice")
+    assert not limiter.hit(limit, "alice")
+    assert limiter.hit(limit, "bob")
+    assert limiter.get_window_stats(limit, "alice").reset_time > time.time()
@@ -0,0 +1,62 @@
+import json
+from api.response_cache import (
+    JSON,
+    OCTET_STREAM,
+    BlockResponseCache,
+    etag_matches,
+    join_payloads,
+)
+from ravenchain import codec
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage import MemoryBlockStore
+
+
+def make_blockchain(blocks):
+    blockchain = Blockchain(difficulty=1, storage=MemoryBlockStore())
+    for _ in range(blocks):
+        blockchain.add_transaction("alice", "bob", 1.5)
+        blockchain.mine_pending_transactions("miner")
+    return blockchain
+
+
+def test_payloads_match_the_uncached_encodings():
+    blockchain = make_blockchain(2)
+    cache = BlockResponseCache()
+    blocks = list(blockchain.chain)
+    payloads = [cache.payload(block, JSON) for block in blocks]
+    assert json.loads(join_payloads(payloads, JSON)) == [block.to_dict() for block in blocks]
+    binary = [cache.payload(block, OCTET_STREAM) for block in blocks]
+    assert join_payloads(binary, OCTET_STREAM) == codec.encode_blocks(blocks)
+    assert cache.get(blocks[1].hash, JSON) is payloads[1]
+
+
+def test_cache_evicts_least_recently_used_within_byte_budget():
+    blockchain = make_blockchain(3)
+    blocks = list(blockchain.chain)
+    size = len(BlockResponseCache().put(blocks[1], JSON))
+    cache = BlockResponseCache(max_bytes=size * 2 + 10)
+    cache.put(blocks[1], JSON)
+    cache.put(blocks[2], JSON)
+    cache.get(blocks[1].hash, JSON)
+    cache.put(blocks[3], JSON)
+    assert cache.get(blocks[2].hash, JSON) is None
+    assert cache.get(blocks[1].hash, JSON) is not None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_reorg_invalidates_removed_blocks():
+    blockchain = make_blockchain(3)
+    cache = BlockResponseCache()
+    blockchain.add_listener(cache)
+    for block in blockchain.chain:
+        cache.put(block, JSON)
+    removed = blockchain.rollback_to(1)
+    assert all(cache.get(block.hash, JSON) is None for block in removed)
+    assert cache.get(blockchain.chain[1].hash, JSON) is not None
+
+
+def test_etag_matching():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"a"')
@@ -0,0 +1,60 @@
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from api import serialization
+from api.serialization import ChainJSONResponse, encode_block, encode_header, encode_transaction
+from ravenchain.block import Block
+from ravenchain.transaction import Transaction
+
+
+def legacy_json(value):
+    return JSONResponse(jsonable_encoder(value.to_dict())).body
+
+
+def make_block(amounts, timestamp):
+    transactions = [Transaction(None, "miner", 10.0)] + [
+        Transaction.restore('ålice\n"quoted"', "bob", amount, timestamp, b"\x01\xff")
+        for amount in amounts
+    ]
+    return Block(3, timestamp=timestamp, data=transactions, previous_hash="ab" * 32)
+
+
+AMOUNTS = [1.25, 1e-05, 0.0001, 1e16, 1e22, 5, 2**70, 0.30000000000000004]
+TIMESTAMPS = [
+    datetime(2024, 1, 1, tzinfo=timezone.utc),
+    datetime(2024, 1, 1, 12, 30, 0, 123),
+    datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=5, minutes=30, seconds=15))),
+]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("timestamp", TIMESTAMPS)
+def test_output_is_byte_compatible(monkeypatch, use_orjson, timestamp):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    for amount in AMOUNTS:
+        block = make_block([amount], timestamp)
+        assert encode_block(block) == legacy_json(block)
+        assert encode_transaction(block.data[1]) == legacy_json(block.data[1])
+
+
+def test_non_finite_amounts_are_rejected():
+    block = make_block([float("nan")], TIMESTAMPS[0])
+    with pytest.raises(ValueError):
+        encode_block(block)
+
+
+def test_response_renders_chain_objects():
+    block = make_block([1.5], TIMESTAMPS[0])
+    assert json.loads(ChainJSONResponse([block, block]).body) == [block.to_dict()] * 2
+    assert json.loads(ChainJSONResponse(block.data).body) == [tx.to_dict() for tx in block.data]
+    assert ChainJSONResponse([]).body == b"[]"
+    assert ChainJSONResponse({"status": "ok"}).body == JSONResponse({"status": "ok"}).body
+
+
+def test_header_matches_block_without_data():
+    block = make_block([1.5], TIMESTAMPS[1])
+    expected = {key: value for key, value in block.to_dict().items() if key != "data"}
+    assert json.loads(encode_header(block)) == expected
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import pytest
+from ravenchain import tracing
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage import MemoryBlockStore
+
+
+class Collector:
+    """Exporter keeping finished traces in memory"""
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+@pytest.fixture
+def collector():
+    collector = Collector()
+    tracing.configure(collector)
+    yield collector
+    tracing.disable()
+
+
+def names(tree):
+    return [tree["name"], [names(child) for child in tree.get("children", [])]]
+
+
+def test_disabled_spans_are_shared_no_ops():
+    assert not tracing.enabled()
+    with tracing.span("mine_block", height=1) as current:
+        current.set_attribute("hashes", 10)
+    assert current is tracing.NOOP_SPAN
+
+
+def test_mining_records_a_span_tree(collector):
+    blockchain = Blockchain(difficulty=1, storage=MemoryBlockStore())
+    collector.traces.clear()
+    block = blockchain.mine_pending_transactions("miner")
+
+    (trace,) = collector.traces
+    tree = tracing.span_tree(trace)
+    assert names(tree) == [
+        "mine_pending_transactions",
+        [["mine_block", []], ["append_blocks", []]],
+    ]
+    assert tree["attributes"] == {"transactions": 1}
+    assert tree["children"][0]["attributes"] == {
+        "height": 1,
+        "difficulty": 1,
+        "hashes": block.nonce,
+    }
+
+
+def test_spans_follow_work_onto_threads(collector):
+    def work(name):
+        with tracing.span(name):
+            pass
+
+    async def handle():
+        with tracing.span("request"):
+            await asyncio.gather(
+                asyncio.to_thread(work, "first"), asyncio.to_thread(work, "second")
+            )
+
+    asyncio.run(handle())
+    (trace,) = collector.traces
+    tree = tracing.span_tree(trace)
+    assert tree["name"] == "request"
+    assert sorted(child["name"] for child in tree["children"]) == ["first", "second"]
+
+
+def test_errors_and_span_limit(collector, monkeypatch):
+    monkeypatch.setattr(tracing, "MAX_SPANS_PER_TRACE", 2)
+    with pytest.raises(ValueError):
+        with tracing.span("root"):
+            for _ in range(4):
+                with tracing.span("child"):
+                    pass
+            raise ValueError("boom")
+    (trace,) = collector.traces
+    assert trace.dropped == 2
+    tree = tracing.span_tree(trace)
+    assert tree["error"] == "ValueError: boom"
+    assert len(tree["children"]) == 2
+
+
+def test_log_exporter_emits_one_record_per_trace(caplog):
+    tracing.setup("log", logger=logging.getLogger("test.tracing"))
+    try:
+        with caplog.at_level(logging.INFO, logger="test.tracing"):
+            with tracing.span("root", height=3):
+                with tracing.span("child"):
+                    pass
+    finally:
+        tracing.disable()
+    (record,) = caplog.records
+    assert record.getMessage() == "Trace root"
+    assert names(record.props["spans"]) == ["root", [["child", []]]]
+    assert record.props["spans"]["attributes"] == {"height": 3}
+    assert record.props["duration_ms"] >= 0
+
+
+def test_otlp_file_exporter_writes_export_requests(tmp_path):
+    path = tmp_path / "traces" / "traces.jsonl"
+    tracing.setup("otlp", path=str(path), service_name="test")
+    try:
+        for _ in range(2):
+            with tracing.span("root", ok=True, count=2, ratio=0.5, label="x"):
+                with pytest.raises(RuntimeError), tracing.span("child"):
+                    raise RuntimeError("failed")
+    finally:
+        tracing._exporter.close()
+        tracing.disable()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    (resource_spans,) = json.loads(lines[0])["resourceSpans"]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "test"}}
+    ]
+    child, root = resource_spans["scopeSpans"][0]["spans"]
+    assert root["name"] == "root" and "parentSpanId" not in root
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["traceId"] == root["traceId"]
+    assert child["status"] == {"code": 2, "message": "RuntimeError: failed"}
+    assert int(root["endTimeUnixNano"]) >= int(child["endTimeUnixNano"])
+    assert root["attributes"] == [
+        {"key": "ok", "value": {"boolValue": True}},
+        {"key": "count", "value": {"intValue": "2"}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+        {"key": "label", "value": {"stringValue": "x"}},
+    ]
+
+
+def test_setup_rejects_unknown_modes():
+    with pytest.raises(ValueError):
+        tracing.setup("zipkin")
+    tracing.setup("off")
+    assert not tracing.enabled()
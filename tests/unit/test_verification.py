@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from api.verification import SignatureVerifier
+from ravenchain.transaction import Transaction
+from ravenchain.wallet import Wallet
+
+
+@pytest.fixture(scope="module")
+def signed_items():
+    alice = Wallet().create_wallet()
+    items = []
+    for amount in range(1, 8):
+        tx = Transaction(alice.address, "bob", float(amount))
+        tx.signature = alice.sign_transaction(tx)
+        items.append((tx, alice.public_key))
+    # Tampered after signing
+    items[4][0].amount = 50.0
+    return items
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_verifies_chunks_in_parallel_and_keeps_their_order(signed_items, workers):
+    verifier = SignatureVerifier(workers, chunk_size=2)
+    try:
+        results = asyncio.run(verifier.verify(signed_items))
+    finally:
+        verifier.shutdown()
+    sender = signed_items[0][0].sender
+    assert results == [None] * 4 + [f"invalid signature from {sender}"] + [None] * 2
+    stats = verifier.stats()
+    assert (stats["batches"], stats["verified"], stats["failed"]) == (1, 7, 1)
+    assert stats["transactions_per_second"] > 0
+
+
+def test_verifies_empty_batches_without_work():
+    verifier = SignatureVerifier(2)
+    assert asyncio.run(verifier.verify([])) == []
+    assert verifier.stats()["batches"] == 0
+
+
+def test_pool_processes_are_not_forked_from_the_worker():
+    verifier = SignatureVerifier(2)
+    try:
+        assert verifier._get_executor()._mp_context.get_start_method() != "fork"
+    finally:
+        verifier.shutdown()
@@ -0,0 +1,76 @@
+import pytest
+from ravenchain import codec
+from ravenchain.blockchain import Blockchain
+from ravenchain.storage import MemoryBlockStore
+from ravenchain.transaction import Transaction
+from ravenchain.verify import (
+    VerificationError,
+    verify_blocks,
+    verify_chunks,
+    verify_transactions,
+)
+from ravenchain.wallet import Wallet
+
+
+@pytest.fixture
+def signed_chain():
+    alice = Wallet().create_wallet()
+    blockchain = Blockchain(difficulty=1, storage=MemoryBlockStore())
+    blockchain.mine_pending_transactions(alice.address)
+    for _ in range(3):
+        blockchain.add_transaction(alice.address, "bob", 1.0, wallet=alice)
+        blockchain.mine_pending_transactions(alice.address)
+    return blockchain, {alice.address: alice.public_key}
+
+
+def test_verify_blocks_checks_links_hashes_and_signatures(signed_chain):
+    blockchain, public_keys = signed_chain
+    blocks = list(blockchain.chain)
+    assert verify_blocks(blocks, "0", public_keys) is None
+    assert verify_blocks(blocks[2:], "0") == (2, "does not link to the previous block")
+    assert verify_blocks(blocks, "0", {})[0] == 2
+
+    blocks[3].data[1].amount = 5.0
+    assert verify_blocks(blocks, "0") == (3, "hash does not match the block contents")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_verify_chunks_yields_items_in_order(signed_chain, workers):
+    blockchain, public_keys = signed_chain
+    blocks = list(blockchain.chain)
+    chunks = [
+        ([codec.encode_block(block) for block in blocks[:2]], "0", "first"),
+        ([codec.encode_block(block) for block in blocks[2:]], blocks[1].hash, "second"),
+    ]
+    assert list(verify_chunks(chunks, public_keys, workers)) == ["first", "second"]
+
+    chunks[1] = (chunks[1][0], "bad", "second")
+    with pytest.raises(VerificationError) as e:
+        list(verify_chunks(chunks, public_keys, workers))
+    assert e.value.height == 2
+
+
+def test_verify_transactions_reports_each_failure():
+    alice, mallory = Wallet().create_wallet(), Wallet().create_wallet()
+    valid = Transaction(alice.address, "bob", 1.0)
+    valid.signature = alice.sign_transaction(valid)
+    forged = Transaction(alice.address, "bob", 2.0)
+    forged.signature = mallory.sign_transaction(forged)
+    unsigned = Transaction(alice.address, "bob", 3.0)
+    assert verify_transactions(
+        [
+            (valid, alice.public_key),
+            (forged, alice.public_key),
+            (forged, mallory.public_key),
+            (unsigned, alice.public_key),
+            (valid, "00"),
+            (valid, "not hex"),
+        ]
+    ) == [
+        None,
+        f"invalid signature from {alice.address}",
+        f"public key does not belong to sender {alice.address}",
+        "missing signature",
+        f"public key does not belong to sender {alice.address}",
+        "malformed public key",
+    ]